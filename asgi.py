@@ -0,0 +1,232 @@
+"""
+ASGI entry point serving /extract and /extract/batch from the asyncio engine
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The extraction endpoints accept the same payloads and return the same
+responses as the Flask app, but run on AsyncGoogleBusinessScraper so one
+process can hold many lookups in flight. Every other route (jobs, webhooks,
+reviews, health, metrics) is passed through to the Flask app unchanged.
+With JOB_BACKEND=broker the scrapes are queued for the worker fleet instead,
+exactly as the Flask app does.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+from uvicorn.middleware.wsgi import WSGIMiddleware
+import main
+from async_scraper import AsyncGoogleBusinessScraper
+from broker import JobTimeout
+from tracing import TRACE_FILE, trace
+
+engine = AsyncGoogleBusinessScraper(main.scraper)
+flask_app = WSGIMiddleware(main.app)
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    handler = ROUTES.get((scope.get('method'), scope.get('path')))
+    if scope['type'] != 'http' or handler is None:
+        await flask_app(scope, receive, send)
+        return
+
+    try:
+        data = json.loads(await read_body(receive) or b'null')
+    except ValueError:
+        data = None
+    try:
+        await handler(scope, data, send)
+    except Exception as e:
+        await send_json(send, 500, {"error": f"An unexpected error occurred: {str(e)}"})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await engine.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def extract_business_data(scope, data, send):
+    """POST /extract; see main.extract_business_data for the payload"""
+    job, request_error = main.parse_extract_request(data, debug_timing=query_param(scope, 'debug') == 'timing')
+    if request_error:
+        await send_json(send, 400, {"error": request_error})
+        return
+
+    # Async mode uses the Flask app's job queue, so /jobs/<job_id> can report on it
+    if data.get('async') is True:
+        job_id = main.job_queue.submit(job)
+        await send_json(send, 202, {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"})
+        return
+
+    stream_format = requested_stream_format(scope, data)
+    if stream_format:
+        await send_stream(send, stream_extraction(**job), stream_format)
+        return
+
+    try:
+        result = await run_extraction(**job)
+    except JobTimeout as e:
+        await send_json(send, 504, {"error": str(e)})
+        return
+    await send_json(send, main.extraction_status(result), result)
+
+
+async def extract_batch(scope, data, send):
+    """POST /extract/batch; see main.extract_batch for the payload"""
+    batch, request_error = main.parse_batch_request(data)
+    if request_error:
+        await send_json(send, 400, {"error": request_error})
+        return
+
+    # Without an explicit limit every distinct business is in flight at once
+    return_webhook_url = batch.pop('return_webhook_url')
+    batch_results = get_business_data_many(**batch)
+
+    stream_format = requested_stream_format(scope, data)
+    if stream_format:
+        await send_stream(send, stream_batch(batch_results, return_webhook_url), stream_format)
+        return
+
+    results = [{"input": search_input, "result": result} async for search_input, result in batch_results]
+    found = main.found_results(results)
+
+    # One bulk POST for the whole batch instead of one per business
+    webhook_result = main.NO_BATCH_WEBHOOK
+    if found:
+        webhook_result = await asyncio.to_thread(main.deliver_batch_to_webhook, found, return_webhook_url)
+    await send_json(send, 200, main.batch_body(results, webhook_result))
+
+
+ROUTES = {
+    ('POST', '/extract'): extract_business_data,
+    ('POST', '/extract/batch'): extract_batch,
+}
+
+
+async def get_business_data(search_input, **options):
+    """Scrape one business on this event loop, or on the worker fleet when JOB_BACKEND=broker"""
+    if main.JOB_BACKEND != 'broker':
+        return await engine.get_business_data(search_input, **options)
+    payload = dict(options, kind='scrape', search_input=search_input)
+    return await main.job_queue.run_async(payload, main.BROKER_WAIT_TIMEOUT)
+
+
+async def get_business_data_many(inputs, concurrency=None, **options):
+    """Scrape many businesses, yielding (input, result) as each finishes; see main.get_business_data_many"""
+    if main.JOB_BACKEND != 'broker':
+        async for item in engine.get_business_data_many(inputs, concurrency=concurrency, **options):
+            yield item
+        return
+
+    names, payloads, timeout = main.broker_batch(inputs, **options)
+    async for index, result in main.job_queue.run_many_async(payloads, timeout):
+        for search_input in names[index]:
+            yield search_input, dict(result)
+
+
+async def run_extraction(search_input, return_webhook_url='', debug_timing=False, **options):
+    """Scrape one business and deliver the result to the webhook"""
+    with trace('extract', enabled=debug_timing or bool(TRACE_FILE), input=search_input) as timing:
+        result = await get_business_data(search_input, **options)
+
+        # Only successful extractions are forwarded; delivery may block, so it runs off the loop
+        if 'error' not in result:
+            result['webhook_status'] = await asyncio.to_thread(main.deliver_to_webhook, result, return_webhook_url)
+
+    if debug_timing:
+        result['timing'] = timing.to_dict()
+    return result
+
+
+async def stream_extraction(search_input, return_webhook_url='', debug_timing=False, **options):
+    """Yield the extraction result as soon as it exists, then the webhook status"""
+    with trace('extract', enabled=debug_timing or bool(TRACE_FILE), input=search_input) as timing:
+        try:
+            result = await get_business_data(search_input, **options)
+        except JobTimeout as e:
+            result = {"error": str(e)}
+        yield main.result_event(search_input, result)
+
+        if 'error' not in result:
+            webhook_status = await asyncio.to_thread(main.deliver_to_webhook, result, return_webhook_url)
+            yield {"type": "webhook_status", "webhook_status": webhook_status}
+
+    if debug_timing:
+        yield {"type": "timing", "timing": timing.to_dict()}
+
+
+async def stream_batch(batch_results, return_webhook_url=''):
+    """Yield batch results as they finish, delivering found listings in bounded chunks"""
+    batch = main.BatchStream()
+    async for search_input, result in batch_results:
+        yield batch.add(search_input, result)
+        chunk = batch.take_chunk()
+        if chunk:
+            batch.delivered(await asyncio.to_thread(main.deliver_batch_to_webhook, chunk, return_webhook_url))
+
+    chunk = batch.take_chunk(final=True)
+    if chunk:
+        batch.delivered(await asyncio.to_thread(main.deliver_batch_to_webhook, chunk, return_webhook_url))
+    yield batch.summary_event()
+
+
+def header(scope, name):
+    name = name.lower().encode('latin-1')
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def query_param(scope, name):
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name)
+    return values[0] if values else None
+
+
+def requested_stream_format(scope, data):
+    """'sse' or 'ndjson' when the caller asked for a streamed response, otherwise None"""
+    return main.stream_format_for(header(scope, 'accept'), data)
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_stream(send, events, stream_format):
+    """Send an async event generator as NDJSON or server-sent events"""
+    mimetype = b'text/event-stream' if stream_format == 'sse' else b'application/x-ndjson'
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', mimetype), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')],
+    })
+    async for event in events:
+        chunk = main.encode_event(event, stream_format)
+        await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
@@ -0,0 +1,268 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+from scraper import GoogleBusinessScraper, DEFAULT_TIME_BUDGET, LOOKUP_ABORTS, call_timeout, flight_key, \
+    lookup_error, observe_request, resolve_tier, strategy_budget
+from extraction import SEARCH_FIELDS, parse_html, extract_fields
+from readiness import LatencyBudget
+from singleflight import AsyncSingleFlight
+from strategies import RaceResults
+from metrics import REQUESTS_IN_FLIGHT, stage
+from tracing import span, propagate
+from blocking import BlockedError, classify_response
+
+
+class AsyncGoogleBusinessScraper:
+    """asyncio engine with the same get_business_data contract as GoogleBusinessScraper
+
+    Google Search is fetched with aiohttp, so one event loop can have dozens
+    of lookups waiting on the network at once. The Maps strategy drives the
+    wrapped scraper's Chrome pool from a thread per pooled browser, keeping
+    the loop free while pages render. The result cache, place index,
+    identities, strategy stats and response format are shared with the wrapped scraper,
+    and so is every decision that doesn't wait on I/O (tiering, caching, racing);
+    only the awaiting differs.
+    """
+
+    def __init__(self, scraper=None, http_concurrency=64):
+        self.scraper = scraper or GoogleBusinessScraper()
+        self.singleflight = AsyncSingleFlight()
+        self.http_concurrency = http_concurrency
+        # Browser work is bounded by the pool anyway; more threads would only queue on it
+        self._browser_executor = ThreadPoolExecutor(
+            max_workers=self.scraper.driver_pool.size, thread_name_prefix='async-maps'
+        )
+        self._sessions = {}
+
+    async def _get_session(self, identity):
+        """One aiohttp session (and cookie jar) per identity, created on the running loop"""
+        session = self._sessions.get(identity.name)
+        if session is None or session.closed:
+            session = self._sessions[identity.name] = aiohttp.ClientSession(
+                headers=identity.headers,
+                connector=aiohttp.TCPConnector(limit=self.http_concurrency),
+            )
+        return session
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._browser_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def get_business_data(self, business_name_or_url, time_budget=None, use_cache=True, strategies=None,
+                                race=None, tier=None, fields=None):
+        """Extract business data from Google; see GoogleBusinessScraper.get_business_data"""
+        started = time.perf_counter()
+        with REQUESTS_IN_FLIGHT.track_in_progress():
+            result = await self._get_business_data(business_name_or_url, time_budget, use_cache, strategies, race,
+                                                   tier, fields)
+        observe_request(started, result)
+        return result
+
+    async def _get_business_data(self, business_name_or_url, time_budget=None, use_cache=True, strategies=None,
+                                 race=None, tier=None, fields=None):
+        try:
+            search_query = self.scraper._search_query(business_name_or_url)
+            tier, fields = resolve_tier(tier, fields)
+            if use_cache:
+                cached = self.scraper._cached_result(search_query, tier, fields)
+                if cached:
+                    return cached
+
+            result, source = await self._scrape_once(search_query, time_budget, strategies, race, tier, fields)
+            return self.scraper._remember_result(search_query, result, source)
+
+        except Exception as e:
+            return {"error": f"An error occurred: {str(e)}"}
+
+    async def get_business_data_many(self, inputs, concurrency=None, **options):
+        """Extract many businesses concurrently, yielding (input, result) as each finishes
+
+        Inputs that normalize to the same query are scraped once. With no
+        ``concurrency`` every distinct business is in flight at once; the
+        browser pool and HTTP connection limit still bound the real work.
+        """
+        groups = self.scraper.group_inputs(inputs)
+        if not groups:
+            return
+
+        slots = asyncio.Semaphore(concurrency or len(groups))
+
+        async def extract(names):
+            async with slots:
+                return names, await self.get_business_data(names[0], **options)
+
+        tasks = set()
+        for names in groups:
+            task = asyncio.ensure_future(extract(names))
+            # Finished tasks leave the set, so a streamed batch only holds the results not yet yielded
+            task.add_done_callback(tasks.discard)
+            tasks.add(task)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                names, result = await next_done
+                for business_name_or_url in names:
+                    yield business_name_or_url, dict(result)
+        finally:
+            # Caller stopped early: don't run scrapes nobody will read
+            for task in list(tasks):
+                task.cancel()
+
+    async def _scrape_once(self, search_query, time_budget=None, strategies=None, race=None, tier='full',
+                           fields=None):
+        """Run _scrape_tiered, letting concurrent identical lookups await the one already running"""
+        key = flight_key(search_query, tier, fields, *self.scraper._strategy_plan(strategies, race))
+        return await self.singleflight.do(key, self._scrape_tiered, search_query, time_budget, strategies, race,
+                                          tier, fields)
+
+    async def _scrape_tiered(self, search_query, time_budget=None, strategies=None, race=None, tier='full',
+                             fields=None):
+        """Run the cheapest lookup that satisfies the requested fields, returning (result, source)"""
+        if tier == 'full':
+            return await self._scrape(search_query, time_budget, strategies, race)
+
+        try:
+            budget = LatencyBudget(time_budget or DEFAULT_TIME_BUDGET)
+
+            # Plain HTTP first: tens of milliseconds instead of a browser round-trip
+            http_data = await self._run_strategy('search', search_query, budget)
+            if self.scraper._http_answer(http_data, tier, fields):
+                return self.scraper._format_response(http_data), 'http'
+
+            # Escalate to the browser strategies, keeping whatever the HTTP pass found
+            browser_data = None
+            browser_strategies = self.scraper._escalation_strategies(strategies, tier)
+            if browser_strategies and not budget.expired():
+                browser_data, _ = await self._run_strategies_in_order(search_query, browser_strategies, budget)
+            return self.scraper._tiered_result(http_data, browser_data)
+
+        except Exception as e:
+            return lookup_error(e), 'http'
+
+    async def _scrape(self, search_query, time_budget=None, strategies=None, race=None):
+        """Run the live lookup for a query using the requested strategies, returning (result, source)"""
+        try:
+            budget = LatencyBudget(time_budget or DEFAULT_TIME_BUDGET)
+            strategies, race = self.scraper._strategy_plan(strategies, race)
+
+            if race and len(strategies) > 1:
+                data, names = await self._race_strategies(search_query, strategies, budget)
+            else:
+                data, names = await self._run_strategies_in_order(search_query, strategies, budget)
+            return self.scraper._lookup_result(data, names)
+
+        except Exception as e:
+            return lookup_error(e), 'http'
+
+    async def _run_strategy(self, name, query, budget):
+        """Run one lookup strategy and record its latency and outcome"""
+        search = {'maps': self._search_google_maps, 'search': self._search_google_search}[name]
+        started = time.monotonic()
+        data = None
+        try:
+            with span(f'strategy:{name}'):
+                data = await search(query, budget)
+            return data
+        finally:
+            self.scraper.strategy_stats.record_attempt(name, time.monotonic() - started, bool(data))
+
+    async def _run_strategies_in_order(self, query, strategies, budget):
+        """Try each strategy until one finds the listing, returning (data, [the strategy that found it])"""
+        for index, name in enumerate(strategies):
+            if budget.expired():
+                break
+            data = await self._run_strategy(name, query, strategy_budget(budget, name, index, len(strategies)))
+            if data:
+                self.scraper.strategy_stats.record_win(name)
+                return data, [name]
+        return None, []
+
+    async def _race_strategies(self, query, strategies, budget):
+        """Run strategies concurrently; stop at the first complete result or merge what comes back
+
+        Returns (data, the strategies whose results went into it).
+        """
+        budgets = {name: budget.slice(1.0) for name in strategies}
+        tasks = {
+            name: asyncio.ensure_future(self._run_strategy(name, query, budgets[name])) for name in strategies
+        }
+        race = RaceResults(strategies, self.scraper.strategy_stats)
+
+        pending = set(tasks.values())
+        try:
+            while pending and race.winner is None and not budget.expired():
+                done, pending = await asyncio.wait(pending, timeout=budget.remaining(),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                # Strategies finishing together are taken in preference order
+                for name in strategies:
+                    if tasks[name] in done:
+                        race.add(name, tasks[name].result)
+        finally:
+            # Cancel the losers; the Maps thread notices its cancelled budget and frees its driver
+            for name in race.losers():
+                budgets[name].cancel()
+                tasks[name].cancel()
+
+        return race.outcome(), list(race.results)
+
+    async def _search_google_maps(self, query, budget=None):
+        """Search Google Maps on a pooled browser without blocking the event loop"""
+        budget = budget or LatencyBudget(DEFAULT_TIME_BUDGET)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._browser_executor, propagate(self.scraper._search_google_maps), query, budget
+        )
+
+    async def _search_google_search(self, query, budget=None):
+        """Search Google Search for business listing over aiohttp"""
+        try:
+            budget = budget or LatencyBudget(DEFAULT_TIME_BUDGET)
+            search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}+google+business"
+
+            # Checking out may wait for a benched identity, so it runs off the loop
+            identities = self.scraper.identity_pool
+            identity = await asyncio.to_thread(identities.acquire, budget.remaining(), 'search')
+            try:
+                # Same limiter as the sync paths, but queued with asyncio.sleep instead of blocking
+                limiter = self.scraper.rate_limiter
+                if limiter:
+                    with stage('rate_limit_wait'):
+                        await asyncio.sleep(limiter.reserve(identity.name, timeout=budget.remaining(), path='search'))
+
+                seconds = call_timeout(budget)
+                if seconds is None:
+                    return None
+                session = await self._get_session(identity)
+                try:
+                    with stage('search_fetch'):
+                        timeout = aiohttp.ClientTimeout(total=seconds)
+                        async with session.get(search_url, timeout=timeout, proxy=identity.proxy) as response:
+                            content = await response.read()
+                except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError):
+                    identities.report_error(identity)
+                    return None
+                with stage('block_check'):
+                    blocked = classify_response(response.status, str(response.url), content)
+                self.scraper._record_pacing('search', blocked, identity)
+            finally:
+                identities.release(identity)
+            if blocked:
+                raise BlockedError(blocked, 'search', str(response.url))
+
+            # Parsing is CPU-bound, so it runs off the loop
+            return await asyncio.to_thread(self._parse_search_page, content)
+
+        except LOOKUP_ABORTS:
+            raise
+        except Exception as e:
+            return None
+
+    def _parse_search_page(self, content):
+        with stage('search_parse'):
+            soup = parse_html(content)
+        with stage('search_extract'):
+            business_data = extract_fields(soup, SEARCH_FIELDS, source='search')
+        if business_data and business_data.get('business_name'):
+            return business_data
+        return None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the HTML parsing backends used by the scraper
+
+Parses HTML pages with each available parser, checks that every backend
+extracts exactly the same fields, and reports time and peak memory per page.
+The default pages in benchmarks/fixtures are synthetic; pass saved Google
+pages to measure real ones.
+
+Usage:
+    python benchmarks/bench_parsers.py [page.html ...] [--iterations N]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import HTML_PARSERS, MAPS_FIELDS, SEARCH_FIELDS, parse_html, extract_fields  # noqa: E402
+from utils import extract_reviews_from_soup  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def table_for(path):
+    """Maps pages use the Maps selector table, everything else the Search one"""
+    return MAPS_FIELDS if 'maps' in os.path.basename(path) else SEARCH_FIELDS
+
+
+def read_original(spec, element):
+    """The original reader: plain .text, or the raw attribute, independent of FieldSpec"""
+    if spec.attr:
+        return element.get(spec.attr, '') or ''
+    return element.text
+
+
+def extract_uncompiled(soup, table):
+    """The original path: string selectors re-parsed by soupsieve on every call"""
+    data = {}
+    for name, spec in table.items():
+        for selector in spec.selectors:
+            if spec.many:
+                elements = soup.select(selector)
+                if elements:
+                    data[name] = [spec._convert(read_original(spec, elem)) for elem in elements]
+                    break
+            else:
+                element = soup.select_one(selector)
+                if element is not None:
+                    data[name] = spec._convert(read_original(spec, element))
+                    break
+        if data.get(name) is None:
+            data.pop(name, None)
+            if spec.required:
+                return None
+    return data
+
+
+def variants():
+    """(label, parser, extractor) combinations to compare; the first is the baseline"""
+    yield 'html.parser + string selectors', 'html.parser', extract_uncompiled
+    for parser in reversed(HTML_PARSERS):
+        yield f'{parser} + compiled selectors', parser, extract_fields
+
+
+def run_once(markup, parser, extractor, table):
+    soup = parse_html(markup, parser)
+    data = extractor(soup, table)
+    if data is not None and table is MAPS_FIELDS:
+        data['top_reviews'] = extract_reviews_from_soup(soup)
+    return data
+
+
+def bench_page(path, iterations):
+    with open(path, 'rb') as f:
+        markup = f.read()
+    table = table_for(path)
+
+    print(f"\n{os.path.basename(path)} ({len(markup) / 1024:.0f} KB, {iterations} iterations)")
+    print(f"  {'backend':<34}{'ms/page':>10}{'peak MB':>10}{'speedup':>10}  identical")
+
+    baseline_result = None
+    baseline_time = None
+    for label, parser, extractor in variants():
+        result = run_once(markup, parser, extractor, table)
+        if baseline_result is None:
+            baseline_result = result
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            run_once(markup, parser, extractor, table)
+        per_page = (time.perf_counter() - started) / iterations
+        if baseline_time is None:
+            baseline_time = per_page
+
+        tracemalloc.start()
+        run_once(markup, parser, extractor, table)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"  {label:<34}{per_page * 1000:>10.2f}{peak / 1024 / 1024:>10.2f}"
+              f"{baseline_time / per_page:>9.2f}x  {'yes' if result == baseline_result else 'NO'}")
+        if result != baseline_result:
+            print(f"    baseline: {baseline_result}\n    {label}: {result}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pages', nargs='*', help='saved HTML pages (defaults to benchmarks/fixtures/*.html)')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    if not pages:
+        print("No pages to benchmark")
+        sys.exit(1)
+
+    print(f"Available parsers: {', '.join(HTML_PARSERS)}")
+    for path in pages:
+        bench_page(path, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
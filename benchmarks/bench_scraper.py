@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for GoogleBusinessScraper.get_business_data
+
+Serves the synthetic Maps and Search pages in benchmarks/fixtures through a
+stand-in WebDriver and HTTP session, so the full scrape path (driver pool,
+readiness wait, extraction, strategy racing, response formatting) runs
+without Chrome or network access. Reports throughput, p50/p95/p99 latency,
+peak memory per request and per-field extraction cost, and compares them
+against a stored baseline. Timings are compared relative to a reference
+workload measured in the same run, so a slower or busier machine does not
+read as a regression; re-record the baseline when the hardware changes.
+
+The fixtures are generated pages, not captures of Google: they carry the
+selectors the scraper reads, a made-up listing and filler markup for size.
+The numbers track this code's own cost from run to run; they are not a
+measure of how it performs on real Google pages.
+
+Usage:
+    python benchmarks/bench_scraper.py [--requests N] [--concurrency N]
+    python benchmarks/bench_scraper.py --save-baseline
+    python benchmarks/bench_scraper.py --check   # exit 1 on regression
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmark the scrape path itself, not the result cache, the place index or request pacing
+os.environ.setdefault('CACHE_ENABLED', '0')
+os.environ.setdefault('PLACE_INDEX_ENABLED', '0')
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+from bs4 import BeautifulSoup  # noqa: E402
+from selenium.common.exceptions import NoSuchElementException  # noqa: E402
+from extraction import MAPS_FIELDS, SEARCH_FIELDS, extract_fields, parse_html  # noqa: E402
+from scraper import GoogleBusinessScraper  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# name -> get_business_data options
+SCENARIOS = {
+    'maps': {'strategies': ['maps'], 'race': False, 'tier': 'full'},
+    'search': {'tier': 'fast'},
+    'race': {'strategies': ['maps', 'search'], 'race': True, 'tier': 'full'},
+}
+
+# Extra seconds every Search fetch takes in the race scenario, so Maps always wins and each
+# run measures the same path rather than whichever strategy the scheduler happened to favour
+RACE_SEARCH_HANDICAP = 0.5
+
+# Scenario metrics compared against the baseline: whether higher is better, whether it is a
+# timing that scales with machine speed, and how many --tolerance widths it gets (tails are noisier)
+COMPARED_METRICS = {
+    'throughput_rps': (True, True, 1),
+    'p50_ms': (False, True, 1),
+    'p95_ms': (False, True, 2),
+    'p99_ms': (False, True, 3),
+    'peak_kb_per_request': (False, False, 1),
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class _SwitchTo:
+    def window(self, handle):
+        pass
+
+
+class FixtureDriver:
+    """Just enough of the Selenium WebDriver API to serve a synthetic fixture page"""
+
+    def __init__(self, html, page_delay=0.0):
+        self.page_source = html
+        self.page_delay = page_delay
+        self.current_url = 'about:blank'
+        self.window_handles = ['main']
+        self.switch_to = _SwitchTo()
+        self._soup = BeautifulSoup(html, 'html.parser')
+
+    def get(self, url):
+        if url != 'about:blank' and self.page_delay:
+            time.sleep(self.page_delay)
+        self.current_url = url
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def execute_script(self, script, *args):
+        return True
+
+    def find_element(self, by, selector):
+        element = self._soup.select_one(selector)
+        if element is None:
+            raise NoSuchElementException(selector)
+        return element
+
+    def find_elements(self, by, selector):
+        return self._soup.select(selector)
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FixtureResponse:
+    def __init__(self, content, url=''):
+        self.content = content
+        self.status_code = 200
+        self.url = url
+
+
+class FixtureSession:
+    """Stand-in for requests.Session that returns a synthetic fixture Search page"""
+
+    def __init__(self, html, delay=0.0):
+        self.content = html.encode('utf-8')
+        self.delay = delay
+        self.headers = {}
+
+    def get(self, url, timeout=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        return FixtureResponse(self.content, url)
+
+
+def build_scraper(pool_size, page_delay, http_delay):
+    scraper = GoogleBusinessScraper(pool_size=pool_size)
+    maps_html = read_fixture('google_maps.html')
+    scraper.driver_pool.factory = lambda identity=None: FixtureDriver(maps_html, page_delay)
+    for identity in scraper.identity_pool.identities:
+        identity.session = FixtureSession(read_fixture('google_search.html'), http_delay)
+    return scraper
+
+
+def set_http_delay(scraper, delay):
+    for identity in scraper.identity_pool.identities:
+        identity.session.delay = delay
+
+
+def wait_for_stragglers():
+    """Let cancelled race losers finish so they don't spill into the next measurement"""
+    for thread in threading.enumerate():
+        if thread.name.startswith('strategy'):
+            thread.join()
+
+
+def reference_ms(iterations):
+    """Median milliseconds to parse the Maps fixture and extract its fields: this machine's yardstick"""
+    markup = read_fixture('google_maps.html')
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        extract_fields(parse_html(markup), MAPS_FIELDS)
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(scraper, options, requests, concurrency, warmup, memory_samples):
+    """Throughput and latency under concurrency, then peak memory one request at a time"""
+    def one(index):
+        started = time.perf_counter()
+        # Distinct names so request coalescing doesn't merge the lookups
+        result = scraper.get_business_data(f"Benchmark Business {index}", use_cache=False, **options)
+        return time.perf_counter() - started, 'error' in result
+
+    for index in range(warmup):
+        one(-index - 1)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    wait_for_stragglers()
+
+    latencies = sorted(latency for latency, _ in outcomes)
+    peaks = []
+    for index in range(memory_samples):
+        tracemalloc.start()
+        one(requests + index)
+        wait_for_stragglers()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+
+    return {
+        'requests': requests,
+        'errors': sum(1 for _, failed in outcomes if failed),
+        'throughput_rps': round(requests / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_kb_per_request': round(sum(peaks) / len(peaks) / 1024, 1) if peaks else 0.0,
+    }
+
+
+def field_costs(iterations):
+    """Microseconds spent on each field's selector lookup and conversion"""
+    costs = {}
+    for source, fixture, table in (('maps', 'google_maps.html', MAPS_FIELDS),
+                                   ('search', 'google_search.html', SEARCH_FIELDS)):
+        soup = parse_html(read_fixture(fixture))
+        for name, spec in table.items():
+            started = time.perf_counter()
+            for _ in range(iterations):
+                spec.from_soup(soup)
+            costs[f'{source}.{name}'] = round((time.perf_counter() - started) / iterations * 1e6, 1)
+    return costs
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas against the baseline; returns the list of regressions
+
+    Timings in the baseline are first rescaled by how much slower or faster
+    this run's reference workload was than the baseline's.
+    """
+    regressions = []
+    speed = 1.0
+    if baseline.get('reference_ms') and results.get('reference_ms'):
+        speed = results['reference_ms'] / baseline['reference_ms']
+        print(f"\nReference workload {baseline['reference_ms']} ms -> {results['reference_ms']} ms; "
+              f"baseline timings scaled by {speed:.2f}")
+    else:
+        print("\nBaseline has no reference workload; comparing raw timings")
+
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%})")
+    for scenario, metrics in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(scenario)
+        if not reference:
+            print(f"  {scenario}: no baseline")
+            continue
+        for metric, (higher_is_better, timed, widths) in COMPARED_METRICS.items():
+            old, new = reference.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            if timed:
+                old = round(old / speed if higher_is_better else old * speed, 3)
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = 'REGRESSION' if worse > tolerance * widths else ''
+            if flag:
+                regressions.append(f"{scenario}.{metric}")
+            print(f"  {scenario + '.' + metric:<32}{old:>12}{new:>12}{change:>+9.1%}  {flag}")
+
+    # Field costs are only a few microseconds each, so they are shown but never fail the run
+    for field, cost in results['fields'].items():
+        old = baseline.get('fields', {}).get(field)
+        if old:
+            old = round(old * speed, 1)
+            print(f"  {'field.' + field:<32}{old:>12}{cost:>12}{(cost - old) / old:>+9.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent callers (and pooled drivers)')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--memory-samples', type=int, default=5)
+    parser.add_argument('--field-iterations', type=int, default=200)
+    parser.add_argument('--reference-iterations', type=int, default=50,
+                        help='runs of the reference workload that calibrates timings to this machine')
+    parser.add_argument('--page-delay', type=float, default=0.0,
+                        help='seconds each simulated Maps navigation takes')
+    parser.add_argument('--http-delay', type=float, default=0.0,
+                        help='seconds each simulated Search request takes')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable, defaults to all)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='write these results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 if any metric regressed')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed relative slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+
+    scraper = build_scraper(args.concurrency, args.page_delay, args.http_delay)
+    results = {
+        'environment': {'python': platform.python_version(), 'machine': platform.machine()},
+        'settings': {'requests': args.requests, 'concurrency': args.concurrency,
+                     'page_delay': args.page_delay, 'http_delay': args.http_delay},
+        'reference_ms': reference_ms(args.reference_iterations),
+        'scenarios': {},
+        'fields': {},
+    }
+
+    print(f"{'scenario':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>10}{'errors':>8}")
+    for name in args.scenario or list(SCENARIOS):
+        set_http_delay(scraper, args.http_delay + (RACE_SEARCH_HANDICAP if name == 'race' else 0.0))
+        metrics = run_scenario(scraper, SCENARIOS[name], args.requests, args.concurrency,
+                               args.warmup, args.memory_samples)
+        results['scenarios'][name] = metrics
+        print(f"{name:<10}{metrics['throughput_rps']:>10}{metrics['p50_ms']:>10}{metrics['p95_ms']:>10}"
+              f"{metrics['p99_ms']:>10}{metrics['peak_kb_per_request']:>10}{metrics['errors']:>8}")
+
+    results['fields'] = field_costs(args.field_iterations)
+    print("\nPer-field extraction cost (us)")
+    for field, cost in results['fields'].items():
+        print(f"  {field:<32}{cost:>10}")
+
+    scraper.driver_pool.close()
+
+    failed = any(metrics['errors'] for metrics in results['scenarios'].values())
+    if failed:
+        print("\nSome requests returned errors; the fixtures no longer match the selectors")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            failed = failed or args.check
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Load test for the Flask service under different gunicorn worker models
+
+Starts a local webhook sink in place of Zapier and, for each worker class,
+launches gunicorn serving benchmarks/stub_app.py (the real app with Google
+replaced by synthetic pages). Concurrent clients then drive /extract and/or
+/extract/batch for a fixed duration. Reports throughput, p50/p95/p99
+latency, error rate and webhook deliveries per worker model. Worker models
+whose dependencies are missing (gevent) are skipped.
+
+Usage:
+    python benchmarks/load_test.py [--worker-class sync --worker-class gthread]
+                                   [--workers 2] [--threads 8] [--concurrency 16]
+                                   [--duration 30] [--endpoint extract|batch|both]
+    python benchmarks/load_test.py --url http://127.0.0.1:5000   # drive a running server
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+from webhook_sink import WebhookSink
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+# Extra module each worker class needs beyond gunicorn itself
+WORKER_DEPENDENCIES = {'gevent': 'gevent'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(pct / 100.0 * len(sorted_values))) - 1]
+
+
+def start_server(worker_class, args, sink_url, workdir):
+    """Launch gunicorn serving the stubbed app; returns (process, base_url)"""
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--chdir', BENCH_DIR,
+        '--bind', f'127.0.0.1:{port}',
+        '--worker-class', worker_class,
+        '--workers', str(args.workers),
+        '--timeout', str(args.server_timeout),
+        '--log-level', 'warning',
+    ]
+    if worker_class == 'gthread':
+        command += ['--threads', str(args.threads)]
+    if worker_class == 'gevent':
+        command += ['--worker-connections', str(args.worker_connections)]
+    command.append('stub_app:app')
+
+    env = dict(
+        os.environ,
+        ZAPIER_WEBHOOK_URL=sink_url,
+        WEBHOOK_DELIVERY=args.webhook_delivery,
+        WEBHOOK_OUTBOX_PATH=os.path.join(workdir, f'outbox-{worker_class}.sqlite3'),
+        CACHE_ENABLED='0',
+        PLACE_INDEX_ENABLED='0',
+        RATE_LIMIT_ENABLED=os.getenv('RATE_LIMIT_ENABLED', '0'),
+        DRIVER_POOL_SIZE=str(args.pool_size),
+        LOAD_PAGE_DELAY=str(args.page_delay),
+        LOAD_HTTP_DELAY=str(args.http_delay),
+    )
+    process = subprocess.Popen(command, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+
+    # Wait for every worker to finish importing the app
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            if requests.get(f'{base_url}/health', timeout=2).status_code == 200:
+                return process, base_url
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("gunicorn did not become healthy within 60s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def request_factory(endpoint, batch_size):
+    """Build (path, payload) pairs; every business name is unique so nothing is coalesced"""
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def next_request():
+        with lock:
+            number = next(counter)
+        kind = endpoint if endpoint != 'both' else ('batch' if number % 2 else 'extract')
+        if kind == 'batch':
+            names = [f"Load Test Business {number}-{index}" for index in range(batch_size)]
+            return 'batch', '/extract/batch', {'businesses': names}
+        return 'extract', '/extract', {'business_name': f"Load Test Business {number}"}
+
+    return next_request
+
+
+def drive(base_url, args):
+    """Run closed-loop clients for the configured duration; returns per-endpoint samples"""
+    next_request = request_factory(args.endpoint, args.batch_size)
+    samples = {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            kind, path, payload = next_request()
+            started = time.perf_counter()
+            try:
+                response = session.post(base_url + path, json=payload, timeout=args.request_timeout)
+                ok = response.status_code == 200
+                status = response.status_code
+            except requests.exceptions.RequestException as e:
+                ok = False
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                entry = samples.setdefault(kind, {'latencies': [], 'errors': {}})
+                entry['latencies'].append(elapsed)
+                if not ok:
+                    entry['errors'][str(status)] = entry['errors'].get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client, daemon=True) for _ in range(args.concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, wall):
+    summary = {}
+    for kind, entry in samples.items():
+        latencies = sorted(entry['latencies'])
+        errors = sum(entry['errors'].values())
+        summary[kind] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / wall, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'error_rate': round(errors / len(latencies), 4) if latencies else 0.0,
+            'errors': entry['errors'],
+        }
+    return summary
+
+
+def print_report(results):
+    print(f"\n{'worker model':<16}{'endpoint':<10}{'req':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'errors':>9}{'webhooks':>10}")
+    for label, result in results.items():
+        if 'skipped' in result:
+            print(f"{label:<16}skipped: {result['skipped']}")
+            continue
+        # Webhook listings are counted per worker model, so they go on its first row
+        webhooks = result['webhook']['items']
+        for kind, row in result['endpoints'].items():
+            print(f"{label:<16}{kind:<10}{row['requests']:>7}{row['throughput_rps']:>9}{row['p50_ms']:>10}"
+                  f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['error_rate']:>9.1%}{webhooks:>10}")
+            label = webhooks = ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--worker-class', action='append', choices=WORKER_CLASSES,
+                        help='gunicorn worker class to test (repeatable, defaults to all)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker')
+    parser.add_argument('--worker-connections', type=int, default=100, help='greenlets per gevent worker')
+    parser.add_argument('--pool-size', type=int, default=2, help='DRIVER_POOL_SIZE per worker')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of load per worker model')
+    parser.add_argument('--endpoint', choices=('extract', 'batch', 'both'), default='extract')
+    parser.add_argument('--batch-size', type=int, default=5, help='businesses per /extract/batch request')
+    parser.add_argument('--page-delay', type=float, default=0.5, help='simulated Maps page load seconds')
+    parser.add_argument('--http-delay', type=float, default=0.2, help='simulated Search round trip seconds')
+    parser.add_argument('--webhook-delivery', choices=('async', 'sync'), default='async')
+    parser.add_argument('--webhook-delay', type=float, default=0.05, help='seconds the sink takes to answer')
+    parser.add_argument('--request-timeout', type=float, default=60.0)
+    parser.add_argument('--server-timeout', type=int, default=120, help='gunicorn worker timeout')
+    parser.add_argument('--url', help='drive an already running server instead of launching gunicorn')
+    parser.add_argument('--json', dest='json_path', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    sink = WebhookSink(delay=args.webhook_delay).start()
+    print(f"Webhook sink at {sink.url}")
+    results = {}
+
+    if args.url:
+        samples, wall = drive(args.url.rstrip('/'), args)
+        results['external'] = {'endpoints': summarize(samples, wall), 'webhook': sink.stats()}
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            for worker_class in args.worker_class or WORKER_CLASSES:
+                label = f"{worker_class} x{args.workers}"
+                dependency = WORKER_DEPENDENCIES.get(worker_class)
+                if dependency and importlib.util.find_spec(dependency) is None:
+                    results[label] = {'skipped': f"{dependency} is not installed"}
+                    continue
+
+                print(f"Running {label} for {args.duration:.0f}s at concurrency {args.concurrency}")
+                sink.reset()
+                process, base_url = start_server(worker_class, args, sink.url, workdir)
+                try:
+                    samples, wall = drive(base_url, args)
+                    # Give queued webhook deliveries a moment to land before counting them
+                    time.sleep(2 if args.webhook_delivery == 'async' else 0)
+                finally:
+                    stop_server(process)
+                results[label] = {'endpoints': summarize(samples, wall), 'webhook': sink.stats()}
+
+    sink.stop()
+    print_report(results)
+
+    if args.json_path:
+        settings = {key: value for key, value in vars(args).items() if key != 'json_path'}
+        with open(args.json_path, 'w') as f:
+            json.dump({'settings': settings, 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
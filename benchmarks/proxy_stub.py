@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Local forward proxy that stands in for a scraping proxy during tests
+
+Tunnels CONNECT requests (what requests, aiohttp and Chrome send for
+HTTPS) to their target and counts them, or refuses every request with a
+fixed status to play a banned or broken exit. Point SCRAPER_PROXIES at a
+few of these to watch identities rotate and bench.
+
+Usage:
+    python benchmarks/proxy_stub.py [--port 8899] [--status 429]
+"""
+
+import argparse
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ProxyStub:
+    """Threaded CONNECT proxy that records which hosts it was asked for"""
+
+    def __init__(self, host='127.0.0.1', port=0, status=None, connect_timeout=5):
+        self.status = status
+        self.connect_timeout = connect_timeout
+        self.requests = {}
+        self.refused = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_CONNECT(self):
+                stub._record(self.path)
+                if stub.status:
+                    stub._refuse()
+                    self.send_error(stub.status)
+                    return
+                host, _, port = self.path.rpartition(':')
+                try:
+                    upstream = socket.create_connection((host, int(port)), timeout=stub.connect_timeout)
+                except OSError:
+                    self.send_error(502)
+                    return
+                self.send_response(200, 'Connection established')
+                self.end_headers()
+                stub._relay(self.connection, upstream)
+
+            def do_GET(self):
+                # Plain HTTP forwarding isn't needed: every Google request goes through CONNECT
+                stub._record(self.path)
+                stub._refuse()
+                self.send_error(stub.status or 501)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _relay(self, client, upstream):
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 60)
+                if not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is client else client).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def _record(self, target):
+        with self._lock:
+            self.requests[target] = self.requests.get(target, 0) + 1
+
+    def _refuse(self):
+        with self._lock:
+            self.refused += 1
+
+    def stats(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'refused': self.refused}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='proxy-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--status', type=int, default=None, help='refuse every request with this HTTP status')
+    args = parser.parse_args()
+
+    stub = ProxyStub(args.host, args.port, args.status).start()
+    print(f"Proxy stub listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(stub.stats())
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Gunicorn entry point serving main.app with Google replaced by synthetic pages
+
+The scraper keeps its real driver pool, racing, extraction and webhook
+delivery, but drivers and the identities' HTTP sessions serve the synthetic pages in benchmarks/fixtures
+instead of launching Chrome or calling Google. Used by load_test.py:
+
+    gunicorn --chdir benchmarks stub_app:app
+
+LOAD_PAGE_DELAY and LOAD_HTTP_DELAY (seconds) simulate Maps page load and
+Search round-trip time.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scraper import FixtureDriver, FixtureSession, read_fixture  # noqa: E402
+import main  # noqa: E402
+
+PAGE_DELAY = float(os.getenv('LOAD_PAGE_DELAY', '0.5'))
+HTTP_DELAY = float(os.getenv('LOAD_HTTP_DELAY', '0.2'))
+
+_maps_html = read_fixture('google_maps.html')
+main.scraper.driver_pool.factory = lambda identity=None: FixtureDriver(_maps_html, PAGE_DELAY)
+for identity in main.scraper.identity_pool.identities:
+    identity.session = FixtureSession(read_fixture('google_search.html'), HTTP_DELAY)
+
+app = main.app
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local webhook receiver that stands in for Zapier during load tests
+
+Accepts any POST, answers with a fixed status after an optional delay, and
+counts what it received. Can be run on its own or started from load_test.py.
+
+Usage:
+    python benchmarks/webhook_sink.py [--port 8765] [--status 200] [--delay 0.05]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def count_listings(payload):
+    """Listings in one webhook body: bulk and coalesced POSTs, possibly in the Zapier envelope, carry ``count``"""
+    if isinstance(payload, dict):
+        payload = payload.get('business_data', payload)
+    return payload.get('count', 1) if isinstance(payload, dict) and payload.get('batch') else 1
+
+
+class WebhookSink:
+    """Threaded HTTP server that records webhook POSTs"""
+
+    def __init__(self, host='127.0.0.1', port=0, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.received = 0
+        self.items = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/hook"
+
+    def _handler(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                sink._record(body)
+                if sink.delay:
+                    time.sleep(sink.delay)
+                self.send_response(sink.status)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{"status": "ok"}')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _record(self, body):
+        # Batched deliveries (bulk or coalesced, possibly in the Zapier envelope) count every listing
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            payload = {}
+        items = count_listings(payload)
+        with self._lock:
+            self.received += 1
+            self.items += items
+            self.bytes += len(body)
+
+    def stats(self):
+        with self._lock:
+            return {'posts': self.received, 'items': self.items, 'bytes': self.bytes}
+
+    def reset(self):
+        with self._lock:
+            self.received = self.items = self.bytes = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='webhook-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--status', type=int, default=200, help='HTTP status to answer with')
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to wait before answering')
+    args = parser.parse_args()
+
+    sink = WebhookSink(args.host, args.port, args.status, args.delay).start()
+    print(f"Webhook sink listening on {sink.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(sink.stats())
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
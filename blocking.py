@@ -0,0 +1,83 @@
+from urllib.parse import urlparse
+
+# What Google served instead of the page we asked for
+CAPTCHA = 'captcha'
+RATE_LIMITED = 'rate_limited'
+CONSENT = 'consent'
+# Not a page: every identity is sitting out an earlier block
+BENCHED = 'benched'
+
+# Kinds that mean Google wants fewer requests from us, as opposed to a one-off interstitial
+THROTTLE_KINDS = (CAPTCHA, RATE_LIMITED)
+
+BLOCK_MESSAGES = {
+    CAPTCHA: "Google served a CAPTCHA page instead of results. Please try again later.",
+    RATE_LIMITED: "Google is rate limiting requests. Please try again later.",
+    CONSENT: "Google served a cookie consent page instead of results.",
+    BENCHED: "Every scraping identity is benched after being blocked by Google. Please try again later.",
+}
+
+# Markers of the "unusual traffic" challenge in a fetched page. Plain byte searches,
+# so a normal results page costs a few scans rather than a parse.
+CAPTCHA_MARKERS = (
+    b'id="captcha-form"',
+    b'class="g-recaptcha"',
+    b'unusual traffic from your computer network',
+)
+
+# The same markers checked in the live DOM with one WebDriver round-trip
+_BLOCK_SCRIPT = """
+if (document.querySelector('#captcha-form, form[action*="/sorry/"], .g-recaptcha, iframe[src*="recaptcha"]')) {
+    return 'captcha';
+}
+return null;
+"""
+
+
+class BlockedError(Exception):
+    """Google answered with a block page (CAPTCHA, 429 or consent wall), or every identity is benched"""
+
+    def __init__(self, kind, path, url=''):
+        super().__init__(BLOCK_MESSAGES[kind])
+        self.kind = kind
+        self.path = path
+        self.url = url
+
+    def to_dict(self):
+        return {"error": str(self), "blocked": self.kind}
+
+
+def classify_url(url):
+    """Block kind implied by where Google redirected us, or None"""
+    parsed = urlparse(url or '')
+    if parsed.path.startswith('/sorry/'):
+        return CAPTCHA
+    if parsed.netloc.startswith('consent.'):
+        return CONSENT
+    return None
+
+
+def classify_response(status_code=None, url='', content=b''):
+    """Block kind of a fetched Search page, or None when it looks like real results"""
+    kind = classify_url(url)
+    if kind:
+        return kind
+    if status_code == 429:
+        return RATE_LIMITED
+    if isinstance(content, str):
+        content = content.encode('utf-8', 'replace')
+    if any(marker in content for marker in CAPTCHA_MARKERS):
+        return CAPTCHA
+    return None
+
+
+def classify_page(driver):
+    """Block kind of the page loaded in a driver, or None"""
+    kind = classify_url(driver.current_url)
+    if kind:
+        return kind
+    try:
+        kind = driver.execute_script(_BLOCK_SCRIPT)
+    except Exception:
+        return None
+    return kind if kind in BLOCK_MESSAGES else None
@@ -0,0 +1,302 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class JobTimeout(Exception):
+    """No worker finished the job within the caller's wait"""
+
+
+class JobBroker:
+    """SQLite job queue shared by the web tier and the scraping worker processes
+
+    The web tier submits jobs; workers started by worker.py claim them with
+    a lease they keep renewing while the job runs. A job whose lease runs
+    out (its worker crashed or hung) is handed to another worker, up to
+    ``max_attempts`` times, after which it fails. ``submit``, ``get`` and
+    ``stats`` match JobQueue, so either can back the async endpoints.
+    """
+
+    def __init__(self, path, lease_seconds=30, max_attempts=3, retention=3600, poll_interval=0.1):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # Readers (status polls) shouldn't wait on workers claiming jobs
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL DEFAULT 'queued',"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT,"
+            " lease_expires REAL,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            " worker TEXT PRIMARY KEY,"
+            " pid INTEGER NOT NULL,"
+            " concurrency INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " started_at REAL NOT NULL,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def submit(self, payload):
+        """Queue a job and return its ID immediately"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, payload, created_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(payload), now)
+            )
+            self._conn.commit()
+        return job_id
+
+    def get(self, job_id):
+        """Snapshot of a job's state, or None if unknown or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, created_at, started_at, finished_at, result, error, attempts, worker"
+                " FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(('job_id', 'status', 'created_at', 'started_at', 'finished_at', 'result', 'error',
+                        'attempts', 'worker'), row))
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def run(self, payload, timeout):
+        """Submit a job and wait for its result; raises JobTimeout if no worker finishes in time"""
+        job_id = self.submit(payload)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.get(job_id)
+            if job and job['finished_at']:
+                return _outcome(job['result'], job['error'])
+            time.sleep(self.poll_interval)
+        self.cancel(job_id)
+        raise JobTimeout(_timeout_message(timeout))
+
+    async def run_async(self, payload, timeout):
+        """run() for asyncio callers: waits with asyncio.sleep instead of blocking the loop"""
+        job_id = self.submit(payload)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.get(job_id)
+            if job and job['finished_at']:
+                return _outcome(job['result'], job['error'])
+            await asyncio.sleep(self.poll_interval)
+        self.cancel(job_id)
+        raise JobTimeout(_timeout_message(timeout))
+
+    def run_many(self, payloads, timeout):
+        """Submit jobs and yield (index, result) as each finishes; unfinished jobs time out together"""
+        job_ids = {self.submit(payload): index for index, payload in enumerate(payloads)}
+        deadline = time.monotonic() + timeout
+        try:
+            while job_ids and time.monotonic() < deadline:
+                finished = self._finished(list(job_ids))
+                for job_id, result, error in finished:
+                    yield job_ids.pop(job_id), _outcome(json.loads(result) if result else None, error)
+                if not finished:
+                    time.sleep(self.poll_interval)
+            for index in job_ids.values():
+                yield index, {"error": _timeout_message(timeout)}
+        finally:
+            # Caller stopped early or timed out: don't leave work nobody will read
+            for job_id in job_ids:
+                self.cancel(job_id)
+
+    async def run_many_async(self, payloads, timeout):
+        """run_many() for asyncio callers"""
+        job_ids = {self.submit(payload): index for index, payload in enumerate(payloads)}
+        deadline = time.monotonic() + timeout
+        try:
+            while job_ids and time.monotonic() < deadline:
+                finished = self._finished(list(job_ids))
+                for job_id, result, error in finished:
+                    yield job_ids.pop(job_id), _outcome(json.loads(result) if result else None, error)
+                if not finished:
+                    await asyncio.sleep(self.poll_interval)
+            for index in job_ids.values():
+                yield index, {"error": _timeout_message(timeout)}
+        finally:
+            for job_id in job_ids:
+                self.cancel(job_id)
+
+    def _finished(self, job_ids):
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT job_id, result, error FROM jobs WHERE finished_at IS NOT NULL"
+                f" AND job_id IN ({','.join('?' * len(job_ids))})", job_ids
+            ).fetchall()
+
+    def cancel(self, job_id):
+        """Drop a job that hasn't been claimed yet"""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ? AND status = 'queued'", (job_id,))
+            self._conn.commit()
+
+    def claim(self, worker):
+        """Lease the oldest runnable job to a worker; returns (job_id, payload) or None
+
+        Jobs whose lease ran out are reclaimed here too, or failed once they
+        have used up their attempts.
+        """
+        now = time.time()
+        with self._lock:
+            self._expire_leases(now)
+            while True:
+                row = self._conn.execute(
+                    "SELECT job_id, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    self._conn.commit()
+                    return None
+                # Another process may have taken it between the SELECT and the UPDATE
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1,"
+                    " started_at = ? WHERE job_id = ? AND status = 'queued'",
+                    (worker, now + self.lease_seconds, now, row[0])
+                )
+                if cursor.rowcount:
+                    self._conn.commit()
+                    return row[0], json.loads(row[1])
+
+    def renew(self, job_ids, worker):
+        """Extend the leases a worker holds on its running jobs"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+                [(time.time() + self.lease_seconds, job_id, worker) for job_id in job_ids]
+            )
+            self._conn.commit()
+
+    def finish(self, job_id, worker, result=None, error=None):
+        """Record a job's outcome, unless it was reassigned after this worker's lease ran out"""
+        if error is None:
+            status = "failed" if 'error' in result else "completed"
+        else:
+            status = "failed"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires = NULL"
+                " WHERE job_id = ? AND worker = ? AND status = 'running'",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, worker)
+            )
+            self._conn.commit()
+
+    def release_worker(self, worker, reason):
+        """Requeue (or fail, when out of attempts) every job a dead worker was running"""
+        with self._lock:
+            self._requeue("worker = ? AND status = 'running'", (worker,), reason, time.time())
+            self._conn.execute("UPDATE workers SET status = 'dead' WHERE worker = ?", (worker,))
+            self._conn.commit()
+
+    def stuck_workers(self):
+        """Workers that reported a job running past its timeout"""
+        with self._lock:
+            rows = self._conn.execute("SELECT worker FROM workers WHERE status = 'stuck'").fetchall()
+        return [row[0] for row in rows]
+
+    def _expire_leases(self, now):
+        """Requeue jobs whose lease ran out; caller holds the lock"""
+        self._requeue("status = 'running' AND lease_expires < ?", (now,), "Worker stopped renewing its lease", now)
+
+    def _requeue(self, where, params, reason, now):
+        self._conn.execute(
+            f"UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_expires = NULL"
+            f" WHERE {where} AND attempts >= ?",
+            (f"{reason} (gave up after {self.max_attempts} attempts)", now, *params, self.max_attempts)
+        )
+        self._conn.execute(
+            f"UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL WHERE {where}", params
+        )
+
+    def register_worker(self, worker, pid, concurrency):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workers (worker, pid, concurrency, status, started_at, last_seen)"
+                " VALUES (?, ?, ?, 'running', ?, ?)", (worker, pid, concurrency, now, now)
+            )
+            self._conn.commit()
+
+    def worker_seen(self, worker, status='running'):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workers SET status = ?, last_seen = ? WHERE worker = ?", (status, time.time(), worker)
+            )
+            self._conn.commit()
+
+    def _prune(self, now):
+        """Drop finished jobs and dead workers older than the retention period; caller holds the lock"""
+        self._conn.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.retention,)
+        )
+        self._conn.execute(
+            "DELETE FROM workers WHERE status IN ('dead', 'stopped') AND last_seen < ?", (now - self.retention,)
+        )
+
+    def stats(self):
+        # Workers that haven't checked in for a few lease periods are reported as lost
+        cutoff = time.time() - 3 * self.lease_seconds
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            workers = self._conn.execute(
+                "SELECT worker, pid, concurrency, status, last_seen FROM workers"
+                " WHERE status NOT IN ('dead', 'stopped')"
+            ).fetchall()
+        live = [row for row in workers if row[4] >= cutoff]
+        return {
+            "backend": "broker",
+            "workers": len(live),
+            "concurrency": sum(row[2] for row in live),
+            "worker_processes": {row[0]: {"pid": row[1], "status": row[3]} for row in live},
+            "jobs": counts,
+        }
+
+
+def _outcome(result, error):
+    """What a waiting caller gets back for a finished job"""
+    return result if result is not None else {"error": error}
+
+
+def _timeout_message(timeout):
+    return f"No scraping worker finished the job within {timeout:g}s"
+
+
+def worker_name(pid=None):
+    """Broker identity of a worker process"""
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+def default_broker():
+    """Broker configured from the environment"""
+    return JobBroker(
+        os.getenv('BROKER_PATH', 'job_broker.sqlite3'),
+        lease_seconds=float(os.getenv('BROKER_LEASE_SECONDS', '30')),
+        max_attempts=int(os.getenv('BROKER_MAX_ATTEMPTS', '3')),
+    )
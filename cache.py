@@ -0,0 +1,94 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+
+# Volatile fields go stale quickly; everything else defaults to DEFAULT_TTL
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_FIELD_TTLS = {
+    'star_rating': 6 * 3600,
+    'review_count': 6 * 3600,
+    'top_reviews': 6 * 3600,
+    'hours_of_operation': 24 * 3600,
+}
+
+
+def normalize_query(text):
+    """Canonical cache key for a business name or domain"""
+    return re.sub(r'\s+', ' ', (text or '').strip().lower())
+
+
+class ResultCache:
+    """SQLite-backed cache of formatted scrape results with LRU eviction
+
+    An entry is fresh until its shortest populated field TTL runs out, then
+    stale (still served, but due for a refresh) for ``stale_ttl`` seconds,
+    after which it is treated as a miss.
+    """
+
+    def __init__(self, path, max_entries=1000, default_ttl=DEFAULT_TTL, field_ttls=None, stale_ttl=24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS if field_ttls is None else field_ttls)
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._conn.commit()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _ttl_for(self, data):
+        """Shortest TTL among the fields that actually carry a value"""
+        ttls = [self.field_ttls.get(field, self.default_ttl) for field, value in data.items() if value]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get(self, key):
+        """Return (data, age_seconds, stale) or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now > row[2] + self.stale_ttl:
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            stale = now > row[2]
+            self._stats['stale_hits' if stale else 'hits'] += 1
+        return json.loads(row[0]), now - row[1], stale
+
+    def set(self, key, data):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, data, fetched_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(data), now, now + self._ttl_for(data), now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        cursor = self._conn.execute(
+            "DELETE FROM results WHERE key NOT IN"
+            " (SELECT key FROM results ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._stats['evictions'] += cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return dict(self._stats, entries=entries, max_entries=self.max_entries)
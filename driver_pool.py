@@ -0,0 +1,197 @@
+import threading
+import time
+from contextlib import contextmanager
+from metrics import STAGE_LATENCY, stage
+from tracing import record_span
+
+
+class PoolTimeout(Exception):
+    """Raised when no driver becomes available within the acquire timeout"""
+
+
+class _PooledDriver:
+    """A driver plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, driver, key=None):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Bounded pool of warm Selenium drivers that are reused across jobs
+
+    Drivers may be checked out by ``key`` (an identity); those are launched
+    with ``factory(key)``, only handed back out for the same key, and keep
+    their cookies between jobs.
+    """
+
+    def __init__(self, factory, size=2, max_uses=50, acquire_timeout=30):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'acquisitions': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+        }
+
+    @contextmanager
+    def driver(self, timeout=None, key=None):
+        """Check out a driver for the duration of a job
+
+        ``timeout`` defaults to ``acquire_timeout``; 0 or less raises PoolTimeout at once.
+        """
+        entry = self._acquire(timeout, key)
+        try:
+            yield entry.driver
+        finally:
+            self._release(entry)
+
+    def _acquire(self, timeout=None, key=None):
+        """Take an idle driver for the key, launch a new one if under capacity, or wait"""
+        started = time.monotonic()
+        if timeout is None:
+            timeout = self.acquire_timeout
+        # Only None waits forever; an expired or cancelled budget hands in 0 and must not queue
+        if timeout is not None and timeout <= 0:
+            raise PoolTimeout("No time left to wait for a driver")
+        deadline = started + timeout if timeout is not None else None
+        retired = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Driver pool is closed")
+                entry = self._take_idle(key)
+                if entry:
+                    break
+                if self._live < self.size:
+                    # Reserve the slot now and launch Chrome outside the lock
+                    self._live += 1
+                    break
+                if self._idle:
+                    # Full of other keys' idle drivers: hand the least recently used one's slot to this key
+                    retired = self._idle.pop(0)
+                    self._stats['recycled'] += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No driver available after {timeout}s")
+                self._cond.wait(remaining)
+
+        if retired:
+            self._quit(retired.driver)
+        launched = entry is None
+        if launched:
+            try:
+                with stage('driver_launch'):
+                    entry = _PooledDriver(self.factory(key) if key is not None else self.factory(), key)
+            except Exception:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats['created'] += 1
+
+        waited = time.monotonic() - started
+        STAGE_LATENCY.observe(waited, stage='driver_acquire')
+        record_span('driver_acquire', waited, launched=launched)
+        with self._cond:
+            self._stats['acquisitions'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+        entry.uses += 1
+        return entry
+
+    def _take_idle(self, key):
+        """Pop the most recently used idle driver for a key; caller holds the lock"""
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index].key == key:
+                return self._idle.pop(index)
+        return None
+
+    def _release(self, entry):
+        """Return a driver to the pool, or retire it if worn out or broken"""
+        healthy = self._reset(entry.driver, keep_cookies=entry.key is not None)
+        if not healthy:
+            with self._cond:
+                self._stats['crashed'] += 1
+        elif entry.uses >= self.max_uses:
+            with self._cond:
+                self._stats['recycled'] += 1
+
+        if healthy and entry.uses < self.max_uses and not self._closed:
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+            return
+
+        self._quit(entry.driver)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    def _reset(self, driver, keep_cookies=False):
+        """Clear cookies, storage and extra tabs so the next job starts clean
+
+        A keyed driver keeps its cookies: they are its identity's cookie jar.
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            if not keep_cookies:
+                driver.delete_all_cookies()
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Pool size and wait-time statistics"""
+        with self._cond:
+            acquisitions = self._stats['acquisitions']
+            return {
+                'max_size': self.size,
+                'live': self._live,
+                'idle': len(self._idle),
+                'in_use': self._live - len(self._idle),
+                'max_uses': self.max_uses,
+                'created': self._stats['created'],
+                'recycled': self._stats['recycled'],
+                'crashed': self._stats['crashed'],
+                'acquisitions': acquisitions,
+                'avg_wait_seconds': round(self._stats['wait_time_total'] / acquisitions, 4) if acquisitions else 0.0,
+                'max_wait_seconds': round(self._stats['wait_time_max'], 4),
+            }
+
+    def close(self):
+        """Quit every idle driver and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry.driver)
@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import soupsieve
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from utils import clean_text, extract_rating
+from metrics import FIELD_LATENCY, FIELD_RESULTS
+from tracing import record_span
+
+# lxml is much faster than the pure-Python parser but is optional (see requirements_alternative.txt)
+try:
+    import lxml  # noqa: F401
+    HTML_PARSERS = ('lxml', 'html.parser')
+except ImportError:
+    HTML_PARSERS = ('html.parser',)
+
+DEFAULT_HTML_PARSER = os.getenv('HTML_PARSER', HTML_PARSERS[0])
+if DEFAULT_HTML_PARSER not in HTML_PARSERS:
+    DEFAULT_HTML_PARSER = HTML_PARSERS[0]
+
+
+def _first_int(text):
+    """First integer in a string such as '(1,234 reviews)', or None"""
+    numbers = re.findall(r'\d+', text or '')
+    return int(numbers[0]) if numbers else None
+
+
+class FieldSpec:
+    """Declarative description of where a listing field lives in the page
+
+    ``selectors`` are tried in order and the first one that matches wins.
+    ``attr`` reads an attribute instead of the element text, ``parse``
+    post-processes the raw string (returning None drops the field) and
+    ``many`` collects every match into a list.
+    """
+
+    def __init__(self, selectors, attr=None, parse=clean_text, many=False, required=False):
+        self.selectors = [selectors] if isinstance(selectors, str) else list(selectors)
+        # Compile once at import rather than on every select() call
+        self._compiled = [soupsieve.compile(selector) for selector in self.selectors]
+        self.attr = attr
+        self.parse = parse
+        self.many = many
+        self.required = required
+
+    def _read_soup(self, element):
+        if self.attr:
+            return element.get(self.attr, '') or ''
+        return element.get_text()
+
+    def _read_driver(self, element):
+        if self.attr:
+            return element.get_attribute(self.attr) or ''
+        return element.text
+
+    def _convert(self, raw):
+        return self.parse(raw) if self.parse else raw
+
+    def from_soup(self, soup):
+        for pattern in self._compiled:
+            if self.many:
+                elements = pattern.select(soup)
+                if elements:
+                    return [self._convert(self._read_soup(elem)) for elem in elements]
+            else:
+                element = pattern.select_one(soup)
+                if element is not None:
+                    return self._convert(self._read_soup(element))
+        return None
+
+    def from_driver(self, driver):
+        for selector in self.selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if not elements:
+                continue
+            if self.many:
+                return [self._convert(self._read_driver(elem)) for elem in elements]
+            return self._convert(self._read_driver(elements[0]))
+        return None
+
+
+# Google Maps place page
+MAPS_FIELDS = {
+    'business_name': FieldSpec('h1, .fontHeadlineLarge', required=True),
+    'star_rating': FieldSpec('[aria-label*="stars"], .fontDisplayLarge', parse=extract_rating, required=True),
+    'review_count': FieldSpec('[aria-label*="reviews"]', parse=_first_int),
+    'address': FieldSpec('[data-item-id*="address"]'),
+    'phone_number': FieldSpec('[data-item-id*="phone"]'),
+    'website_url': FieldSpec('[data-item-id*="authority"]', attr='href', parse=None),
+    'hours_of_operation': FieldSpec('[data-item-id*="hours"]'),
+    'categories': FieldSpec('[data-item-id*="category"]', many=True),
+}
+
+# Google Search knowledge panel / results page
+SEARCH_FIELDS = {
+    'business_name': FieldSpec(['h3', '.LC20lb', '.r'], required=True),
+    'star_rating': FieldSpec('[aria-label*="stars"]', attr='aria-label', parse=extract_rating),
+    'review_count': FieldSpec('[aria-label*="reviews"]', attr='aria-label', parse=_first_int),
+    'address': FieldSpec('.adr, [data-ved*="address"]'),
+    'phone_number': FieldSpec('[data-ved*="phone"]'),
+    'website_url': FieldSpec('a[href*="http"]', attr='href', parse=None),
+}
+
+
+def parse_html(markup, parser=None):
+    """Parse raw HTML into a soup the field tables can query
+
+    Uses lxml when it is installed, otherwise the standard library parser.
+    Set HTML_PARSER=html.parser to force the pure-Python parser.
+    """
+    return BeautifulSoup(markup, parser or DEFAULT_HTML_PARSER)
+
+
+def _record_field(source, name, started, value):
+    """Per-field latency and hit/miss metrics, labelled by page source, plus a trace span"""
+    elapsed = time.perf_counter() - started
+    FIELD_LATENCY.observe(elapsed, source=source, field=name)
+    FIELD_RESULTS.inc(source=source, field=name, result='miss' if value is None else 'hit')
+    record_span(f'field:{name}', elapsed, source=source, found=value is not None)
+
+
+def extract_fields(soup, table, source=None):
+    """Apply a field table to a parsed page
+
+    Fields that are absent, or whose parser returns None, are left out of
+    the result. Returns None when a required field is missing. Passing
+    ``source`` records per-field metrics under that label.
+    """
+    data = {}
+    for name, spec in table.items():
+        started = time.perf_counter()
+        value = spec.from_soup(soup)
+        if source:
+            _record_field(source, name, started, value)
+        if value is None:
+            if spec.required:
+                return None
+            continue
+        data[name] = value
+    return data
+
+
+def extract_fields_from_driver(driver, table, source=None):
+    """Apply a field table through live WebDriver lookups, one per selector"""
+    data = {}
+    for name, spec in table.items():
+        started = time.perf_counter()
+        try:
+            value = spec.from_driver(driver)
+        except Exception:
+            value = None
+        if source:
+            _record_field(source, name, started, value)
+        if value is None:
+            if spec.required:
+                return None
+            continue
+        data[name] = value
+    return data
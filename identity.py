@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import requests
+from fake_useragent import UserAgent
+from blocking import BENCHED, THROTTLE_KINDS, BlockedError
+
+# Headers every identity sends along with its own user agent
+BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Health score bounds and how hard each outcome moves it
+MIN_SCORE = 0.05
+SUCCESS_WEIGHT = 0.1
+BLOCK_PENALTY = 0.5
+ERROR_PENALTY = 0.75
+
+
+def redact_proxy(proxy):
+    """Proxy URL without its credentials, safe for /health and logs"""
+    if not proxy:
+        return None
+    parsed = urlparse(proxy)
+    if not parsed.password and not parsed.username:
+        return proxy
+    return parsed._replace(netloc=parsed.hostname + (f':{parsed.port}' if parsed.port else '')).geturl()
+
+
+class Identity:
+    """One consistent client: user agent, cookie jar and optional proxy
+
+    The requests session holds the Search cookie jar; pooled Chrome drivers
+    launched for this identity keep theirs between jobs.
+    """
+
+    def __init__(self, name, user_agent, proxy=None):
+        self.name = name
+        self.user_agent = user_agent
+        self.proxy = proxy
+        self.headers = dict(BASE_HEADERS, **{'User-Agent': user_agent})
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        if proxy:
+            self.session.proxies = {'http': proxy, 'https': proxy}
+        self.score = 1.0
+        self.benched_until = 0.0
+        self.blocks_in_a_row = 0
+        self.in_use = 0
+        self.stats = {'checkouts': 0, 'successes': 0, 'blocks': 0, 'errors': 0, 'benched': 0}
+
+
+class IdentityPool:
+    """Hands out identities per request and benches the ones Google blocks
+
+    Each checkout goes to the identity carrying the least load for its
+    health score, so parallel requests spread over every identity. An
+    identity that hits a CAPTCHA or 429, or whose proxy fails, sits out
+    ``bench_seconds``, doubling with each block in a row up to
+    ``max_bench_seconds``.
+    """
+
+    def __init__(self, identities, bench_seconds=120, max_bench_seconds=3600):
+        self.identities = list(identities)
+        self.bench_seconds = bench_seconds
+        self.max_bench_seconds = max_bench_seconds
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def checkout(self, timeout=None, path='maps'):
+        """Check out an identity for the duration of one Google request"""
+        identity = self.acquire(timeout, path)
+        try:
+            yield identity
+        finally:
+            self.release(identity)
+
+    def acquire(self, timeout=None, path='maps'):
+        """Take the best available identity, waiting for a bench to end if all are benched
+
+        Raises BlockedError when every identity stays benched past ``timeout``.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                now = time.time()
+                available = [identity for identity in self.identities if identity.benched_until <= now]
+                if available:
+                    identity = min(available, key=lambda item: (item.in_use + 1) / item.score)
+                    identity.in_use += 1
+                    identity.stats['checkouts'] += 1
+                    return identity
+
+                wait = min(identity.benched_until for identity in self.identities) - now
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining < wait:
+                        raise BlockedError(BENCHED, path)
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    def release(self, identity):
+        with self._cond:
+            identity.in_use -= 1
+
+    def report_success(self, identity):
+        """Google answered normally"""
+        with self._cond:
+            identity.score += (1 - identity.score) * SUCCESS_WEIGHT
+            identity.blocks_in_a_row = 0
+            identity.stats['successes'] += 1
+
+    def report_block(self, identity, kind):
+        """Google served a block page; throttles bench the identity, consent walls only cost score"""
+        with self._cond:
+            identity.score = max(MIN_SCORE, identity.score * BLOCK_PENALTY)
+            identity.stats['blocks'] += 1
+            if kind in THROTTLE_KINDS:
+                self._bench(identity)
+
+    def report_error(self, identity):
+        """The identity's proxy refused or dropped the connection"""
+        with self._cond:
+            identity.score = max(MIN_SCORE, identity.score * ERROR_PENALTY)
+            identity.stats['errors'] += 1
+            self._bench(identity)
+
+    def _bench(self, identity):
+        """Take an identity out of rotation; caller holds the lock"""
+        seconds = min(self.bench_seconds * 2 ** identity.blocks_in_a_row, self.max_bench_seconds)
+        identity.benched_until = time.time() + seconds
+        identity.blocks_in_a_row += 1
+        identity.stats['benched'] += 1
+
+    def health(self):
+        """Current health score of each identity"""
+        with self._cond:
+            return {(identity.name,): identity.score for identity in self.identities}
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            return {
+                identity.name: dict(
+                    identity.stats,
+                    proxy=redact_proxy(identity.proxy),
+                    user_agent=identity.user_agent,
+                    score=round(identity.score, 3),
+                    in_use=identity.in_use,
+                    benched_for_seconds=round(max(identity.benched_until - now, 0.0), 1),
+                )
+                for identity in self.identities
+            }
+
+
+def default_identity_pool():
+    """Identity pool configured from the environment: one identity per proxy by default"""
+    proxies = [proxy.strip() for proxy in os.getenv('SCRAPER_PROXIES', '').split(',') if proxy.strip()]
+    size = max(int(os.getenv('IDENTITY_POOL_SIZE', str(len(proxies) or 1))), 1)
+    user_agents = UserAgent()
+    identities = [
+        Identity(f'identity-{index}', user_agents.random, proxies[index % len(proxies)] if proxies else None)
+        for index in range(size)
+    ]
+    return IdentityPool(
+        identities,
+        bench_seconds=float(os.getenv('IDENTITY_BENCH_SECONDS', '120')),
+        max_bench_seconds=float(os.getenv('IDENTITY_MAX_BENCH_SECONDS', '3600')),
+    )
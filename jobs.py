@@ -0,0 +1,79 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueue:
+    """In-process work queue that runs extraction jobs on a thread pool
+
+    Jobs are kept in memory so their status can be polled; finished jobs are
+    dropped after ``retention`` seconds, or oldest-first once ``max_jobs`` is
+    exceeded.
+    """
+
+    def __init__(self, handler, workers=2, retention=3600, max_jobs=1000):
+        self.handler = handler
+        self.workers = workers
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract-job')
+
+    def submit(self, payload):
+        """Queue a job and return its ID immediately"""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job_id, payload)
+        return job_id
+
+    def _run(self, job_id, payload):
+        self._update(job_id, status="running", started_at=time.time())
+        try:
+            result = self.handler(payload)
+            status = "failed" if 'error' in result else "completed"
+            self._update(job_id, status=status, result=result, finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _prune(self):
+        """Forget old finished jobs; caller holds the lock"""
+        cutoff = time.time() - self.retention
+        for job_id in [j for j, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+        while len(self._jobs) >= self.max_jobs:
+            finished = [job for job in self._jobs.values() if job["finished_at"]]
+            if not finished:
+                break
+            del self._jobs[min(finished, key=lambda job: job["finished_at"])["job_id"]]
+
+    def get(self, job_id):
+        """Snapshot of a job's state, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": self.workers, "jobs": counts}
@@ -1,7 +1,20 @@
-from flask import Flask, request, jsonify
-from scraper import GoogleBusinessScraper
+from flask import Flask, request, jsonify, Response, stream_with_context
+from scraper import GoogleBusinessScraper, TIERS, RESPONSE_FIELDS
+from jobs import JobQueue
+from broker import JobTimeout, default_broker
+from blocking import BlockedError
+from rate_limiter import RateLimited
+from strategies import STRATEGIES
+from webhooks import default_dispatcher, SUCCESS_CODES
+from review_sync import default_review_store, sync_reviews
+from reviews import HarvestStatus
+from metrics import REGISTRY, WEBHOOK_LATENCY, WEBHOOK_RESULTS, DRIVER_POOL, CACHE_ENTRIES, RATE_LIMIT_RATE, \
+    IDENTITY_HEALTH
+from tracing import TRACE_FILE, trace, span
 from utils import clean_text, format_phone_number, format_hours
+import itertools
 import json
+import math
 import requests
 import os
 from dotenv import load_dotenv
@@ -15,9 +28,56 @@ app = Flask(__name__)
 # Initialize scraper
 scraper = GoogleBusinessScraper()
 
+# Where scrapes run: 'thread' in this process, 'broker' on the worker fleet started by worker.py
+JOB_BACKEND = os.getenv('JOB_BACKEND', 'thread')
+# Longest a request waits on the fleet for one scrape, queueing included
+BROKER_WAIT_TIMEOUT = float(os.getenv('BROKER_WAIT_TIMEOUT', '120'))
+
+if JOB_BACKEND == 'broker':
+    job_queue = default_broker()
+else:
+    # Background workers for async extraction requests; size them to the browser pool
+    job_queue = JobQueue(
+        lambda job: run_extraction(**job),
+        workers=int(os.getenv('JOB_WORKERS', str(scraper.driver_pool.size)))
+    )
+
 # Mock Zapier webhook URL (replace with actual webhook URL in production)
 ZAPIER_WEBHOOK_URL = os.getenv('ZAPIER_WEBHOOK_URL', 'https://webhook.site/your-unique-url')
 
+# Webhook delivery: 'async' queues POSTs in a durable outbox, 'sync' sends them inline
+WEBHOOK_DELIVERY = os.getenv('WEBHOOK_DELIVERY', 'async')
+WEBHOOK_COALESCE = os.getenv('WEBHOOK_COALESCE', '0') == '1'
+# The Zapier envelope is applied when a delivery is sent, so coalesced deliveries get one envelope
+webhook_dispatcher = default_dispatcher(envelopes={'zapier': lambda data: zapier_payload(data)})
+webhook_dispatcher.start()
+
+# Resource gauges are read from their owners whenever /metrics is scraped
+def driver_pool_gauge():
+    stats = scraper.driver_pool.stats()
+    return {(state,): stats[state] for state in ('live', 'idle', 'in_use')}
+
+DRIVER_POOL.set_function(driver_pool_gauge)
+CACHE_ENTRIES.set_function(lambda: scraper.cache.stats()['entries'] if scraper.cache else 0)
+RATE_LIMIT_RATE.set_function(lambda: scraper.rate_limiter.rates() if scraper.rate_limiter else {})
+IDENTITY_HEALTH.set_function(scraper.identity_pool.health)
+
+# Upper bound callers may request for a single scrape
+MAX_TIME_BUDGET = 60
+
+# Upper bound callers may request for a review harvest
+MAX_REVIEW_TIME_BUDGET = float(os.getenv('MAX_REVIEW_TIME_BUDGET', '900'))
+
+# Review IDs already delivered per business, for incremental /reviews/sync runs
+review_store = default_review_store()
+
+# Limits for /extract/batch
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '500'))
+MAX_BATCH_CONCURRENCY = int(os.getenv('MAX_BATCH_CONCURRENCY', '16'))
+
+# Streamed batches flush found listings to the webhook in chunks of this size
+WEBHOOK_CHUNK_SIZE = int(os.getenv('WEBHOOK_CHUNK_SIZE', '50'))
+
 @app.route('/extract', methods=['POST'])
 def extract_business_data():
     """
@@ -27,63 +87,262 @@ def extract_business_data():
     {
         "business_name": "Freedom Finders Firm",
         "website_url": "https://freedomfindersfirm.com",  # optional
-        "return_webhook_url": "https://hooks.zapier.com/xyz"  # optional
+        "return_webhook_url": "https://hooks.zapier.com/xyz",  # optional
+        "time_budget": 10,  # optional, max seconds to spend scraping
+        "use_cache": true,  # optional, set false to force a fresh scrape
+        "strategies": ["maps", "search"],  # optional, lookup strategies in preference order
+        "race": true,  # optional, run strategies in parallel instead of as fallbacks
+        "fields": ["business_name", "star_rating"],  # optional, fields the caller needs
+        "tier": "auto",  # optional, "fast" (HTTP only), "auto" (HTTP, then browser if fields are missing) or "full"
+        "async": false,  # optional, return 202 with a job ID instead of waiting
+        "stream": false  # optional, stream NDJSON events (or send Accept: text/event-stream)
     }
+    
+    Add ?debug=timing to the URL to get a per-stage span timeline back as "timing".
     """
     try:
         # Get JSON data from request
         data = request.get_json()
         
-        if not data:
+        job, request_error = parse_extract_request(data, debug_timing=request.args.get('debug') == 'timing')
+        if request_error:
+            return jsonify({"error": request_error}), 400
+        
+        # Async mode: hand the scrape and webhook delivery to a background worker
+        if data.get('async') is True:
+            job_id = job_queue.submit(job)
+            return jsonify({
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/jobs/{job_id}"
+            }), 202
+        
+        # Streaming mode: send the record before the webhook delivery finishes
+        stream_format = requested_stream_format(data)
+        if stream_format:
+            return stream_response(stream_extraction(**job), stream_format)
+        
+        result = run_extraction(**job)
+        return jsonify(result), extraction_status(result)
+        
+    except JobTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except Exception as e:
+        return jsonify({
+            "error": f"An unexpected error occurred: {str(e)}"
+        }), 500
+
+@app.route('/extract/batch', methods=['POST'])
+def extract_batch():
+    """
+    Extract many Google Business listings concurrently and deliver them in one webhook POST
+    
+    Expected JSON payload:
+    {
+        "businesses": [
+            "Freedom Finders Firm",
+            "https://bluebottlecoffee.com",
+            {"business_name": "Starbucks", "website_url": "https://starbucks.com"}
+        ],
+        "concurrency": 4,  # optional, parallel scrapes (defaults to the browser pool size)
+        "return_webhook_url": "https://hooks.zapier.com/xyz",  # optional
+        "time_budget": 10,  # optional, max seconds per business
+        "use_cache": true,  # optional
+        "strategies": ["maps", "search"], "race": true,  # optional, as for /extract
+        "fields": ["business_name", "star_rating"], "tier": "auto",  # optional, as for /extract
+        "stream": false  # optional, stream NDJSON events (or send Accept: text/event-stream)
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        batch, request_error = parse_batch_request(data)
+        if request_error:
+            return jsonify({"error": request_error}), 400
+        
+        # Default to one scrape per pooled browser
+        batch['concurrency'] = batch['concurrency'] or scraper.driver_pool.size
+        return_webhook_url = batch.pop('return_webhook_url')
+        batch_results = get_business_data_many(**batch)
+        
+        # Streaming mode: emit each record as soon as it is scraped
+        stream_format = requested_stream_format(data)
+        if stream_format:
+            return stream_response(stream_batch(batch_results, return_webhook_url), stream_format)
+        
+        results = [{"input": search_input, "result": result} for search_input, result in batch_results]
+        found = found_results(results)
+        
+        # One bulk POST for the whole batch instead of one per business
+        webhook_result = deliver_batch_to_webhook(found, return_webhook_url) if found else NO_BATCH_WEBHOOK
+        return jsonify(batch_body(results, webhook_result)), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"An unexpected error occurred: {str(e)}"
+        }), 500
+
+@app.route('/reviews', methods=['POST'])
+def harvest_reviews():
+    """
+    Stream every review of a business, newest first, as NDJSON (or SSE)
+    
+    Expected JSON payload:
+    {
+        "business_name": "Freedom Finders Firm",
+        "website_url": "https://freedomfindersfirm.com",  # optional
+        "limit": 500,  # optional, stop after this many reviews
+        "since": "2024-01-01",  # optional, stop at the first review older than this date
+        "time_budget": 300  # optional, max seconds to spend harvesting
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not isinstance(data, dict) or not data:
             return jsonify({
                 "error": "No JSON data provided. Please send a JSON object with 'business_name' or 'website_url'."
             }), 400
         
-        # Extract business name or URL
         business_name = data.get('business_name', '')
         website_url = data.get('website_url', '')
-        return_webhook_url = data.get('return_webhook_url', '')
-        
         if not business_name and not website_url:
             return jsonify({
                 "error": "Please provide either 'business_name' or 'website_url' in the request body."
             }), 400
         
-        # Use website URL if provided, otherwise use business name
+        options, options_error = parse_review_options(data)
+        if options_error:
+            return jsonify({"error": options_error}), 400
+        
         search_input = website_url if website_url else business_name
+        status = HarvestStatus()
+        harvest = scraper.harvest_reviews(search_input, status=status, **options)
+        # The listing opens before the first review, so failing to reach it still gets a status code
+        try:
+            opened = list(itertools.islice(harvest, 1))
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        except (BlockedError, RateLimited) as e:
+            result = e.to_dict()
+            return jsonify(result), error_status(result)
         
-        # Extract business data
-        result = scraper.get_business_data(search_input)
+        events = stream_reviews(search_input, harvest, status, opened)
+        return stream_response(events, requested_stream_format(data) or 'ndjson')
         
-        # Check if extraction was successful
-        if 'error' in result:
-            return jsonify(result), 404
+    except Exception as e:
+        return jsonify({
+            "error": f"An unexpected error occurred: {str(e)}"
+        }), 500
+
+@app.route('/reviews/sync', methods=['POST'])
+def sync_business_reviews():
+    """
+    Fetch only the reviews posted since the last sync and send them to the webhook
+    
+    Expected JSON payload:
+    {
+        "business_name": "Freedom Finders Firm",
+        "website_url": "https://freedomfindersfirm.com",  # optional
+        "return_webhook_url": "https://hooks.zapier.com/xyz",  # optional
+        "time_budget": 300  # optional, max seconds to spend harvesting
+    }
+    
+    The first sync of a business returns its whole review history.
+    """
+    try:
+        data = request.get_json()
         
-        # Send data to return webhook if provided, otherwise use default
-        if return_webhook_url:
-            webhook_result = send_to_webhook(result, return_webhook_url)
-        else:
-            webhook_result = send_to_zapier(result)
+        if not isinstance(data, dict) or not data:
+            return jsonify({
+                "error": "No JSON data provided. Please send a JSON object with 'business_name' or 'website_url'."
+            }), 400
+        
+        business_name = data.get('business_name', '')
+        website_url = data.get('website_url', '')
+        if not business_name and not website_url:
+            return jsonify({
+                "error": "Please provide either 'business_name' or 'website_url' in the request body."
+            }), 400
+        
+        options, options_error = parse_review_options(data)
+        if options_error:
+            return jsonify({"error": options_error}), 400
+        if options['limit'] is not None or options['since'] is not None:
+            return jsonify({
+                "error": "'limit' and 'since' are not supported by /reviews/sync; it resumes from the last sync."
+            }), 400
         
-        # Add webhook status to response
-        result['webhook_status'] = webhook_result
+        search_input = website_url if website_url else business_name
+        try:
+            delta = sync_reviews(scraper, review_store, search_input, time_budget=options['time_budget'])
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        except (BlockedError, RateLimited) as e:
+            result = e.to_dict()
+            return jsonify(result), error_status(result)
         
-        return jsonify(result), 200
+        # Only new reviews go to the webhook; an unchanged business sends nothing
+        webhook_result = {"status": "skipped", "message": "No new reviews, nothing was sent"}
+        if delta['new_reviews']:
+            webhook_result = deliver_to_webhook({
+                "type": "review_delta",
+                "business": search_input,
+                "count": delta['new_count'],
+                "reviews": delta['new_reviews']
+            }, data.get('return_webhook_url', ''))
+        
+        return jsonify(dict(delta, webhook_status=webhook_result)), 200
         
     except Exception as e:
         return jsonify({
             "error": f"An unexpected error occurred: {str(e)}"
         }), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status and result of an async extraction job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "error": "Job not found. Job results are kept for a limited time after they finish."
+        }), 404
+    return jsonify(job), 200
+
+@app.route('/webhooks/<int:delivery_id>', methods=['GET'])
+def webhook_delivery_status(delivery_id):
+    """Status of a queued webhook delivery"""
+    delivery = webhook_dispatcher.get(delivery_id)
+    if delivery is None:
+        return jsonify({
+            "error": "Delivery not found. Finished deliveries are kept for a limited time."
+        }), 404
+    return jsonify(delivery), 200
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
         "service": "Google Business Scraper",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "driver_pool": scraper.driver_pool.stats(),
+        "cache": scraper.cache.stats() if scraper.cache else None,
+        "place_index": scraper.place_index.stats() if scraper.place_index else None,
+        "rate_limiter": scraper.rate_limiter.stats() if scraper.rate_limiter else None,
+        "identities": scraper.identity_pool.stats(),
+        "job_queue": job_queue.stats(),
+        "strategies": scraper.strategy_stats.snapshot(),
+        "request_coalescing": scraper.singleflight.stats(),
+        "webhooks": webhook_dispatcher.stats(),
+        "review_sync": review_store.stats()
     }), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint with usage instructions"""
@@ -102,23 +361,434 @@ def root():
         },
         "endpoints": {
             "/extract": "Extract business data and send to webhook",
+            "/extract/batch": "Extract many businesses and send them to the webhook in one POST",
+            "/reviews": "Stream every review of a business, newest first",
+            "/reviews/sync": "Send only the reviews posted since the last sync to the webhook",
+            "/jobs/<job_id>": "Status of an async extraction job",
+            "/webhooks/<delivery_id>": "Status of a queued webhook delivery",
             "/health": "Health check",
+            "/metrics": "Prometheus metrics",
             "/": "This help message"
         }
     }), 200
 
+def get_business_data(search_input, **options):
+    """Scrape one business here, or on the worker fleet when JOB_BACKEND=broker"""
+    if JOB_BACKEND != 'broker':
+        return scraper.get_business_data(search_input, **options)
+    return job_queue.run(dict(options, kind='scrape', search_input=search_input), BROKER_WAIT_TIMEOUT)
+
+def get_business_data_many(inputs, concurrency=None, **options):
+    """Scrape many businesses, yielding (input, result) as each finishes
+    
+    On the worker fleet every distinct business is queued at once and
+    ``concurrency`` is set by the fleet size instead.
+    """
+    if JOB_BACKEND != 'broker':
+        yield from scraper.get_business_data_many(inputs, concurrency=concurrency, **options)
+        return
+    
+    names, payloads, timeout = broker_batch(inputs, **options)
+    for index, result in job_queue.run_many(payloads, timeout):
+        for search_input in names[index]:
+            yield search_input, dict(result)
+
+def broker_batch(inputs, **options):
+    """Broker jobs for a batch: (input groups, one scrape payload per group, wait timeout)"""
+    names = scraper.group_inputs(inputs)
+    
+    # Allow one wait per round of jobs the fleet can run side by side
+    fleet = max(job_queue.stats()['concurrency'], 1)
+    timeout = BROKER_WAIT_TIMEOUT * math.ceil(len(names) / fleet)
+    payloads = [dict(options, kind='scrape', search_input=group[0]) for group in names]
+    return names, payloads, timeout
+
+def run_extraction(search_input, return_webhook_url='', debug_timing=False, **options):
+    """Scrape one business and deliver the result to the webhook
+    
+    With ``debug_timing`` (or TRACE_FILE set) the request is traced; the
+    span timeline is attached to the result as ``timing``.
+    """
+    with trace('extract', enabled=debug_timing or bool(TRACE_FILE), input=search_input) as timing:
+        result = get_business_data(search_input, **options)
+        
+        # Only successful extractions are forwarded
+        if 'error' not in result:
+            # Add webhook status to response
+            result['webhook_status'] = deliver_to_webhook(result, return_webhook_url)
+    
+    if debug_timing:
+        result['timing'] = timing.to_dict()
+    return result
+
+def stream_extraction(search_input, return_webhook_url='', debug_timing=False, **options):
+    """Yield the extraction result as soon as it exists, then the webhook status"""
+    with trace('extract', enabled=debug_timing or bool(TRACE_FILE), input=search_input) as timing:
+        try:
+            result = get_business_data(search_input, **options)
+        except JobTimeout as e:
+            result = {"error": str(e)}
+        yield result_event(search_input, result)
+        
+        # Only successful extractions are forwarded
+        if 'error' not in result:
+            yield {"type": "webhook_status", "webhook_status": deliver_to_webhook(result, return_webhook_url)}
+    
+    if debug_timing:
+        yield {"type": "timing", "timing": timing.to_dict()}
+
+def stream_batch(batch_results, return_webhook_url=''):
+    """Yield batch results as they finish, delivering found listings in bounded chunks"""
+    batch = BatchStream()
+    for search_input, result in batch_results:
+        yield batch.add(search_input, result)
+        chunk = batch.take_chunk()
+        if chunk:
+            batch.delivered(deliver_batch_to_webhook(chunk, return_webhook_url))
+    
+    chunk = batch.take_chunk(final=True)
+    if chunk:
+        batch.delivered(deliver_batch_to_webhook(chunk, return_webhook_url))
+    yield batch.summary_event()
+
+def result_event(search_input, result):
+    return {"type": "result", "input": search_input, "result": result}
+
+class BatchStream:
+    """Running totals and webhook chunks for a streamed batch, shared by the Flask and ASGI front ends
+    
+    The caller delivers each chunk ``take_chunk`` hands back (a full one,
+    or with ``final`` whatever is left) and reports the status to ``delivered``.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.found = 0
+        self.pending = []
+        self.webhook_statuses = []
+    
+    def add(self, search_input, result):
+        """Count one result, returning its event"""
+        self.total += 1
+        if 'error' not in result:
+            self.found += 1
+            self.pending.append(result)
+        return result_event(search_input, result)
+    
+    def take_chunk(self, final=False):
+        if len(self.pending) < (1 if final else WEBHOOK_CHUNK_SIZE):
+            return None
+        chunk, self.pending = self.pending, []
+        return chunk
+    
+    def delivered(self, webhook_status):
+        self.webhook_statuses.append(webhook_status)
+    
+    def summary_event(self):
+        return {
+            "type": "summary",
+            "summary": batch_summary(self.total, self.found),
+            "webhook_status": self.webhook_statuses
+        }
+
+# Webhook status of a batch in which nothing was found
+NO_BATCH_WEBHOOK = {"status": "skipped", "message": "No businesses were found, nothing was sent"}
+
+def found_results(results):
+    """Listings found in a list of {"input", "result"} batch items"""
+    return [item["result"] for item in results if 'error' not in item["result"]]
+
+def batch_summary(total, found):
+    return {"total": total, "found": found, "not_found": total - found}
+
+def batch_body(results, webhook_result):
+    """Response body for a batch that isn't streamed"""
+    return {
+        "results": results,
+        "summary": batch_summary(len(results), len(found_results(results))),
+        "webhook_status": webhook_result
+    }
+
+def stream_reviews(search_input, harvest, status, opened=()):
+    """Yield each harvested review as an event, then a summary
+    
+    ``opened`` holds the reviews already taken from ``harvest`` before the
+    response started. A block page or pacing timeout after that ends the
+    stream with an error event carrying its kind, since the 200 is already sent.
+    """
+    count = 0
+    try:
+        for review in itertools.chain(opened, harvest):
+            count += 1
+            yield {"type": "review", "review": review}
+    except (BlockedError, RateLimited) as e:
+        yield dict(e.to_dict(), type="error")
+    except Exception as e:
+        yield {"type": "error", "error": f"Review harvest stopped: {str(e)}"}
+    finally:
+        harvest.close()
+    yield {"type": "summary", "input": search_input, "count": count, "sorted": status.sorted_newest_first,
+           "stopped": status.stop_reason}
+
+def requested_stream_format(data):
+    """'sse' or 'ndjson' when the caller asked for a streamed response, otherwise None"""
+    return stream_format_for(request.headers.get('Accept', ''), data)
+
+def stream_format_for(accept, data):
+    """Stream format from an Accept header and the payload's 'stream' flag, or None"""
+    if 'text/event-stream' in accept:
+        return 'sse'
+    if data.get('stream') is True or 'application/x-ndjson' in accept:
+        return 'ndjson'
+    return None
+
+def encode_event(event, stream_format):
+    """One event as an NDJSON line or a server-sent event"""
+    if stream_format == 'sse':
+        return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    return json.dumps(event) + "\n"
+
+def stream_response(events, stream_format):
+    """Wrap an event generator in a streamed NDJSON or server-sent events response"""
+    def generate():
+        for event in events:
+            yield encode_event(event, stream_format)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def extraction_status(result):
+    """HTTP status for an extraction result"""
+    return error_status(result) if 'error' in result else 200
+
+def error_status(result):
+    """HTTP status for a failed lookup
+    
+    A block page means Google, not the listing, is the problem (503); a
+    lookup paced out of its time budget can be retried later (429).
+    """
+    if result.get('blocked'):
+        return 503
+    if result.get('rate_limited'):
+        return 429
+    return 404
+
+def parse_extract_request(data, debug_timing=False):
+    """Validate an /extract payload, returning (job, error message)
+    
+    The job holds the keyword arguments for run_extraction, stream_extraction
+    and the job queue.
+    """
+    if not isinstance(data, dict) or not data:
+        return None, "No JSON data provided. Please send a JSON object with 'business_name' or 'website_url'."
+    
+    business_name = data.get('business_name', '')
+    website_url = data.get('website_url', '')
+    if not business_name and not website_url:
+        return None, "Please provide either 'business_name' or 'website_url' in the request body."
+    
+    # Optional per-request latency budget in seconds
+    time_budget, budget_error = parse_time_budget(data)
+    if budget_error:
+        return None, budget_error
+    
+    # Optional strategy, tier and field selection
+    options, options_error = parse_scrape_options(data)
+    if options_error:
+        return None, options_error
+    
+    # Use website URL if provided, otherwise use business name
+    return dict(
+        options,
+        search_input=website_url if website_url else business_name,
+        return_webhook_url=data.get('return_webhook_url', ''),
+        time_budget=time_budget,
+        debug_timing=debug_timing
+    ), None
+
+def parse_batch_request(data):
+    """Validate an /extract/batch payload, returning (batch, error message)
+    
+    The batch holds the keyword arguments for get_business_data_many plus
+    'return_webhook_url'. 'concurrency' is None when the caller left it out,
+    so each front end can apply its own default.
+    """
+    inputs, inputs_error = parse_batch_inputs(data)
+    if inputs_error:
+        return None, inputs_error
+    
+    time_budget, budget_error = parse_time_budget(data)
+    if budget_error:
+        return None, budget_error
+    
+    concurrency = data.get('concurrency')
+    if concurrency is not None:
+        try:
+            concurrency = int(concurrency)
+        except (TypeError, ValueError):
+            concurrency = 0
+        if not 1 <= concurrency <= MAX_BATCH_CONCURRENCY:
+            return None, f"'concurrency' must be between 1 and {MAX_BATCH_CONCURRENCY}."
+    
+    options, options_error = parse_scrape_options(data)
+    if options_error:
+        return None, options_error
+    
+    return dict(
+        options,
+        inputs=inputs,
+        concurrency=concurrency,
+        time_budget=time_budget,
+        return_webhook_url=data.get('return_webhook_url', '')
+    ), None
+
+def parse_time_budget(data):
+    """Validate the optional 'time_budget' field, returning (seconds, error message)"""
+    time_budget = data.get('time_budget')
+    if time_budget is None:
+        return None, None
+    try:
+        time_budget = float(time_budget)
+    except (TypeError, ValueError):
+        time_budget = 0
+    if not 0 < time_budget <= MAX_TIME_BUDGET:
+        return None, f"'time_budget' must be a number of seconds between 0 and {MAX_TIME_BUDGET}."
+    return time_budget, None
+
+def parse_batch_inputs(data):
+    """Validate the /extract/batch 'businesses' list, returning (search inputs, error message)"""
+    businesses = data.get('businesses') if isinstance(data, dict) else None
+    if not isinstance(businesses, list) or not businesses:
+        return None, "Please provide a non-empty 'businesses' list of names, website URLs or objects."
+    
+    if len(businesses) > MAX_BATCH_SIZE:
+        return None, f"A batch may contain at most {MAX_BATCH_SIZE} businesses."
+    
+    # Accept plain strings or objects shaped like the /extract payload
+    inputs = []
+    for item in businesses:
+        if isinstance(item, dict):
+            item = item.get('website_url') or item.get('business_name')
+        if not isinstance(item, str) or not item.strip():
+            return None, "Every batch entry needs a 'business_name' or 'website_url'."
+        inputs.append(item.strip())
+    return inputs, None
+
+def parse_review_options(data):
+    """Validate the optional /reviews fields, returning (options, error message)"""
+    limit = data.get('limit')
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return None, "'limit' must be a positive integer."
+    
+    since = data.get('since')
+    if since is not None:
+        try:
+            since = datetime.datetime.fromisoformat(str(since))
+        except ValueError:
+            return None, "'since' must be an ISO date such as '2024-01-31'."
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+    
+    time_budget = data.get('time_budget')
+    if time_budget is not None:
+        try:
+            time_budget = float(time_budget)
+        except (TypeError, ValueError):
+            time_budget = 0
+        if not 0 < time_budget <= MAX_REVIEW_TIME_BUDGET:
+            return None, f"'time_budget' must be a number of seconds between 0 and {MAX_REVIEW_TIME_BUDGET:g}."
+    
+    return {"limit": limit, "since": since, "time_budget": time_budget}, None
+
+def parse_scrape_options(data):
+    """Validate the optional scraping options shared by /extract and /extract/batch
+    
+    Returns (options, error message); options are keyword arguments for
+    GoogleBusinessScraper.get_business_data.
+    """
+    strategies = data.get('strategies')
+    if strategies is not None:
+        if (not isinstance(strategies, list) or not strategies
+                or any(name not in STRATEGIES for name in strategies)):
+            return None, f"'strategies' must be a non-empty list drawn from {list(STRATEGIES)}."
+    
+    race = data.get('race')
+    if race is not None and not isinstance(race, bool):
+        return None, "'race' must be true or false."
+    
+    tier = data.get('tier')
+    if tier is not None and tier not in TIERS:
+        return None, f"'tier' must be one of {list(TIERS)}."
+    
+    fields = data.get('fields')
+    if fields is not None:
+        if (not isinstance(fields, list) or not fields
+                or any(field not in RESPONSE_FIELDS for field in fields)):
+            return None, f"'fields' must be a non-empty list drawn from {list(RESPONSE_FIELDS)}."
+    
+    return {
+        "use_cache": data.get('use_cache', True) is not False,
+        "strategies": strategies,
+        "race": race,
+        "tier": tier,
+        "fields": fields
+    }, None
+
+def deliver_to_webhook(data, return_webhook_url=''):
+    """Send data to return webhook if provided, otherwise use default"""
+    mode = 'async' if WEBHOOK_DELIVERY == 'async' else 'sync'
+    with WEBHOOK_LATENCY.time(mode=mode), span('webhook_delivery', mode=mode):
+        result = _deliver_to_webhook(data, return_webhook_url)
+    WEBHOOK_RESULTS.inc(mode=mode, result=result.get('status', 'error'))
+    return result
+
+def _deliver_to_webhook(data, return_webhook_url=''):
+    if WEBHOOK_DELIVERY == 'async':
+        if return_webhook_url:
+            return queue_webhook(data, return_webhook_url)
+        return queue_webhook(data, ZAPIER_WEBHOOK_URL, envelope='zapier')
+    
+    if return_webhook_url:
+        return send_to_webhook(data, return_webhook_url)
+    return send_to_zapier(data)
+
+def queue_webhook(payload, webhook_url, envelope=None):
+    """Hand a payload to the background dispatcher instead of waiting on the webhook"""
+    delivery_id = webhook_dispatcher.enqueue(webhook_url, payload, coalesce=WEBHOOK_COALESCE, envelope=envelope)
+    return {
+        "status": "queued",
+        "message": "Data queued for webhook delivery",
+        "webhook_url": webhook_url,
+        "delivery_id": delivery_id,
+        "status_url": f"/webhooks/{delivery_id}"
+    }
+
+def zapier_payload(data):
+    """Wrap extracted data in the envelope the Zapier webhook expects"""
+    return {
+        "source": "google_business_scraper",
+        "timestamp": str(datetime.datetime.now()),
+        "business_data": data
+    }
+
+def deliver_batch_to_webhook(businesses, return_webhook_url=''):
+    """Send several extracted listings to the webhook as one bulk POST"""
+    return deliver_to_webhook(
+        {"batch": True, "count": len(businesses), "businesses": businesses},
+        return_webhook_url
+    )
+
 def send_to_webhook(data, webhook_url):
     """Send extracted data to specified webhook URL"""
     try:
-        # Send the business data directly to the webhook
-        response = requests.post(
-            webhook_url,
-            json=data,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        if response.status_code in [200, 201, 202]:
+        # Send the business data directly to the webhook over the pooled session
+        response = webhook_dispatcher.post(webhook_url, data)
+        
+        if response.status_code in SUCCESS_CODES:
             return {
                 "status": "success",
                 "message": f"Data sent to return webhook successfully",
@@ -150,21 +820,12 @@ def send_to_zapier(data):
     """Send extracted data to Zapier webhook"""
     try:
         # Prepare the payload for Zapier
-        webhook_payload = {
-            "source": "google_business_scraper",
-            "timestamp": str(datetime.datetime.now()),
-            "business_data": data
-        }
+        webhook_payload = zapier_payload(data)
         
-        # Send POST request to Zapier webhook
-        response = requests.post(
-            ZAPIER_WEBHOOK_URL,
-            json=webhook_payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
+        # Send POST request to Zapier webhook over the pooled session
+        response = webhook_dispatcher.post(ZAPIER_WEBHOOK_URL, webhook_payload)
         
-        if response.status_code in [200, 201, 202]:
+        if response.status_code in SUCCESS_CODES:
             return {
                 "status": "success",
                 "message": "Data sent to Zapier webhook successfully",
@@ -203,6 +864,3 @@ def internal_error(error):
 if __name__ == '__main__':
     # For development
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
-else:
-    # For production (Render, Replit, etc.)
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000))) 
\ No newline at end of file
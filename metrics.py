@@ -0,0 +1,217 @@
+import threading
+import time
+from contextlib import contextmanager
+from tracing import span
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in pairs]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for a named metric with a fixed set of label names"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def set_function(self, function):
+        """Read the value from ``function()`` at scrape time; it returns {label tuple: value} or a number"""
+        self._function = function
+
+    def render(self):
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                value = {}
+            items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['counts'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, dict(entry, counts=list(entry['counts']))) for key, entry in self._values.items())
+        lines = self._header()
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry['sum'])}")
+            lines.append(f"{self.name}_count{labels} {entry['count']}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Scrape lifecycle
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'scraper_request_duration_seconds', 'End-to-end get_business_data latency', ['outcome']))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'scraper_requests_in_flight', 'get_business_data calls currently running'))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'scraper_stage_duration_seconds', 'Latency of individual scrape stages', ['stage']))
+STAGES_IN_FLIGHT = REGISTRY.register(Gauge(
+    'scraper_stages_in_flight', 'Scrape stages currently running', ['stage']))
+
+# Field extraction
+FIELD_LATENCY = REGISTRY.register(Histogram(
+    'scraper_field_extraction_seconds', 'Time spent extracting one field', ['source', 'field'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)))
+FIELD_RESULTS = REGISTRY.register(Counter(
+    'scraper_field_extractions_total', 'Field extraction outcomes', ['source', 'field', 'result']))
+
+# Webhooks
+WEBHOOK_LATENCY = REGISTRY.register(Histogram(
+    'scraper_webhook_duration_seconds', 'Time spent handing results to a webhook', ['mode']))
+WEBHOOK_RESULTS = REGISTRY.register(Counter(
+    'scraper_webhook_deliveries_total', 'Webhook delivery outcomes', ['mode', 'result']))
+
+# Outbound pacing and block pages
+RATE_LIMIT_WAIT = REGISTRY.register(Histogram(
+    'scraper_rate_limit_wait_seconds', 'Time Google requests spent queued for a rate limit token', ['path'],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)))
+RATE_LIMIT_FEEDBACK = REGISTRY.register(Counter(
+    'scraper_rate_limit_feedback_total', 'Google responses fed back to the rate limiter', ['path', 'signal']))
+BLOCKED_RESPONSES = REGISTRY.register(Counter(
+    'scraper_blocked_responses_total', 'Block pages Google served instead of results', ['path', 'kind']))
+
+# Resource gauges read from their owners at scrape time (see main.py)
+DRIVER_POOL = REGISTRY.register(Gauge(
+    'scraper_driver_pool_drivers', 'Chrome drivers in the pool by state', ['state']))
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    'scraper_cache_entries', 'Entries in the result cache'))
+RATE_LIMIT_RATE = REGISTRY.register(Gauge(
+    'scraper_rate_limit_requests_per_second', 'Current allowed Google request rate per identity', ['identity']))
+IDENTITY_HEALTH = REGISTRY.register(Gauge(
+    'scraper_identity_health', 'Health score (0-1) of each scraping identity', ['identity']))
+
+
+@contextmanager
+def stage(name):
+    """Time one scrape stage, count it as in flight while it runs and trace it as a span"""
+    with STAGES_IN_FLIGHT.track_in_progress(stage=name), STAGE_LATENCY.time(stage=name), span(name):
+        yield
@@ -0,0 +1,128 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from cache import normalize_query
+
+# Maps place pages carry the feature ID (0x...:0x...) and sometimes the public place ID (ChIJ...)
+_FEATURE_ID_RE = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.IGNORECASE)
+_PLACE_ID_RE = re.compile(r'!19s(ChIJ[\w-]+)')
+_DOMAIN_RE = re.compile(r'^[a-z0-9-]+(\.[a-z0-9-]+)*\.[a-z]{2,}$')
+
+
+def is_place_url(url):
+    """Whether a Maps URL points at a single place rather than search results"""
+    return '/maps/place/' in (url or '')
+
+
+def place_id_from_url(url):
+    """Place ID (or feature ID when no place ID is present) embedded in a Maps place URL"""
+    match = _PLACE_ID_RE.search(url or '') or _FEATURE_ID_RE.search(url or '')
+    return match.group(1) if match else ''
+
+
+def index_key(text):
+    """'domain:', 'phone:' or 'name:' key for a business name, domain, URL or phone number"""
+    text = normalize_query(text)
+    if not text:
+        return None
+    if text.startswith(('http://', 'https://')):
+        text = urllib.parse.urlparse(text).netloc
+    if text.startswith('www.'):
+        text = text[4:]
+    if _DOMAIN_RE.match(text):
+        return f'domain:{text}'
+    digits = re.sub(r'\D', '', text)
+    if len(digits) >= 10 and not re.search(r'[a-z]', text):
+        # Drop the US country code so "+1 555..." and "(555)..." share a key
+        return f'phone:{digits[-10:]}'
+    return f'name:{text}'
+
+
+class PlaceIndex:
+    """SQLite index from business names, domains and phone numbers to resolved Maps place URLs
+
+    Every successful Maps scrape that lands on a place page records the
+    canonical URL under the query that found it and under the listing's own
+    name, website domain and phone number, so later lookups for any of them
+    can open the place page directly instead of searching.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS places ("
+            " key TEXT PRIMARY KEY,"
+            " maps_url TEXT NOT NULL,"
+            " place_id TEXT,"
+            " resolved_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS places_maps_url ON places (maps_url)")
+        self._conn.commit()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def lookup(self, query):
+        """Canonical Maps URL recorded for a query, or None"""
+        key = index_key(query)
+        with self._lock:
+            row = self._conn.execute("SELECT maps_url FROM places WHERE key = ?", (key,)).fetchone() if key else None
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE places SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._stats['hits'] += 1
+        return row[0]
+
+    def record(self, query, data):
+        """Index a scraped listing under its query, name, website domain and phone number"""
+        maps_url = (data.get('google_maps_link') or '').split('?')[0]
+        if not is_place_url(maps_url):
+            return
+        keys = {
+            index_key(text)
+            for text in (query, data.get('business_name'), data.get('website_url'), data.get('phone_number'))
+            if text
+        }
+        keys.discard(None)
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO places (key, maps_url, place_id, resolved_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(key, maps_url, place_id_from_url(maps_url), now, now) for key in keys]
+            )
+            self._conn.execute(
+                "DELETE FROM places WHERE key NOT IN"
+                " (SELECT key FROM places ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def forget(self, maps_url):
+        """Drop every key pointing at a place URL that no longer resolves"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM places WHERE maps_url = ?", (maps_url,))
+            self._conn.commit()
+            self._stats['invalidations'] += cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+            return dict(self._stats, entries=entries, max_entries=self.max_entries)
+
+
+def default_place_index():
+    """Index configured from the environment, or None when disabled"""
+    if os.getenv('PLACE_INDEX_ENABLED', '1') != '1':
+        return None
+    return PlaceIndex(
+        os.getenv('PLACE_INDEX_PATH', 'place_index.sqlite3'),
+        max_entries=int(os.getenv('PLACE_INDEX_MAX_ENTRIES', '10000')),
+    )
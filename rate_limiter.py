@@ -0,0 +1,141 @@
+import math
+import os
+import threading
+import time
+from metrics import RATE_LIMIT_WAIT, RATE_LIMIT_FEEDBACK
+
+# Bucket used by callers that don't name an identity
+DEFAULT_IDENTITY = 'default'
+
+
+class RateLimited(Exception):
+    """No token would be free before the caller's time budget runs out"""
+
+    def __init__(self, identity, wait, timeout):
+        super().__init__(
+            f"Google requests are paced and the next slot is {wait:.1f}s away, but only {timeout:.1f}s of the "
+            f"time budget is left. Please try again later."
+        )
+        self.identity = identity
+        self.wait = wait
+
+    def to_dict(self):
+        return {"error": str(self), "rate_limited": True, "retry_after": math.ceil(self.wait)}
+
+
+class _Bucket:
+    """Token bucket whose refill rate moves with AIMD feedback"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.stats = {'granted': 0, 'rejected': 0, 'throttled': 0, 'wait_total': 0.0}
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Paces outbound Google requests with one token bucket per identity
+
+    Callers reserve a token before each request and sleep for the returned
+    delay, so concurrent requests queue in order instead of bursting. Every
+    successful request raises that identity's rate by ``increase`` requests
+    per second, up to ``max_rate``. A 429 or block page multiplies it by
+    ``decrease`` (down to ``min_rate``) and empties the bucket, so the next
+    requests back off straight away.
+    """
+
+    def __init__(self, rate=1.0, burst=3, min_rate=0.1, max_rate=5.0, increase=0.05, decrease=0.5):
+        self.initial_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _bucket(self, identity):
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            bucket = self._buckets[identity] = _Bucket(self.initial_rate, self.burst)
+        return bucket
+
+    def reserve(self, identity=DEFAULT_IDENTITY, timeout=None, path='maps'):
+        """Take a token and return how long to wait before using it
+
+        Raises RateLimited, without taking the token, when the wait would be
+        longer than ``timeout`` seconds.
+        """
+        with self._lock:
+            bucket = self._bucket(identity)
+            bucket.refill(time.monotonic())
+            # Tokens may go negative: each waiter queues behind the ones before it
+            wait = max(0.0, (1 - bucket.tokens) / bucket.rate)
+            if timeout is not None and wait > timeout:
+                bucket.stats['rejected'] += 1
+                raise RateLimited(identity, wait, timeout)
+            bucket.tokens -= 1
+            bucket.stats['granted'] += 1
+            bucket.stats['wait_total'] += wait
+        RATE_LIMIT_WAIT.observe(wait, path=path)
+        return wait
+
+    def acquire(self, identity=DEFAULT_IDENTITY, timeout=None, path='maps'):
+        """Block until a token is available; returns the seconds spent waiting"""
+        wait = self.reserve(identity, timeout, path)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def record_success(self, identity=DEFAULT_IDENTITY, path='maps'):
+        """Additive increase after a request Google answered normally"""
+        with self._lock:
+            bucket = self._bucket(identity)
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+        RATE_LIMIT_FEEDBACK.inc(path=path, signal='success')
+
+    def record_throttle(self, identity=DEFAULT_IDENTITY, path='maps'):
+        """Multiplicative decrease after a 429 or block page"""
+        with self._lock:
+            bucket = self._bucket(identity)
+            bucket.refill(time.monotonic())
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.stats['throttled'] += 1
+        RATE_LIMIT_FEEDBACK.inc(path=path, signal='throttled')
+
+    def rates(self):
+        """Current allowed requests per second for each identity"""
+        with self._lock:
+            return {(identity,): bucket.rate for identity, bucket in self._buckets.items()}
+
+    def stats(self):
+        with self._lock:
+            return {
+                identity: {
+                    'rate': round(bucket.rate, 3),
+                    'granted': bucket.stats['granted'],
+                    'rejected': bucket.stats['rejected'],
+                    'throttled': bucket.stats['throttled'],
+                    'avg_wait_seconds': round(bucket.stats['wait_total'] / bucket.stats['granted'], 3)
+                    if bucket.stats['granted'] else 0.0,
+                }
+                for identity, bucket in self._buckets.items()
+            }
+
+
+def default_rate_limiter():
+    """Limiter configured from the environment, or None when disabled"""
+    if os.getenv('RATE_LIMIT_ENABLED', '1') != '1':
+        return None
+    return RateLimiter(
+        rate=float(os.getenv('RATE_LIMIT_RPS', '1')),
+        burst=int(os.getenv('RATE_LIMIT_BURST', '3')),
+        min_rate=float(os.getenv('RATE_LIMIT_MIN_RPS', '0.1')),
+        max_rate=float(os.getenv('RATE_LIMIT_MAX_RPS', '5')),
+    )
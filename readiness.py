@@ -0,0 +1,92 @@
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Selectors the Maps extractor reads, grouped by how long we are willing to wait for them
+LISTING_SELECTOR = 'h1, .fontHeadlineLarge'
+DETAIL_SELECTORS = [
+    '[aria-label*="stars"], .fontDisplayLarge',
+    '[data-item-id*="address"], [data-item-id*="phone"], [data-item-id*="authority"]',
+]
+
+# Checks every detail selector in a single WebDriver round-trip per poll
+_ALL_PRESENT_SCRIPT = """
+return arguments[0].every(function (selector) {
+    return document.querySelector(selector) !== null;
+});
+"""
+
+
+class LatencyBudget:
+    """Wall-clock time allowance shared by every stage of one request"""
+
+    def __init__(self, total_seconds):
+        self.total = float(total_seconds)
+        self.started = time.monotonic()
+        self._cancelled = threading.Event()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.total - self.elapsed())
+
+    def cancel(self):
+        """Spend the rest of the budget now, e.g. when a racing strategy has already won"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def slice(self, fraction):
+        """A child budget holding a share of the time still remaining"""
+        return LatencyBudget(self.remaining() * fraction)
+
+
+def _all_present(selectors):
+    def condition(driver):
+        return driver.execute_script(_ALL_PRESENT_SCRIPT, selectors)
+    return condition
+
+
+def _or_cancelled(condition, budget):
+    """Stop polling as soon as the budget is cancelled"""
+    def wrapped(driver):
+        return budget.cancelled or condition(driver)
+    return wrapped
+
+
+def wait_for_listing(driver, budget, detail_grace=1.5, poll_frequency=0.1):
+    """Wait until the listing header renders, then briefly for the detail fields
+
+    Returns False when the header never appears within the budget, which means
+    there is no listing to extract. Missing detail fields are not fatal: the
+    extractor simply records them as empty once the grace period runs out.
+    """
+    try:
+        WebDriverWait(driver, budget.remaining(), poll_frequency=poll_frequency).until(
+            _or_cancelled(EC.presence_of_element_located((By.CSS_SELECTOR, LISTING_SELECTOR)), budget)
+        )
+    except (TimeoutException, WebDriverException):
+        return False
+    if budget.cancelled:
+        return False
+
+    grace = min(detail_grace, budget.remaining())
+    if grace > 0:
+        try:
+            WebDriverWait(driver, grace, poll_frequency=poll_frequency).until(
+                _or_cancelled(_all_present(DETAIL_SELECTORS), budget)
+            )
+        except (TimeoutException, WebDriverException):
+            pass
+    return True
@@ -0,0 +1,250 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from cache import normalize_query
+from readiness import LatencyBudget
+from reviews import FINISHED_REASONS, HarvestStatus, ResumePoint
+from scraper import DEFAULT_REVIEW_TIME_BUDGET
+
+# Relative review dates are coarse, so the date cutoff leaves this much slack
+DATE_SLACK = datetime.timedelta(days=31)
+
+
+class ReviewSyncStore:
+    """SQLite record of the reviews already seen for each business
+
+    Keeps the newest ``max_known_ids`` review IDs per business (enough to
+    recognise where the previous sync left off) plus the newest review date,
+    when the business was last synced and whether an earlier sync stopped
+    before the end of the list (``backfill_pending``). A pending backfill
+    also keeps where it got to: the oldest review it reached and how many
+    reviews below the newest one that is (``resume_review_id``,
+    ``resume_depth``).
+    """
+
+    def __init__(self, path, max_known_ids=500):
+        self.path = path
+        self.max_known_ids = max_known_ids
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS review_state ("
+            " business_key TEXT PRIMARY KEY,"
+            " newest_review_id TEXT,"
+            " newest_date TEXT,"
+            " last_synced_at REAL NOT NULL,"
+            " total_seen INTEGER NOT NULL DEFAULT 0,"
+            " backfill_pending INTEGER NOT NULL DEFAULT 0,"
+            " resume_review_id TEXT,"
+            " resume_depth INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Stores created before partial syncs were recorded; every row in them was a complete sync
+        for column in ("backfill_pending INTEGER NOT NULL DEFAULT 0", "resume_review_id TEXT",
+                       "resume_depth INTEGER NOT NULL DEFAULT 0"):
+            try:
+                self._conn.execute(f"ALTER TABLE review_state ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS known_reviews ("
+            " business_key TEXT NOT NULL,"
+            " review_id TEXT NOT NULL,"
+            " seen_at REAL NOT NULL,"
+            " PRIMARY KEY (business_key, review_id))"
+        )
+        self._conn.commit()
+
+    def state(self, business_key):
+        """Sync state for a business, or None if it has never been synced"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_review_id, newest_date, last_synced_at, total_seen, backfill_pending,"
+                " resume_review_id, resume_depth FROM review_state WHERE business_key = ?", (business_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        newest_date = datetime.datetime.fromisoformat(row[1]) if row[1] else None
+        return {
+            "newest_review_id": row[0],
+            "newest_date": newest_date,
+            "last_synced_at": row[2],
+            "total_seen": row[3],
+            "backfill_pending": bool(row[4]),
+            "resume_review_id": row[5],
+            "resume_depth": row[6],
+        }
+
+    def known_ids(self, business_key):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT review_id FROM known_reviews WHERE business_key = ?", (business_key,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, business_key, new_reviews, older_reviews=(), complete=True, resume=None):
+        """Remember a sync; both lists are newest first
+
+        ``new_reviews`` are newer than every known review and
+        ``older_reviews`` were backfilled from below them. An incomplete sync
+        leaves ``backfill_pending`` set until a later one reaches the end of
+        the list, and keeps every known ID until then so the backfill doesn't
+        deliver them again. ``resume`` is its (review ID, depth) resume point.
+        """
+        resume_review_id, resume_depth = resume if resume and not complete else (None, 0)
+        now = time.time()
+        with self._lock:
+            # Oldest first, so a higher rowid always means a newer review
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO known_reviews (business_key, review_id, seen_at) VALUES (?, ?, ?)",
+                [(business_key, review['review_id'], now) for review in reversed(new_reviews)]
+            )
+            # Backfilled reviews go below every rowid in use, newest first, to keep that order
+            for review in older_reviews:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO known_reviews (rowid, business_key, review_id, seen_at)"
+                    " SELECT COALESCE(MIN(rowid), 1) - 1, ?, ?, ? FROM known_reviews",
+                    (business_key, review['review_id'], now)
+                )
+            if complete:
+                self._conn.execute(
+                    "DELETE FROM known_reviews WHERE business_key = ? AND rowid NOT IN ("
+                    " SELECT rowid FROM known_reviews WHERE business_key = ? ORDER BY rowid DESC LIMIT ?)",
+                    (business_key, business_key, self.max_known_ids)
+                )
+            newest = new_reviews[0] if new_reviews else {}
+            self._conn.execute(
+                "INSERT INTO review_state (business_key, newest_review_id, newest_date, last_synced_at, total_seen,"
+                " backfill_pending, resume_review_id, resume_depth)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(business_key) DO UPDATE SET"
+                " newest_review_id = COALESCE(excluded.newest_review_id, newest_review_id),"
+                " newest_date = COALESCE(excluded.newest_date, newest_date),"
+                " last_synced_at = excluded.last_synced_at,"
+                " total_seen = total_seen + excluded.total_seen,"
+                " backfill_pending = excluded.backfill_pending,"
+                " resume_review_id = excluded.resume_review_id,"
+                " resume_depth = excluded.resume_depth",
+                (business_key, newest.get('review_id'), newest.get('date'), now,
+                 len(new_reviews) + len(older_reviews), int(not complete), resume_review_id, resume_depth)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            businesses = self._conn.execute("SELECT COUNT(*) FROM review_state").fetchone()[0]
+            known = self._conn.execute("SELECT COUNT(*) FROM known_reviews").fetchone()[0]
+        return {"businesses": businesses, "known_review_ids": known}
+
+
+def sync_reviews(scraper, store, search_input, time_budget=None, stop_after_known=3):
+    """Fetch only the reviews posted since the last sync of a business
+
+    Reviews are read newest first and reading stops once ``stop_after_known``
+    already-known reviews have been seen in a row. When the panel can't be
+    sorted newest first, known reviews are skipped without ending the read,
+    since new ones may still follow them.
+
+    A sync that stops before that point or the end of the list (time budget,
+    browser error) still records the reviews it delivered and the oldest one
+    it reached, and flags the business so the following syncs read past known
+    reviews, without the date cutoff, until one reaches the end. On a sorted
+    panel each of them reads the reviews newer than the known ones, scrolls
+    past the stretch earlier runs read without reading it, and carries on
+    from the resume point, so the backfill gets further every run.
+    """
+    budget = LatencyBudget(time_budget or DEFAULT_REVIEW_TIME_BUDGET)
+    key = normalize_query(scraper._search_query(search_input))
+    state = store.state(key)
+    known = store.known_ids(key)
+
+    # Until one sync has reached the end of the list, known reviews are no boundary
+    backfilling = state is None or state['backfill_pending']
+
+    # Known IDs mark the boundary; the date cutoff keeps a lost boundary from re-reading everything
+    since = None
+    if state and state['newest_date'] and not backfilling:
+        since = state['newest_date'] - DATE_SLACK
+
+    resume = None
+    if backfilling and state and state['resume_review_id'] and state['newest_review_id']:
+        resume = ResumePoint(state['newest_review_id'], state['resume_review_id'], state['resume_depth'])
+
+    new_reviews = []
+    # While backfilling, reviews after the first known one are older than everything on record
+    older_reviews = []
+    passed_known = False
+    known_streak = 0
+    reached_known = False
+    # How many reviews came back, the last one and whether it came after the skipped stretch
+    read = 0
+    last_read = None
+    read_past_skip = False
+    status = HarvestStatus()
+    harvest = scraper.harvest_reviews(search_input, since=since, time_budget=budget.remaining(), status=status,
+                                      resume=resume)
+    try:
+        for review in harvest:
+            read += 1
+            last_read = review
+            if status.skipped:
+                # The skipped stretch was all known reviews
+                passed_known = True
+                read_past_skip = True
+            if review['review_id'] in known:
+                known_streak += 1
+                passed_known = True
+                if status.sorted_newest_first and not backfilling and known_streak >= stop_after_known:
+                    reached_known = True
+                    break
+                continue
+            known_streak = 0
+            if backfilling and passed_known and status.sorted_newest_first:
+                older_reviews.append(review)
+            else:
+                new_reviews.append(review)
+    finally:
+        harvest.close()
+
+    complete = reached_known or status.stop_reason in FINISHED_REASONS
+    if not status.sorted_newest_first:
+        # The store expects newest first; relevance order only has the approximate dates to go by
+        new_reviews.sort(key=lambda review: review['date'] or '', reverse=True)
+    resume_point = None
+    if status.sorted_newest_first:
+        resume_point = _resume_point(state, read, last_read, read_past_skip, status.skipped, len(new_reviews))
+    store.record(key, new_reviews, older_reviews, complete=complete, resume=resume_point)
+    new_reviews += older_reviews
+
+    return {
+        "business": search_input,
+        "initial": state is None,
+        "complete": complete,
+        "stopped": 'known_reviews' if reached_known else status.stop_reason,
+        "sorted": status.sorted_newest_first,
+        "new_count": len(new_reviews),
+        "new_reviews": new_reviews,
+        "previous_sync_at": state['last_synced_at'] if state else None,
+    }
+
+
+def _resume_point(state, read, last_read, read_past_skip, skipped, new_count):
+    """Deepest review reached so far as (review ID, reviews from the top of the list), or None"""
+    # The last review read is only that deep when nothing skipped lies below it
+    reached = read + skipped if last_read and (read_past_skip or not skipped) else 0
+    # The earlier resume point, pushed down by the new reviews now above it
+    previous = state['resume_depth'] + new_count if state and state['resume_review_id'] else 0
+    if reached > previous:
+        return last_read['review_id'], reached
+    if previous:
+        return state['resume_review_id'], previous
+    return None
+
+
+def default_review_store():
+    """Store configured from the environment"""
+    return ReviewSyncStore(
+        os.getenv('REVIEW_SYNC_PATH', 'review_sync.sqlite3'),
+        max_known_ids=int(os.getenv('REVIEW_SYNC_MAX_IDS', '500')),
+    )
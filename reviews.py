@@ -0,0 +1,330 @@
+import datetime
+import re
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from utils import clean_text, extract_rating
+
+REVIEW_SELECTOR = '[data-review-id]'
+
+# Why a harvest stopped
+STOP_LIMIT = 'limit'
+STOP_SINCE = 'since'
+# Scrolling stopped loading new reviews: the end of the list
+STOP_END = 'end'
+STOP_BUDGET = 'budget'
+# The browser failed mid-harvest
+STOP_ERROR = 'error'
+# No reviews appeared on the listing within the budget
+STOP_NO_REVIEWS = 'no_reviews'
+
+# Stop reasons that mean every review the harvest was asked for was read
+FINISHED_REASONS = (STOP_LIMIT, STOP_SINCE, STOP_END, STOP_NO_REVIEWS)
+
+# Place page controls, tried in order; Google renames these often
+REVIEWS_TAB_SELECTORS = [
+    'button[role="tab"][aria-label^="Reviews"]',
+    'button[jsaction*="moreReviews"]',
+    'button[aria-label*="reviews"]',
+]
+SORT_BUTTON_SELECTORS = [
+    'button[aria-label="Sort reviews"]',
+    'button[data-value="Sort"]',
+]
+NEWEST_OPTION_SELECTORS = [
+    '[role="menuitemradio"][data-index="1"]',
+]
+
+# Click the first element matching any of the selectors; returns whether one was found
+_CLICK_FIRST_SCRIPT = """
+for (const selector of arguments[0]) {
+    const el = document.querySelector(selector);
+    if (el) { el.click(); return true; }
+}
+return false;
+"""
+
+# Expand truncated review text ("More") in reviews not read yet
+_EXPAND_SCRIPT = """
+document.querySelectorAll('[data-review-id]:not([data-harvested]) button.w8nwRe, '
+    + '[data-review-id]:not([data-harvested]) button[aria-label="See more"]').forEach(b => b.click());
+"""
+
+# Read every review not seen yet and mark it, so each DOM node is read once
+_READ_SCRIPT = """
+const out = [];
+document.querySelectorAll('[data-review-id]:not([data-harvested])').forEach(node => {
+    node.setAttribute('data-harvested', '1');
+    const pick = (selector, attr) => {
+        const el = node.querySelector(selector);
+        if (!el) return '';
+        return attr ? (el.getAttribute(attr) || '') : el.textContent;
+    };
+    out.push({
+        id: node.getAttribute('data-review-id'),
+        author: pick('.d4r55') || node.getAttribute('aria-label') || '',
+        stars: pick('[aria-label*="star"]', 'aria-label'),
+        date: pick('.rsqaWe'),
+        text: pick('.wiI7pd, .review-snippet')
+    });
+});
+return out;
+"""
+
+# IDs of the loaded reviews not read or skipped yet, in list order
+_PENDING_IDS_SCRIPT = """
+return Array.from(document.querySelectorAll('[data-review-id]:not([data-harvested])'),
+    node => node.getAttribute('data-review-id'));
+"""
+
+# Mark reviews as done without expanding or reading them
+_SKIP_SCRIPT = """
+for (const id of arguments[0]) {
+    document.querySelectorAll('[data-review-id="' + CSS.escape(id) + '"]')
+        .forEach(node => node.setAttribute('data-harvested', '1'));
+}
+"""
+
+# Drop reviews already read, keeping the newest one as the scroll anchor, so the
+# browser's memory stays flat however many reviews the listing has
+_PRUNE_SCRIPT = """
+const done = Array.from(document.querySelectorAll('[data-review-id][data-harvested]'))
+    .filter(node => !node.parentElement.closest('[data-review-id]'));
+done.slice(0, -1).forEach(node => node.remove());
+"""
+
+# Scroll the nearest scrollable ancestor of the reviews to the bottom to load more
+_SCROLL_SCRIPT = """
+const first = document.querySelector('[data-review-id]');
+let el = first ? first.parentElement : null;
+while (el && el.scrollHeight <= el.clientHeight) el = el.parentElement;
+el = el || document.scrollingElement;
+el.scrollTop = el.scrollHeight;
+"""
+
+_RELATIVE_DATE_RE = re.compile(
+    r'(\d+|an?|one)\s+(minute|hour|day|week|month|year)s?\s+ago', re.IGNORECASE
+)
+_UNIT_DAYS = {'minute': 1 / 1440, 'hour': 1 / 24, 'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+
+def parse_review_date(text, now=None):
+    """Approximate datetime for a Maps review date such as '3 weeks ago' or 'a year ago'
+
+    Maps only shows relative dates, so months and years are approximate.
+    Returns None when the text isn't a recognised date.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    text = (text or '').lower()
+    if 'yesterday' in text:
+        return now - datetime.timedelta(days=1)
+    if 'just now' in text or 'moment' in text:
+        return now
+    match = _RELATIVE_DATE_RE.search(text)
+    if not match:
+        return None
+    amount = match.group(1)
+    amount = int(amount) if amount.isdigit() else 1
+    return now - datetime.timedelta(days=amount * _UNIT_DAYS[match.group(2).lower()])
+
+
+def _parse_review(raw, now):
+    review_id = (raw or {}).get('id')
+    if not review_id:
+        return None
+    rating = extract_rating(raw.get('stars', ''))
+    date = parse_review_date(raw.get('date'), now)
+    return {
+        "review_id": review_id,
+        "author": clean_text(raw.get('author', '')),
+        "stars": int(float(rating)) if rating else None,
+        "text": clean_text(raw.get('text', '')),
+        "date_text": clean_text(raw.get('date', '')),
+        "date": date.isoformat() if date else None,
+        "_date": date,
+    }
+
+
+def click_first(driver, selectors):
+    """Click the first element matching any selector; False when none is present"""
+    try:
+        return bool(driver.execute_script(_CLICK_FIRST_SCRIPT, selectors))
+    except WebDriverException:
+        return False
+
+
+class HarvestStatus:
+    """What a harvest learned about the panel, filled in as it runs
+
+    ``sorted_newest_first`` is False when the sort menu or its "Newest"
+    option wasn't found; the list is then in Google's relevance order and
+    neither a date cutoff nor a run of already-known reviews marks the end
+    of the new ones. ``stop_reason`` is one of the STOP_* values, or None
+    while the harvest runs and when the caller closed it early. ``skipped``
+    counts the reviews passed over for a ResumePoint; it is updated before
+    the first review below them is yielded.
+    """
+
+    def __init__(self):
+        self.sorted_newest_first = False
+        self.stop_reason = None
+        self.skipped = 0
+
+
+class ResumePoint:
+    """Stretch of a newest-first list that an earlier harvest already read
+
+    Skipping starts at ``first_id`` and ends after ``last_id``, or after
+    ``depth`` reviews if that one was deleted. Skipped reviews are only
+    scrolled past: not expanded, read or yielded.
+    """
+
+    def __init__(self, first_id, last_id, depth):
+        self.first_id = first_id
+        self.last_id = last_id
+        self.depth = depth
+
+
+def open_reviews_panel(driver, budget):
+    """Switch a Maps place page to its reviews list
+
+    Returns False when no reviews appear within the budget.
+    """
+    click_first(driver, REVIEWS_TAB_SELECTORS)
+    try:
+        WebDriverWait(driver, max(budget.remaining(), 0.1), poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_SELECTOR))
+        )
+    except (TimeoutException, WebDriverException):
+        return False
+    return True
+
+
+def sort_newest_first(driver, budget, settle=1.0):
+    """Sort an open reviews panel newest first; returns whether the sort was applied"""
+    if not click_first(driver, SORT_BUTTON_SELECTORS):
+        return False
+    time.sleep(min(settle, budget.remaining()))
+    if not click_first(driver, NEWEST_OPTION_SELECTORS):
+        return False
+    time.sleep(min(settle, budget.remaining()))
+    return True
+
+
+class _Skipper:
+    """Tracks a harvest's way through a ResumePoint, one loaded batch at a time"""
+
+    def __init__(self, resume):
+        self.resume = resume
+        self.skipping = False
+        self.done = resume is None
+        self.skipped = 0
+
+    def take(self, pending_ids):
+        """IDs to skip from this batch, and the IDs above them that are still read normally"""
+        above, skip = [], []
+        # Nested nodes repeat their review's ID
+        for review_id in dict.fromkeys(pending_ids):
+            if self.done:
+                break
+            if not self.skipping and review_id == self.resume.first_id:
+                self.skipping = True
+            if not self.skipping:
+                above.append(review_id)
+                continue
+            skip.append(review_id)
+            self.skipped += 1
+            if review_id == self.resume.last_id or self.skipped >= self.resume.depth:
+                self.done = True
+        return set(above), skip
+
+
+def _wait_for_reviews(driver, budget, pause, poll=0.1):
+    """Wait up to ``pause`` for the panel to load reviews not read yet"""
+    deadline = time.monotonic() + (pause if budget is None else min(pause, budget.remaining()))
+    while time.monotonic() < deadline:
+        try:
+            if driver.execute_script(_PENDING_IDS_SCRIPT):
+                return
+        except WebDriverException:
+            # The next read reports the failure
+            return
+        time.sleep(poll)
+
+
+def harvest_reviews(driver, limit=None, since=None, budget=None, scroll_pause=0.8, max_idle_scrolls=3,
+                    prune=True, status=None, resume=None):
+    """Yield every review on an open Maps reviews panel, scrolling to load more
+
+    Reviews are yielded as they are read and deduplicated by review ID.
+    Harvesting stops after ``limit`` reviews, at the first review older than
+    ``since`` (a timezone-aware datetime; the panel should be sorted newest
+    first), when the budget runs out, or when ``max_idle_scrolls`` scrolls
+    in a row load nothing new. With ``prune`` set, reviews already read are
+    removed from the page so neither side holds the full history in memory.
+    Which of these ended it is recorded on ``status`` (a HarvestStatus).
+    A ``resume`` (ResumePoint) stretch is scrolled past without reading it,
+    waiting only as long as each page takes to load.
+    """
+    status = status or HarvestStatus()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    skipper = _Skipper(resume)
+    seen = set()
+    yielded = 0
+    idle = 0
+
+    while budget is None or not budget.expired():
+        above, skipped = set(), []
+        try:
+            if not skipper.done:
+                above, skipped = skipper.take(driver.execute_script(_PENDING_IDS_SCRIPT) or [])
+                if skipped:
+                    driver.execute_script(_SKIP_SCRIPT, skipped)
+                    seen.update(skipped)
+            driver.execute_script(_EXPAND_SCRIPT)
+            batch = driver.execute_script(_READ_SCRIPT) or []
+        except WebDriverException:
+            status.stop_reason = STOP_ERROR
+            return
+
+        new = len(skipped)
+        for raw in batch:
+            review = _parse_review(raw, now)
+            if review is None or review['review_id'] in seen:
+                continue
+            seen.add(review['review_id'])
+            new += 1
+            # Reviews loaded below the skipped stretch come after it
+            if review['review_id'] not in above:
+                status.skipped = skipper.skipped
+
+            date = review.pop('_date')
+            if since is not None and date is not None and date < since:
+                status.stop_reason = STOP_SINCE
+                return
+            yield review
+            yielded += 1
+            if limit and yielded >= limit:
+                status.stop_reason = STOP_LIMIT
+                return
+
+        status.skipped = skipper.skipped
+        idle = 0 if new else idle + 1
+        if idle >= max_idle_scrolls:
+            status.stop_reason = STOP_END
+            return
+
+        try:
+            if prune:
+                driver.execute_script(_PRUNE_SCRIPT)
+            driver.execute_script(_SCROLL_SCRIPT)
+        except WebDriverException:
+            status.stop_reason = STOP_ERROR
+            return
+        if not skipper.done:
+            _wait_for_reviews(driver, budget, scroll_pause)
+        else:
+            time.sleep(scroll_pause if budget is None else min(scroll_pause, max(budget.remaining(), 0)))
+    status.stop_reason = STOP_BUDGET
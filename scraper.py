@@ -1,53 +1,446 @@
 import requests
-import re
 import json
 import time
-from bs4 import BeautifulSoup
+import os
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
-from utils import clean_text, extract_rating, extract_reviews, extract_categories
+from utils import extract_reviews, extract_reviews_from_soup, extract_categories
+from extraction import MAPS_FIELDS, SEARCH_FIELDS, parse_html, extract_fields, extract_fields_from_driver
+from driver_pool import DriverPool
+from readiness import LatencyBudget, wait_for_listing
+from reviews import STOP_BUDGET, STOP_NO_REVIEWS, HarvestStatus, harvest_reviews, open_reviews_panel, sort_newest_first
+from cache import ResultCache, normalize_query
+from place_index import default_place_index
+from rate_limiter import RateLimited, default_rate_limiter
+from identity import default_identity_pool
+from blocking import THROTTLE_KINDS, BlockedError, classify_page, classify_response
+from singleflight import SingleFlight
+from strategies import STRATEGIES, COMPLETE_FIELDS, RaceResults, StrategyStats, is_complete, merge_results
+from metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, BLOCKED_RESPONSES, stage
+from tracing import span, propagate
+
+# Default wall-clock allowance for one lookup, Maps and Search fallback combined
+DEFAULT_TIME_BUDGET = float(os.getenv('SCRAPE_TIME_BUDGET', '20'))
+# Share of the budget Maps may spend before the Search fallback takes over
+MAPS_BUDGET_SHARE = 0.75
+# 'page_source' parses one DOM snapshot locally; 'webdriver' queries each field live
+DEFAULT_EXTRACTION_MODE = os.getenv('MAPS_EXTRACTION_MODE', 'page_source')
+# Strategy order and whether strategies race each other rather than run as fallbacks
+DEFAULT_STRATEGIES = [name.strip() for name in os.getenv('SCRAPE_STRATEGIES', ','.join(STRATEGIES)).split(',') if name.strip() in STRATEGIES]
+DEFAULT_RACE = os.getenv('SCRAPE_RACE', '1') == '1'
+# Cache entries produced by the HTTP-only tier are kept apart from full browser results
+HTTP_CACHE_SUFFIX = '#http'
+# Share of the remaining budget an indexed place page gets before falling back to a Maps search
+PLACE_PAGE_BUDGET_SHARE = 0.5
+# Wall-clock allowance for harvesting a listing's full review history
+DEFAULT_REVIEW_TIME_BUDGET = float(os.getenv('REVIEW_HARVEST_TIME_BUDGET', '300'))
+
+# Errors that end a lookup with their own typed response instead of "not found": once Google
+# blocks us or pacing runs past the budget, the remaining strategies would fail the same way
+LOOKUP_ABORTS = (BlockedError, RateLimited)
+
+# Extraction tiers, cheapest first
+TIERS = ('fast', 'auto', 'full')
+
+# Every field in the formatted response
+RESPONSE_FIELDS = (
+    'business_name', 'star_rating', 'review_count', 'top_reviews', 'categories',
+    'hours_of_operation', 'address', 'website_url', 'phone_number', 'profile_photo_url',
+    'services_listed', 'business_attributes', 'google_maps_link'
+)
+
+def flight_key(search_query, tier, fields, strategies, race):
+    """Single-flight key: lookups only share a scrape when every option that changes its result matches"""
+    return '|'.join([
+        normalize_query(search_query), tier, ','.join(sorted(fields or [])),
+        ','.join(strategies), 'race' if race else 'ordered',
+    ])
+
+def lookup_error(e):
+    """Error response for a lookup that raised; block pages and pacing timeouts keep their type"""
+    if isinstance(e, LOOKUP_ABORTS):
+        return e.to_dict()
+    return {"error": f"An error occurred: {str(e)}"}
+
+def not_found():
+    return {"error": "Business listing not found. Please verify the name or try again."}
+
+def resolve_tier(tier, fields):
+    """Default tier and required fields: 'auto' when fields are given, and 'auto' checks COMPLETE_FIELDS by default"""
+    tier = tier or ('auto' if fields else 'full')
+    if tier == 'auto' and not fields:
+        fields = COMPLETE_FIELDS
+    return tier, fields
+
+def strategy_budget(budget, name, index, count):
+    """Budget for one strategy run in order; Maps leaves time for the fallbacks unless it is last"""
+    return budget.slice(MAPS_BUDGET_SHARE) if name == 'maps' and index < count - 1 else budget
+
+def lookup_source(names):
+    """Cache source for data found by the named strategies: 'browser' once a browser strategy contributed"""
+    return 'browser' if any(name != 'search' for name in names) else 'http'
+
+def call_timeout(budget):
+    """Timeout for one page load or fetch, ending with the budget; None when nothing is left"""
+    remaining = budget.remaining()
+    return remaining if remaining > 0 else None
+
+def observe_request(started, result):
+    """Record a finished get_business_data call in the request latency histogram"""
+    if 'error' in result:
+        outcome = 'error'
+    elif result.get('cache', {}).get('hit'):
+        outcome = 'cache_hit'
+    else:
+        outcome = 'scraped'
+    REQUEST_LATENCY.observe(time.perf_counter() - started, outcome=outcome)
 
 class GoogleBusinessScraper:
-    def __init__(self):
-        self.ua = UserAgent()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-    
-    def get_business_data(self, business_name_or_url):
-        """Main function to extract business data from Google"""
+    def __init__(self, pool_size=None, max_driver_uses=None, extraction_mode=None, cache_path=None):
+        self.extraction_mode = extraction_mode or DEFAULT_EXTRACTION_MODE
+        self.strategies = DEFAULT_STRATEGIES or list(STRATEGIES)
+        self.race = DEFAULT_RACE
+        self.strategy_stats = StrategyStats()
+        # Concurrent lookups for the same business share one scrape
+        self.singleflight = SingleFlight()
+        # User agent, cookie jar and proxy per identity; each Google request checks one out
+        self.identity_pool = default_identity_pool()
+        
+        # Warm Chrome instances shared across requests instead of one launch per scrape, keyed by identity
+        self._driver_path = None
+        self.driver_pool = DriverPool(
+            self._create_driver,
+            size=pool_size or int(os.getenv('DRIVER_POOL_SIZE', '2')),
+            max_uses=max_driver_uses or int(os.getenv('DRIVER_MAX_USES', '50')),
+            acquire_timeout=float(os.getenv('DRIVER_ACQUIRE_TIMEOUT', '30')),
+        )
+        atexit.register(self.driver_pool.close)
+        
+        # Local result cache so repeated lookups for the same business skip Google
+        self.cache = None
+        if os.getenv('CACHE_ENABLED', '1') == '1':
+            self.cache = ResultCache(
+                cache_path or os.getenv('CACHE_PATH', 'scrape_cache.sqlite3'),
+                max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '1000')),
+                stale_ttl=float(os.getenv('CACHE_STALE_TTL', str(24 * 3600))),
+            )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        # Businesses resolved before open their Maps place page directly, skipping the search step
+        self.place_index = default_place_index()
+        
+        # Paces Maps and Search requests together, backing off when Google throttles us
+        self.rate_limiter = default_rate_limiter()
+    
+    def _create_driver(self, identity):
+        """Launch a headless Chrome instance for the driver pool, presenting as the given identity"""
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument(f'--user-agent={identity.user_agent}')
+        if identity.proxy:
+            chrome_options.add_argument(f'--proxy-server={identity.proxy}')
+        
+        # Resolve the chromedriver binary once rather than on every launch
+        if not self._driver_path:
+            self._driver_path = ChromeDriverManager().install()
+        
+        return webdriver.Chrome(service=Service(self._driver_path), options=chrome_options)
+    
+    def get_business_data(self, business_name_or_url, time_budget=None, use_cache=True, strategies=None, race=None,
+                          tier=None, fields=None):
+        """Main function to extract business data from Google
+        
+        ``tier`` picks how hard to try: 'fast' only uses the HTTP Search path,
+        'auto' uses it first and escalates to the browser when any of the
+        requested ``fields`` is missing, and 'full' goes straight to the
+        browser strategies. Defaults to 'auto' when fields are given.
+        """
+        started = time.perf_counter()
+        with REQUESTS_IN_FLIGHT.track_in_progress():
+            result = self._get_business_data(business_name_or_url, time_budget, use_cache, strategies, race,
+                                             tier, fields)
+        observe_request(started, result)
+        return result
+    
+    def _get_business_data(self, business_name_or_url, time_budget=None, use_cache=True, strategies=None, race=None,
+                           tier=None, fields=None):
         try:
-            # Determine if input is URL or business name
-            if business_name_or_url.startswith(('http://', 'https://')):
-                # Extract domain and search for it
-                domain = self._extract_domain(business_name_or_url)
-                search_query = domain
-            else:
-                search_query = business_name_or_url
+            search_query = self._search_query(business_name_or_url)
+            tier, fields = resolve_tier(tier, fields)
+            if use_cache:
+                cached = self._cached_result(search_query, tier, fields)
+                if cached:
+                    return cached
             
-            # Try different search strategies
-            data = self._search_google_maps(search_query)
-            if not data:
-                data = self._search_google_search(search_query)
+            result, source = self._scrape_once(search_query, time_budget, strategies, race, tier, fields)
+            return self._remember_result(search_query, result, source)
             
-            if data:
-                return self._format_response(data)
+        except Exception as e:
+            return {"error": f"An error occurred: {str(e)}"}
+    
+    def _cache_keys(self, key, tier):
+        """Cache entries that may answer a request; browser results also satisfy cheaper tiers"""
+        if tier == 'full':
+            return [key]
+        return [key, key + HTTP_CACHE_SUFFIX]
+    
+    def _cached_result(self, search_query, tier, fields):
+        """Cached response that satisfies the request, or None; stale entries are refreshed in the background"""
+        if not self.cache:
+            return None
+        for cache_key in self._cache_keys(normalize_query(search_query), tier):
+            with span('cache_lookup', key=cache_key):
+                cached = self.cache.get(cache_key)
+            if not cached or (tier == 'auto' and not is_complete(cached[0], fields)):
+                continue
+            data, age, stale = cached
+            if stale:
+                self._refresh_in_background(cache_key, search_query)
+            data['cache'] = {"hit": True, "stale": stale, "age_seconds": round(age, 1)}
+            return data
+        return None
+    
+    def _remember_result(self, search_query, result, source):
+        """Cache a fresh successful result under its source's key and mark it as a miss"""
+        if self.cache and 'error' not in result:
+            key = normalize_query(search_query)
+            self.cache.set(key + HTTP_CACHE_SUFFIX if source == 'http' else key, result)
+            result['cache'] = {"hit": False, "stale": False, "age_seconds": 0}
+        return result
+    
+    def group_inputs(self, inputs):
+        """Batch inputs grouped by the business they resolve to, so each is scraped once"""
+        groups = {}
+        for business_name_or_url in inputs:
+            key = normalize_query(self._search_query(business_name_or_url))
+            groups.setdefault(key, []).append(business_name_or_url)
+        return list(groups.values())
+    
+    def get_business_data_many(self, inputs, concurrency=None, **options):
+        """Extract many businesses concurrently, yielding (input, result) as each finishes
+        
+        Inputs that normalize to the same query are scraped once and the
+        result is yielded for each of them. ``options`` are passed through
+        to get_business_data.
+        """
+        groups = self.group_inputs(inputs)
+        if not groups:
+            return
+        
+        workers = min(concurrency or self.driver_pool.size, len(groups))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-extract') as executor:
+            futures = {
+                executor.submit(self.get_business_data, originals[0], **options): originals
+                for originals in groups
+            }
+            try:
+                for future in as_completed(futures):
+                    # Drop finished futures so a streamed batch only holds the results not yet yielded
+                    originals = futures.pop(future)
+                    result = future.result()
+                    for business_name_or_url in originals:
+                        yield business_name_or_url, dict(result)
+            finally:
+                # Caller stopped early: don't start scrapes nobody will read
+                for future in futures:
+                    future.cancel()
+    
+    def harvest_reviews(self, business_name_or_url, limit=None, since=None, time_budget=None, status=None,
+                        resume=None):
+        """Yield a listing's reviews newest first, scrolling through the Maps review panel
+        
+        Holds one pooled driver until the generator is exhausted or closed.
+        Raises LookupError when the listing itself never loads, BlockedError
+        when Google serves a block page and RateLimited when pacing would outlast
+        the budget; see reviews.harvest_reviews for the stop conditions. When
+        the panel can't be sorted newest first, ``since`` is ignored. A
+        ``status`` (reviews.HarvestStatus) passed in records whether the panel
+        was sorted and why the harvest stopped. A ``resume`` (reviews.ResumePoint)
+        only applies to a sorted panel, since relevance order has no fixed positions.
+        """
+        status = status or HarvestStatus()
+        budget = LatencyBudget(time_budget or DEFAULT_REVIEW_TIME_BUDGET)
+        query = self._search_query(business_name_or_url)
+        
+        with self.identity_pool.checkout(budget.remaining(), 'maps') as identity, \
+                self.driver_pool.driver(timeout=budget.remaining(), key=identity) as driver:
+            timeout = call_timeout(budget)
+            if timeout is None:
+                status.stop_reason = STOP_BUDGET
+                return
+            driver.set_page_load_timeout(timeout)
+            if not self._open_listing(driver, query, budget, identity):
+                raise LookupError("Business listing not found on Google Maps")
+            if not open_reviews_panel(driver, budget):
+                status.stop_reason = STOP_NO_REVIEWS
+                return
+            status.sorted_newest_first = sort_newest_first(driver, budget)
+            
+            # In relevance order an old review can come before newer ones, so a date cutoff would drop them
+            sorted_newest_first = status.sorted_newest_first
+            yield from harvest_reviews(driver, limit=limit, since=since if sorted_newest_first else None,
+                                       budget=budget, status=status, resume=resume if sorted_newest_first else None)
+    
+    def _search_query(self, business_name_or_url):
+        """Turn the caller's input into the query sent to Google"""
+        # Determine if input is URL or business name
+        if business_name_or_url.startswith(('http://', 'https://')):
+            # Extract domain and search for it
+            return self._extract_domain(business_name_or_url)
+        return business_name_or_url
+    
+    def _strategy_plan(self, strategies=None, race=None):
+        """Strategies to run and whether to race them, with the scraper defaults filled in"""
+        return list(strategies or self.strategies), self.race if race is None else race
+    
+    def _scrape_once(self, search_query, time_budget=None, strategies=None, race=None, tier='full', fields=None):
+        """Run _scrape_tiered, letting concurrent identical requests wait on the one already running"""
+        key = flight_key(search_query, tier, fields, *self._strategy_plan(strategies, race))
+        return self.singleflight.do(key, self._scrape_tiered, search_query, time_budget, strategies, race, tier, fields)
+    
+    def _http_answer(self, http_data, tier, fields):
+        """True when the HTTP pass alone satisfies the tier, so the browser need not run"""
+        if http_data and (tier == 'fast' or is_complete(http_data, fields)):
+            self.strategy_stats.record_win('search')
+            return True
+        return False
+    
+    def _escalation_strategies(self, strategies, tier):
+        """Browser strategies an 'auto' lookup escalates to when the HTTP pass falls short"""
+        if tier != 'auto':
+            return []
+        return [name for name in self._strategy_plan(strategies)[0] if name != 'search']
+    
+    def _tiered_result(self, http_data, browser_data):
+        """(response, source) for a tiered lookup, keeping whatever the HTTP pass found"""
+        data = merge_results({'browser': browser_data, 'http': http_data}, ['browser', 'http'])
+        if data:
+            return self._format_response(data), 'browser' if browser_data else 'http'
+        return not_found(), 'http'
+    
+    def _lookup_result(self, data, names):
+        """(response, source) for a lookup's merged data and the strategies it came from"""
+        return (self._format_response(data), lookup_source(names)) if data else (not_found(), 'http')
+    
+    def _scrape_tiered(self, search_query, time_budget=None, strategies=None, race=None, tier='full', fields=None):
+        """Run the cheapest lookup that satisfies the requested fields, returning (result, source)"""
+        if tier == 'full':
+            return self._scrape(search_query, time_budget, strategies, race)
+        
+        try:
+            budget = LatencyBudget(time_budget or DEFAULT_TIME_BUDGET)
+            
+            # Plain HTTP first: tens of milliseconds instead of a browser round-trip
+            http_data = self._run_strategy('search', search_query, budget)
+            if self._http_answer(http_data, tier, fields):
+                return self._format_response(http_data), 'http'
+            
+            # Escalate to the browser strategies, keeping whatever the HTTP pass found
+            browser_data = None
+            browser_strategies = self._escalation_strategies(strategies, tier)
+            if browser_strategies and not budget.expired():
+                browser_data, _ = self._run_strategies_in_order(search_query, browser_strategies, budget)
+            return self._tiered_result(http_data, browser_data)
+            
+        except Exception as e:
+            return lookup_error(e), 'http'
+    
+    def _scrape(self, search_query, time_budget=None, strategies=None, race=None):
+        """Run the live lookup for a query using the requested strategies, returning (result, source)"""
+        try:
+            budget = LatencyBudget(time_budget or DEFAULT_TIME_BUDGET)
+            strategies, race = self._strategy_plan(strategies, race)
+            
+            # Race strategies in parallel, or fall back from one to the next within the time budget
+            if race and len(strategies) > 1:
+                data, names = self._race_strategies(search_query, strategies, budget)
             else:
-                return {"error": "Business listing not found. Please verify the name or try again."}
+                data, names = self._run_strategies_in_order(search_query, strategies, budget)
+            return self._lookup_result(data, names)
                 
         except Exception as e:
-            return {"error": f"An error occurred: {str(e)}"}
+            return lookup_error(e), 'http'
+    
+    def _run_strategy(self, name, query, budget):
+        """Run one lookup strategy and record its latency and outcome"""
+        search = {'maps': self._search_google_maps, 'search': self._search_google_search}[name]
+        started = time.monotonic()
+        data = None
+        try:
+            with span(f'strategy:{name}'):
+                data = search(query, budget)
+            return data
+        finally:
+            self.strategy_stats.record_attempt(name, time.monotonic() - started, bool(data))
+    
+    def _run_strategies_in_order(self, query, strategies, budget):
+        """Try each strategy until one finds the listing, returning (data, [the strategy that found it])"""
+        for index, name in enumerate(strategies):
+            if budget.expired():
+                break
+            data = self._run_strategy(name, query, strategy_budget(budget, name, index, len(strategies)))
+            if data:
+                self.strategy_stats.record_win(name)
+                return data, [name]
+        return None, []
+    
+    def _race_strategies(self, query, strategies, budget):
+        """Run strategies concurrently; stop at the first complete result or merge what comes back
+        
+        Returns (data, the strategies whose results went into it).
+        """
+        budgets = {name: budget.slice(1.0) for name in strategies}
+        race = RaceResults(strategies, self.strategy_stats)
+        
+        executor = ThreadPoolExecutor(max_workers=len(strategies), thread_name_prefix='strategy')
+        futures = {
+            executor.submit(propagate(self._run_strategy), name, query, budgets[name]): name for name in strategies
+        }
+        try:
+            for future in as_completed(futures, timeout=budget.remaining()):
+                if race.add(futures[future], future.result):
+                    break
+        except FuturesTimeout:
+            pass
+        finally:
+            # Cancel the losers so a slow Maps page stops polling and frees its driver
+            for name in race.losers():
+                budgets[name].cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return race.outcome(), list(race.results)
+    
+    def _refresh_in_background(self, key, search_query):
+        """Re-scrape a stale cache entry without blocking the caller"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                if key.endswith(HTTP_CACHE_SUFFIX):
+                    result, source = self._scrape_tiered(search_query, tier='fast')
+                else:
+                    result, source = self._scrape(search_query)
+                # An HTTP-only refresh must not replace a browser entry
+                if 'error' not in result and (source == 'browser') == (not key.endswith(HTTP_CACHE_SUFFIX)):
+                    self.cache.set(key, result)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, daemon=True).start()
     
     def _extract_domain(self, url):
         """Extract domain from URL"""
@@ -56,179 +449,163 @@ class GoogleBusinessScraper:
         domain = parsed.netloc.replace('www.', '')
         return domain
     
-    def _search_google_maps(self, query):
+    def _open_listing(self, driver, query, budget, identity):
+        """Load the Maps listing for a query, returning whether it rendered within the budget
+        
+        Uses the indexed place URL when the business has been resolved before,
+        dropping the entry and falling back to a Maps search if it no longer loads.
+        Raises BlockedError when Google serves a block page instead.
+        """
+        search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+        place_url = self.place_index.lookup(query) if self.place_index else None
+        
+        if place_url:
+            self._navigate(driver, place_url, budget, identity)
+            with stage('maps_readiness'):
+                if wait_for_listing(driver, budget.slice(PLACE_PAGE_BUDGET_SHARE)):
+                    return True
+            self.place_index.forget(place_url)
+            if budget.expired():
+                return False
+        
+        self._navigate(driver, search_url, budget, identity)
+        
+        # Wait only as long as the listing takes to render
+        with stage('maps_readiness'):
+            return wait_for_listing(driver, budget)
+    
+    def _navigate(self, driver, url, budget, identity):
+        """Load a Maps URL once the rate limiter allows it
+        
+        Raises BlockedError straight after the load when Google served a
+        CAPTCHA or consent page, instead of waiting for a listing that never comes.
+        """
+        self._pace('maps', budget, identity)
+        with stage('maps_page_load'):
+            driver.get(url)
+        with stage('block_check'):
+            blocked = classify_page(driver)
+        self._record_pacing('maps', blocked, identity)
+        if blocked:
+            raise BlockedError(blocked, 'maps', driver.current_url)
+    
+    def _pace(self, path, budget, identity):
+        """Wait for the identity's rate limit token; raises RateLimited when none is free within the budget"""
+        if self.rate_limiter:
+            with stage('rate_limit_wait'):
+                self.rate_limiter.acquire(identity.name, timeout=budget.remaining(), path=path)
+    
+    def _record_pacing(self, path, blocked, identity):
+        """Feed a Google response (and its block kind, if any) to the identity pool and rate limiter"""
+        if blocked:
+            BLOCKED_RESPONSES.inc(path=path, kind=blocked)
+            self.identity_pool.report_block(identity, blocked)
+        else:
+            self.identity_pool.report_success(identity)
+        if not self.rate_limiter:
+            return
+        if blocked in THROTTLE_KINDS:
+            self.rate_limiter.record_throttle(identity.name, path=path)
+        elif not blocked:
+            self.rate_limiter.record_success(identity.name, path=path)
+    
+    def _search_google_maps(self, query, budget=None):
         """Search Google Maps for business listing"""
         try:
-            # Format query for Google Maps search
-            search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
-            
-            # Use Selenium for Google Maps (more reliable)
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument(f'--user-agent={self.ua.random}')
+            budget = budget or LatencyBudget(DEFAULT_TIME_BUDGET)
             
-            driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
-            driver.get(search_url)
-            
-            # Wait for page to load
-            time.sleep(3)
-            
-            # Try to find business listing
-            try:
-                # Look for business name
-                business_name = driver.find_element(By.CSS_SELECTOR, 'h1, .fontHeadlineLarge').text
-                
-                # Extract rating
-                rating_element = driver.find_element(By.CSS_SELECTOR, '[aria-label*="stars"], .fontDisplayLarge')
-                rating = extract_rating(rating_element.text)
-                
-                # Extract review count
-                review_count = 0
-                try:
-                    review_element = driver.find_element(By.CSS_SELECTOR, '[aria-label*="reviews"]')
-                    review_count = int(re.findall(r'\d+', review_element.text)[0])
-                except:
-                    pass
-                
-                # Extract address
-                address = ""
-                try:
-                    address_element = driver.find_element(By.CSS_SELECTOR, '[data-item-id*="address"]')
-                    address = clean_text(address_element.text)
-                except:
-                    pass
+            # Use a pooled Selenium driver for Google Maps (more reliable), launched for the checked out identity
+            with self.identity_pool.checkout(budget.remaining(), 'maps') as identity, \
+                    self.driver_pool.driver(timeout=budget.remaining(), key=identity) as driver:
+                timeout = call_timeout(budget)
+                if timeout is None:
+                    return None
+                driver.set_page_load_timeout(timeout)
+                if not self._open_listing(driver, query, budget, identity):
+                    return None
                 
-                # Extract phone
-                phone = ""
-                try:
-                    phone_element = driver.find_element(By.CSS_SELECTOR, '[data-item-id*="phone"]')
-                    phone = clean_text(phone_element.text)
-                except:
-                    pass
-                
-                # Extract website
-                website = ""
-                try:
-                    website_element = driver.find_element(By.CSS_SELECTOR, '[data-item-id*="authority"]')
-                    website = website_element.get_attribute('href')
-                except:
-                    pass
-                
-                # Extract hours
-                hours = ""
-                try:
-                    hours_element = driver.find_element(By.CSS_SELECTOR, '[data-item-id*="hours"]')
-                    hours = clean_text(hours_element.text)
-                except:
-                    pass
-                
-                # Extract categories
-                categories = []
-                try:
-                    category_elements = driver.find_elements(By.CSS_SELECTOR, '[data-item-id*="category"]')
-                    categories = [clean_text(elem.text) for elem in category_elements]
-                except:
-                    pass
-                
-                # Extract reviews
-                reviews = extract_reviews(driver)
-                
-                # Get Google Maps link
-                maps_link = driver.current_url
-                
-                driver.quit()
-                
-                return {
-                    'business_name': business_name,
-                    'star_rating': rating,
-                    'review_count': review_count,
-                    'address': address,
-                    'phone_number': phone,
-                    'website_url': website,
-                    'hours_of_operation': hours,
-                    'categories': categories,
-                    'top_reviews': reviews,
-                    'google_maps_link': maps_link
-                }
+                # Pull every field in one pass, then attach reviews and the canonical link
+                with stage('maps_extract'):
+                    if self.extraction_mode == 'webdriver':
+                        data = extract_fields_from_driver(driver, MAPS_FIELDS, source='maps')
+                        if data is not None:
+                            data['top_reviews'] = extract_reviews(driver)
+                    else:
+                        soup = parse_html(driver.page_source)
+                        data = extract_fields(soup, MAPS_FIELDS, source='maps')
+                        if data is not None:
+                            data['top_reviews'] = extract_reviews_from_soup(soup)
                 
-            except Exception as e:
-                driver.quit()
-                return None
+                if data is None:
+                    return None
                 
+                data['google_maps_link'] = driver.current_url
+                if self.place_index:
+                    self.place_index.record(query, data)
+                return data
+        
+        except LOOKUP_ABORTS:
+            raise
         except Exception as e:
             return None
     
-    def _search_google_search(self, query):
+    def _search_google_search(self, query, budget=None):
         """Search Google Search for business listing"""
         try:
+            budget = budget or LatencyBudget(DEFAULT_TIME_BUDGET)
             search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}+google+business"
             
-            response = self.session.get(search_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with self.identity_pool.checkout(budget.remaining(), 'search') as identity:
+                self._pace('search', budget, identity)
+                timeout = call_timeout(budget)
+                if timeout is None:
+                    return None
+                try:
+                    with stage('search_fetch'):
+                        response = identity.session.get(search_url, timeout=timeout)
+                except requests.exceptions.ProxyError:
+                    self.identity_pool.report_error(identity)
+                    return None
+                with stage('block_check'):
+                    blocked = classify_response(response.status_code, response.url, response.content)
+                self._record_pacing('search', blocked, identity)
+            if blocked:
+                raise BlockedError(blocked, 'search', response.url)
+            # Another strategy already won the race, so nobody will read this page
+            if budget.cancelled:
+                return None
             
             # Look for Google Business listing in search results
-            business_data = {}
-            
-            # Try to find business name
-            name_selectors = ['h3', '.LC20lb', '.r']
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem:
-                    business_data['business_name'] = clean_text(name_elem.text)
-                    break
-            
-            # Try to find rating
-            rating_elem = soup.select_one('[aria-label*="stars"]')
-            if rating_elem:
-                business_data['star_rating'] = extract_rating(rating_elem.get('aria-label', ''))
-            
-            # Try to find review count
-            review_elem = soup.select_one('[aria-label*="reviews"]')
-            if review_elem:
-                review_text = review_elem.get('aria-label', '')
-                review_count = re.findall(r'\d+', review_text)
-                if review_count:
-                    business_data['review_count'] = int(review_count[0])
-            
-            # Try to find address
-            address_elem = soup.select_one('.adr, [data-ved*="address"]')
-            if address_elem:
-                business_data['address'] = clean_text(address_elem.text)
-            
-            # Try to find phone
-            phone_elem = soup.select_one('[data-ved*="phone"]')
-            if phone_elem:
-                business_data['phone_number'] = clean_text(phone_elem.text)
-            
-            # Try to find website
-            website_elem = soup.select_one('a[href*="http"]')
-            if website_elem:
-                business_data['website_url'] = website_elem.get('href')
-            
-            if business_data.get('business_name'):
+            with stage('search_parse'):
+                soup = parse_html(response.content)
+            with stage('search_extract'):
+                business_data = extract_fields(soup, SEARCH_FIELDS, source='search')
+            if business_data and business_data.get('business_name'):
                 return business_data
             
             return None
             
+        except LOOKUP_ABORTS:
+            raise
         except Exception as e:
             return None
     
     def _format_response(self, data):
         """Format the scraped data into the required JSON structure"""
-        return {
-            "business_name": data.get('business_name', ''),
-            "star_rating": data.get('star_rating', ''),
-            "review_count": data.get('review_count', 0),
-            "top_reviews": data.get('top_reviews', []),
-            "categories": data.get('categories', []),
-            "hours_of_operation": data.get('hours_of_operation', ''),
-            "address": data.get('address', ''),
-            "website_url": data.get('website_url', ''),
-            "phone_number": data.get('phone_number', ''),
-            "profile_photo_url": data.get('profile_photo_url', ''),
-            "services_listed": data.get('services_listed', []),
-            "business_attributes": data.get('business_attributes', []),
-            "google_maps_link": data.get('google_maps_link', '')
-        } 
\ No newline at end of file
+        with stage('format_response'):
+            response = {
+                "business_name": data.get('business_name', ''),
+                "star_rating": data.get('star_rating', ''),
+                "review_count": data.get('review_count', 0),
+                "top_reviews": data.get('top_reviews', []),
+                "categories": data.get('categories', []),
+                "hours_of_operation": data.get('hours_of_operation', ''),
+                "address": data.get('address', ''),
+                "website_url": data.get('website_url', ''),
+                "phone_number": data.get('phone_number', ''),
+                "profile_photo_url": data.get('profile_photo_url', ''),
+                "services_listed": data.get('services_listed', []),
+                "business_attributes": data.get('business_attributes', []),
+                "google_maps_link": data.get('google_maps_link', '')
+            }
+        return response
@@ -0,0 +1,96 @@
+import asyncio
+import copy
+import threading
+
+
+class _Call:
+    """One in-flight execution that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into a single execution
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive a copy of its result (or its
+    exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'calls': 0, 'executions': 0, 'shared': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Each follower gets its own copy since callers annotate results in place
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn(*args, **kwargs)
+            # Followers copy from a snapshot the leader's caller can't mutate
+            call.result = copy.deepcopy(result)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls), scrapes_saved=self._stats['shared'])
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines sharing one event loop
+
+    Followers await the leader's task through a shield, so a cancelled
+    caller doesn't cancel the scrape the others are waiting on.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._stats = {'calls': 0, 'executions': 0, 'shared': 0}
+
+    async def do(self, key, fn, *args, **kwargs):
+        self._stats['calls'] += 1
+        task = self._tasks.get(key)
+        if task is not None:
+            self._stats['shared'] += 1
+            # Each follower gets its own copy since callers annotate results in place
+            return copy.deepcopy((await asyncio.shield(task))[1])
+
+        async def run():
+            result = await fn(*args, **kwargs)
+            # Followers copy from a snapshot the leader's caller can't mutate
+            return result, copy.deepcopy(result)
+
+        self._stats['executions'] += 1
+        task = asyncio.ensure_future(run())
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return (await asyncio.shield(task))[0]
+
+    def stats(self):
+        return dict(self._stats, in_flight=len(self._tasks), scrapes_saved=self._stats['shared'])
@@ -0,0 +1,115 @@
+import threading
+from rate_limiter import RateLimited
+
+# Lookup strategies GoogleBusinessScraper knows how to run, in default preference order
+STRATEGIES = ('maps', 'search')
+
+# A result carrying all of these is good enough to stop waiting for slower strategies
+COMPLETE_FIELDS = ('business_name', 'star_rating', 'address', 'phone_number')
+
+
+def is_complete(data, fields=COMPLETE_FIELDS):
+    """True when every field needed to end a race early has a value"""
+    return bool(data) and all(data.get(field) for field in fields)
+
+
+def merge_results(results, order):
+    """Combine strategy results field by field, preferring strategies earlier in ``order``"""
+    merged = {}
+    for name in order:
+        for field, value in (results.get(name) or {}).items():
+            if value and not merged.get(field):
+                merged[field] = value
+            elif field not in merged:
+                merged[field] = value
+    return merged
+
+
+class StrategyStats:
+    """Attempts, successes, wins and latency per lookup strategy"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _entry(self, name):
+        return self._stats.setdefault(name, {
+            'attempts': 0,
+            'successes': 0,
+            'wins': 0,
+            'latency_total': 0.0,
+        })
+
+    def record_attempt(self, name, latency, success):
+        with self._lock:
+            entry = self._entry(name)
+            entry['attempts'] += 1
+            entry['latency_total'] += latency
+            if success:
+                entry['successes'] += 1
+
+    def record_win(self, name):
+        with self._lock:
+            self._entry(name)['wins'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            total_wins = sum(entry['wins'] for entry in self._stats.values())
+            return {
+                name: {
+                    'attempts': entry['attempts'],
+                    'successes': entry['successes'],
+                    'wins': entry['wins'],
+                    'win_rate': round(entry['wins'] / total_wins, 3) if total_wins else 0.0,
+                    'avg_latency_seconds': round(entry['latency_total'] / entry['attempts'], 3) if entry['attempts'] else 0.0,
+                }
+                for name, entry in self._stats.items()
+            }
+
+
+class RaceResults:
+    """Bookkeeping for strategies run side by side, shared by the thread and asyncio engines
+
+    Hand each finished strategy to ``add``; the first complete result wins.
+    ``outcome`` then merges whatever came back, preferring the winner.
+    """
+
+    def __init__(self, strategies, stats):
+        self.strategies = strategies
+        self.stats = stats
+        self.results = {}
+        self.winner = None
+        self.paced_out = None
+
+    def add(self, name, result):
+        """Take a finished strategy's ``result`` callable; returns whether a winner is decided"""
+        try:
+            # A block page on one strategy ends the race; BlockedError propagates from here
+            data = result()
+        except RateLimited as e:
+            # Pacing only rules this strategy out; the others may already hold a token
+            self.paced_out = e
+            return self.winner is not None
+        if data:
+            self.results[name] = data
+            if self.winner is None and is_complete(data):
+                self.winner = name
+        return self.winner is not None
+
+    def losers(self):
+        """Strategies that haven't returned a result, to be cancelled"""
+        return [name for name in self.strategies if name not in self.results]
+
+    def outcome(self):
+        """Merged result, or None when nothing was found; re-raises RateLimited if every strategy was paced out"""
+        if not self.results:
+            if self.paced_out:
+                raise self.paced_out
+            return None
+
+        if self.winner:
+            order = [self.winner] + [name for name in self.strategies if name != self.winner]
+        else:
+            order = [name for name in self.strategies if name in self.results]
+        self.stats.record_win(order[0])
+        return merge_results(self.results, order)
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# Keep every SQLite store out of the working tree and off by default; tests opt back in
+_STATE_DIR = tempfile.mkdtemp(prefix='scraper-tests-')
+os.environ.update(
+    CACHE_ENABLED='0',
+    PLACE_INDEX_ENABLED='0',
+    RATE_LIMIT_ENABLED='0',
+    CACHE_PATH=os.path.join(_STATE_DIR, 'cache.sqlite3'),
+    PLACE_INDEX_PATH=os.path.join(_STATE_DIR, 'place_index.sqlite3'),
+    REVIEW_SYNC_PATH=os.path.join(_STATE_DIR, 'review_sync.sqlite3'),
+    WEBHOOK_OUTBOX_PATH=os.path.join(_STATE_DIR, 'webhook_outbox.sqlite3'),
+    BROKER_PATH=os.path.join(_STATE_DIR, 'job_broker.sqlite3'),
+    WEBHOOK_DELIVERY='sync',
+)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def fixture_scraper():
+    """A real GoogleBusinessScraper whose drivers and HTTP sessions serve the synthetic pages in benchmarks/fixtures"""
+    from bench_scraper import build_scraper
+    scraper = build_scraper(pool_size=2, page_delay=0.0, http_delay=0.0)
+    yield scraper
+    scraper.driver_pool.close()
+
+
+@pytest.fixture
+def client():
+    """Flask test client for main.app, with Google replaced by the synthetic fixture pages"""
+    from bench_scraper import FixtureDriver, FixtureSession, read_fixture
+    import main
+    maps_html = read_fixture('google_maps.html')
+    main.scraper.driver_pool.factory = lambda identity=None: FixtureDriver(maps_html)
+    for identity in main.scraper.identity_pool.identities:
+        identity.session = FixtureSession(read_fixture('google_search.html'))
+    return main.app.test_client()
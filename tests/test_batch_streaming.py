@@ -0,0 +1,62 @@
+import asyncio
+import time
+import tracemalloc
+import pytest
+
+# Each fake result carries this much data, so retained results show up in traced memory
+RESULT_BYTES = 1_000_000
+BUSINESSES = [f'Business {index}' for index in range(20)]
+
+
+def big_result(name):
+    return {'business_name': name, 'payload': 'x' * RESULT_BYTES}
+
+
+def peak_while_streaming(results):
+    """Peak traced memory while consuming (input, result) pairs and dropping each one"""
+    tracemalloc.start()
+    try:
+        count = 0
+        for _ in results:
+            count += 1
+        return count, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streamed_batch_does_not_hold_finished_results(fixture_scraper):
+    def fake_lookup(name, **options):
+        time.sleep(0.01)
+        return big_result(name)
+
+    fixture_scraper.get_business_data = fake_lookup
+    count, peak = peak_while_streaming(fixture_scraper.get_business_data_many(BUSINESSES, concurrency=2))
+    assert count == len(BUSINESSES)
+    assert peak < 8 * RESULT_BYTES
+
+
+def test_async_streamed_batch_does_not_hold_finished_results(fixture_scraper):
+    pytest.importorskip('aiohttp')
+    from async_scraper import AsyncGoogleBusinessScraper
+
+    async def stream():
+        engine = AsyncGoogleBusinessScraper(fixture_scraper)
+
+        async def fake_lookup(name, **options):
+            await asyncio.sleep(0.01)
+            return big_result(name)
+
+        engine.get_business_data = fake_lookup
+        tracemalloc.start()
+        try:
+            count = 0
+            async for _ in engine.get_business_data_many(BUSINESSES, concurrency=2):
+                count += 1
+            return count, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            await engine.close()
+
+    count, peak = asyncio.run(stream())
+    assert count == len(BUSINESSES)
+    assert peak < 8 * RESULT_BYTES
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import pytest
+from broker import JobBroker, JobTimeout
+
+
+@pytest.fixture
+def broker(tmp_path):
+    return JobBroker(str(tmp_path / 'broker.sqlite3'), lease_seconds=5, max_attempts=2, poll_interval=0.01)
+
+
+def serve(broker, jobs, handler=lambda payload: {"echo": payload['search_input']}):
+    """Claim and finish ``jobs`` jobs on a background thread, like one worker slot"""
+    def work():
+        done = 0
+        while done < jobs:
+            claimed = broker.claim('worker-1')
+            if claimed is None:
+                continue
+            job_id, payload = claimed
+            broker.finish(job_id, 'worker-1', result=handler(payload))
+            done += 1
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_run_returns_the_workers_result(broker):
+    serve(broker, 1)
+    assert broker.run({'search_input': 'a'}, timeout=5) == {"echo": 'a'}
+
+
+def test_run_times_out_and_drops_the_unclaimed_job(broker):
+    with pytest.raises(JobTimeout):
+        broker.run({'search_input': 'a'}, timeout=0.05)
+    assert broker.claim('worker-1') is None
+
+
+def test_expired_lease_is_retried_then_failed(broker):
+    job_id = broker.submit({'search_input': 'a'})
+    for _ in range(2):
+        claimed = broker.claim('worker-1')
+        assert claimed[0] == job_id
+        broker._conn.execute("UPDATE jobs SET lease_expires = 0 WHERE job_id = ?", (job_id,))
+    assert broker.claim('worker-1') is None
+    job = broker.get(job_id)
+    assert job['status'] == 'failed'
+    assert 'gave up after 2 attempts' in job['error']
+
+
+def test_async_run_and_run_many(broker):
+    serve(broker, 4)
+
+    async def wait():
+        single = await broker.run_async({'search_input': 'a'}, timeout=5)
+        many = [item async for item in broker.run_many_async([{'search_input': name} for name in 'bcd'], timeout=5)]
+        return single, many
+
+    single, many = asyncio.run(wait())
+    assert single == {"echo": 'a'}
+    assert sorted(many, key=lambda item: item[0]) == [(0, {"echo": 'b'}), (1, {"echo": 'c'}), (2, {"echo": 'd'})]
+
+
+def test_asgi_extract_goes_through_the_broker(broker, monkeypatch):
+    pytest.importorskip('uvicorn')
+    import asgi
+    import main
+
+    monkeypatch.setattr(main, 'JOB_BACKEND', 'broker')
+    monkeypatch.setattr(main, 'job_queue', broker)
+    monkeypatch.setattr(main, 'deliver_to_webhook', lambda result, url='': {"status": "skipped"})
+
+    async def local_scrape(*args, **kwargs):
+        raise AssertionError("scraped in the web process")
+
+    monkeypatch.setattr(asgi.engine, 'get_business_data', local_scrape)
+    serve(broker, 1, lambda payload: {"business_name": payload['search_input'], "kind": payload['kind']})
+    result = asyncio.run(asgi.run_extraction('Blue Bottle Coffee'))
+    assert result['business_name'] == 'Blue Bottle Coffee'
+    assert result['kind'] == 'scrape'
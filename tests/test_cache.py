@@ -0,0 +1,21 @@
+import pytest
+from cache import ResultCache, normalize_query
+from scraper import HTTP_CACHE_SUFFIX
+
+
+@pytest.mark.parametrize('strategies, race, cached_as', [
+    (['search'], False, 'http'),
+    (['maps'], False, 'browser'),
+    (['search', 'maps'], False, 'http'),
+    (['maps', 'search'], False, 'browser'),
+])
+def test_full_lookups_are_cached_under_the_source_that_found_them(fixture_scraper, tmp_path, strategies, race,
+                                                                  cached_as):
+    fixture_scraper.cache = ResultCache(str(tmp_path / 'cache.sqlite3'))
+    result = fixture_scraper.get_business_data('Blue Bottle Coffee', strategies=strategies, race=race, tier='full')
+    assert 'error' not in result
+
+    key = normalize_query('Blue Bottle Coffee')
+    keys = {'browser': key, 'http': key + HTTP_CACHE_SUFFIX}
+    assert fixture_scraper.cache.get(keys[cached_as]) is not None
+    assert fixture_scraper.cache.get(keys['http' if cached_as == 'browser' else 'browser']) is None
@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from driver_pool import DriverPool, PoolTimeout
+from readiness import LatencyBudget
+
+
+class Driver:
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def full_pool():
+    pool = DriverPool(Driver, size=1, acquire_timeout=30)
+    held = pool._acquire()
+    yield pool
+    pool._release(held)
+    pool.close()
+
+
+def expired_budget():
+    budget = LatencyBudget(0.01)
+    time.sleep(0.02)
+    return budget
+
+
+def cancelled_budget():
+    budget = LatencyBudget(30)
+    budget.cancel()
+    return budget
+
+
+@pytest.mark.parametrize('make_budget', [expired_budget, cancelled_budget])
+def test_spent_budget_does_not_wait_for_a_driver(full_pool, make_budget):
+    budget = make_budget()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        with full_pool.driver(timeout=budget.remaining()):
+            pass
+    assert time.monotonic() - started < 0.5
+
+
+def test_waiter_gets_the_driver_released_within_its_timeout():
+    pool = DriverPool(Driver, size=1)
+    held = pool._acquire()
+    threading.Timer(0.05, pool._release, (held,)).start()
+    with pool.driver(timeout=2) as driver:
+        assert isinstance(driver, Driver)
+    pool.close()
+
+
+def test_page_load_timeout_ends_with_the_budget(fixture_scraper):
+    from bench_scraper import FixtureDriver, read_fixture
+    timeouts = []
+
+    class RecordingDriver(FixtureDriver):
+        def set_page_load_timeout(self, seconds):
+            timeouts.append(seconds)
+
+    fixture_scraper.driver_pool.factory = lambda identity=None: RecordingDriver(read_fixture('google_maps.html'))
+    assert fixture_scraper._search_google_maps('Blue Bottle Coffee', LatencyBudget(0.5))
+    assert 0 < timeouts[0] <= 0.5
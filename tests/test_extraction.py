@@ -0,0 +1,62 @@
+import pytest
+from bench_scraper import read_fixture
+from extraction import HTML_PARSERS, MAPS_FIELDS, SEARCH_FIELDS, extract_fields, parse_html
+
+# What the hand-written .text extraction returned for the synthetic fixture pages
+MAPS_EXPECTED = {
+    'business_name': 'Blue Bottle Coffee',
+    'star_rating': '4.5',
+    'review_count': 1,
+    'address': '1 Ferry Building #7, San Francisco, CA 94111',
+    'phone_number': '(415) 543-4080',
+    'website_url': 'https://bluebottlecoffee.com/',
+    'hours_of_operation': 'Monday 6:30 AM–7 PM; Tuesday 6:30 AM–7 PM; Wednesday 6:30 AM–7 PM',
+    'categories': ['Coffee shop', 'Cafe', 'Coffee roasters'],
+}
+
+SEARCH_EXPECTED = {
+    'business_name': 'Blue Bottle Coffee',
+    'star_rating': '5.0',
+    'review_count': 1,
+    'address': '1 Ferry Building #7, San Francisco, CA 94111',
+    'phone_number': '(415) 543-4080',
+    'website_url': 'https://example0.com/blue-bottle-0',
+}
+
+
+@pytest.mark.parametrize('parser', HTML_PARSERS)
+@pytest.mark.parametrize('fixture, table, expected', [
+    ('google_maps.html', MAPS_FIELDS, MAPS_EXPECTED),
+    ('google_search.html', SEARCH_FIELDS, SEARCH_EXPECTED),
+])
+def test_field_tables_on_fixture_pages(parser, fixture, table, expected):
+    soup = parse_html(read_fixture(fixture), parser)
+    assert extract_fields(soup, table) == expected
+
+
+@pytest.mark.parametrize('parser', HTML_PARSERS)
+def test_inline_markup_is_joined_like_text(parser):
+    soup = parse_html(
+        '<h1>Blue <b>Bottle</b></h1>'
+        '<div data-item-id="address"><span>1 Main St</span>, SF</div>'
+        '<div aria-label="4.5 stars">4.5</div>',
+        parser,
+    )
+    data = extract_fields(soup, MAPS_FIELDS)
+    assert data['business_name'] == 'Blue Bottle'
+    assert data['address'] == '1 Main St, SF'
+
+
+def test_missing_required_field_drops_the_page():
+    soup = parse_html('<div data-item-id="address">1 Main St</div>')
+    assert extract_fields(soup, MAPS_FIELDS) is None
+
+
+@pytest.mark.parametrize('fixture, table', [
+    ('google_maps.html', MAPS_FIELDS),
+    ('google_search.html', SEARCH_FIELDS),
+])
+def test_compiled_tables_match_original_text_reader(fixture, table):
+    from bench_parsers import extract_uncompiled
+    soup = parse_html(read_fixture(fixture), 'html.parser')
+    assert extract_fields(soup, table) == extract_uncompiled(soup, table)
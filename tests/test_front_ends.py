@@ -0,0 +1,46 @@
+import asyncio
+import json
+import pytest
+
+BAD_REQUESTS = [
+    ('/extract', {}),
+    ('/extract', {'business_name': ''}),
+    ('/extract', {'business_name': 'Blue Bottle Coffee', 'time_budget': 'soon'}),
+    ('/extract/batch', {'businesses': []}),
+    ('/extract/batch', ['Blue Bottle Coffee']),
+    ('/extract/batch', {'businesses': ['Blue Bottle Coffee'], 'concurrency': 0}),
+]
+
+
+def call_asgi(path, payload):
+    """POST ``payload`` to the ASGI app, returning (status, body)"""
+    import asgi
+    sent = []
+    body = json.dumps(payload).encode()
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': [], 'query_string': b''}
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]['status'], json.loads(b''.join(message.get('body', b'') for message in sent[1:]))
+
+
+@pytest.mark.parametrize('path, payload', BAD_REQUESTS)
+def test_front_ends_reject_requests_alike(client, path, payload):
+    pytest.importorskip('uvicorn')
+    response = client.post(path, json=payload)
+    assert response.status_code == 400
+    assert call_asgi(path, payload) == (400, response.json)
+
+
+def test_race_keeps_preference_order_and_merges_partial_results():
+    from strategies import RaceResults, StrategyStats
+    race = RaceResults(['maps', 'search'], StrategyStats())
+    assert race.add('search', lambda: {'business_name': 'Blue Bottle', 'phone': '555'}) is False
+    assert race.losers() == ['maps']
+    assert race.add('maps', lambda: None) is False
+    assert race.outcome()['business_name'] == 'Blue Bottle'
@@ -0,0 +1,86 @@
+import time
+import pytest
+from rate_limiter import RateLimited, RateLimiter
+
+
+def test_burst_then_paced():
+    limiter = RateLimiter(rate=20, burst=2)
+    started = time.monotonic()
+    waits = [limiter.acquire() for _ in range(6)]
+    assert waits[:2] == [0.0, 0.0]
+    assert time.monotonic() - started == pytest.approx(4 / 20, abs=0.05)
+
+
+def test_throttle_halves_rate_and_success_raises_it():
+    limiter = RateLimiter(rate=1.0, min_rate=0.1, max_rate=5.0, increase=0.05, decrease=0.5)
+    limiter.record_throttle()
+    assert limiter.stats()['default']['rate'] == 0.5
+    limiter.record_success()
+    assert limiter.stats()['default']['rate'] == 0.55
+
+
+def test_identities_have_separate_buckets():
+    limiter = RateLimiter(rate=0.1, burst=1)
+    limiter.reserve('a')
+    assert limiter.reserve('b') == 0.0
+
+
+def test_reserve_past_timeout_raises_without_taking_a_token():
+    limiter = RateLimiter(rate=0.1, burst=1)
+    limiter.reserve()
+    with pytest.raises(RateLimited) as raised:
+        limiter.reserve(timeout=1.0)
+    error = raised.value.to_dict()
+    assert error['rate_limited'] is True
+    assert error['retry_after'] == 10
+    assert limiter.stats()['default']['granted'] == 1
+    assert limiter.stats()['default']['rejected'] == 1
+
+
+@pytest.mark.parametrize('options', [
+    {'strategies': ['maps'], 'race': False},
+    {'strategies': ['search'], 'race': False},
+    {'strategies': ['maps', 'search'], 'race': True},
+    {'tier': 'fast'},
+])
+def test_paced_out_lookup_is_a_typed_error(fixture_scraper, options):
+    fixture_scraper.rate_limiter = RateLimiter(rate=0.1, burst=1)
+    first = fixture_scraper.get_business_data('Blue Bottle Coffee', time_budget=2, **options)
+    assert 'error' not in first
+
+    for _ in range(2):
+        result = fixture_scraper.get_business_data('Blue Bottle Coffee', time_budget=2, **options)
+        assert result['rate_limited'] is True
+        assert 'not found' not in result['error']
+
+
+def test_async_paced_out_lookup_is_a_typed_error(fixture_scraper):
+    asyncio = pytest.importorskip('asyncio')
+    pytest.importorskip('aiohttp')
+    from async_scraper import AsyncGoogleBusinessScraper
+
+    fixture_scraper.rate_limiter = RateLimiter(rate=0.1, burst=1)
+    fixture_scraper.rate_limiter.reserve(fixture_scraper.identity_pool.identities[0].name)
+
+    async def lookup():
+        engine = AsyncGoogleBusinessScraper(fixture_scraper)
+        try:
+            return await engine.get_business_data('Blue Bottle Coffee', time_budget=2, tier='fast')
+        finally:
+            await engine.close()
+
+    assert asyncio.run(lookup())['rate_limited'] is True
+
+
+def test_extract_answers_429_when_paced_out(client):
+    import main
+    limiter = main.scraper.rate_limiter
+    main.scraper.rate_limiter = RateLimiter(rate=0.1, burst=1)
+    main.scraper.rate_limiter.reserve(main.scraper.identity_pool.identities[0].name)
+    try:
+        response = client.post('/extract', json={'business_name': 'Blue Bottle Coffee', 'time_budget': 2,
+                                                 'strategies': ['search'], 'use_cache': False})
+    finally:
+        main.scraper.rate_limiter = limiter
+    assert response.status_code == 429
+    assert response.json['retry_after'] == 10
@@ -0,0 +1,273 @@
+import datetime
+import json
+import pytest
+import reviews
+from blocking import CAPTCHA, BlockedError
+from readiness import LatencyBudget
+from review_sync import ReviewSyncStore, sync_reviews
+from reviews import STOP_BUDGET, STOP_END, STOP_ERROR, STOP_NO_REVIEWS, HarvestStatus, harvest_reviews, sort_newest_first
+
+
+class PanelDriver:
+    """Answers the click script with whether any of the selectors is on the page"""
+
+    def __init__(self, present):
+        self.present = set(present)
+        self.clicked = []
+
+    def execute_script(self, script, *args):
+        if script == reviews._CLICK_FIRST_SCRIPT:
+            for selector in args[0]:
+                if selector in self.present:
+                    self.clicked.append(selector)
+                    return True
+            return False
+        return None
+
+
+@pytest.mark.parametrize('present, applied', [
+    ([], False),
+    (reviews.SORT_BUTTON_SELECTORS[:1], False),
+    (reviews.SORT_BUTTON_SELECTORS[:1] + reviews.NEWEST_OPTION_SELECTORS, True),
+])
+def test_sort_reports_whether_it_was_applied(present, applied):
+    assert sort_newest_first(PanelDriver(present), LatencyBudget(5), settle=0) is applied
+
+
+def review(review_id, days_ago):
+    date = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_ago)
+    return {"review_id": review_id, "date": date.isoformat()}
+
+
+class ScrollingDriver:
+    """A reviews panel that loads one page of raw reviews per read, then fails or runs dry"""
+
+    def __init__(self, pages, fail=False):
+        self.pages = list(pages)
+        self.fail = fail
+
+    def execute_script(self, script, *args):
+        if script == reviews._READ_SCRIPT:
+            if self.pages:
+                return self.pages.pop(0)
+            if self.fail:
+                raise reviews.WebDriverException('chrome went away')
+            return []
+        return None
+
+
+def raw(review_id):
+    return {'id': review_id, 'author': 'A', 'stars': '5 stars', 'date': '2 days ago', 'text': 'Fine'}
+
+
+@pytest.mark.parametrize('fail, reason', [(False, STOP_END), (True, STOP_ERROR)])
+def test_harvest_records_why_it_stopped(fail, reason):
+    status = HarvestStatus()
+    driver = ScrollingDriver([[raw('a'), raw('b')], [raw('c')]], fail=fail)
+    harvested = list(harvest_reviews(driver, scroll_pause=0, max_idle_scrolls=2, status=status))
+    assert [item['review_id'] for item in harvested] == ['a', 'b', 'c']
+    assert status.stop_reason == reason
+
+
+class CostBudget:
+    """A time budget counted in units the fake panel charges, so runs are deterministic"""
+
+    def __init__(self, units):
+        self.units = units
+        self.spent = 0.0
+
+    def remaining(self):
+        return max(0.0, self.units - self.spent)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class ListPanel:
+    """A reviews panel over a fixed list: ``page`` more reviews load per scroll
+
+    Reading a review costs 1 unit of the budget, skipping one 0.1 and a scroll 0.2.
+    """
+
+    def __init__(self, listed, page, budget):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.raws = [
+            {'id': item['review_id'], 'stars': '5 stars', 'text': 'Fine',
+             'date': f"{round((now - datetime.datetime.fromisoformat(item['date'])).total_seconds() / 86400)} days ago"}
+            for item in listed
+        ]
+        self.page = page
+        self.loaded = page
+        self.done = set()
+        self.budget = budget
+
+    def charge(self, units):
+        if self.budget:
+            self.budget.spent += units
+
+    def pending(self):
+        return [raw for raw in self.raws[:self.loaded] if raw['id'] not in self.done]
+
+    def execute_script(self, script, *args):
+        if script == reviews._PENDING_IDS_SCRIPT:
+            return [raw['id'] for raw in self.pending()]
+        if script == reviews._SKIP_SCRIPT:
+            self.done.update(args[0])
+            self.charge(0.1 * len(args[0]))
+        elif script == reviews._READ_SCRIPT:
+            batch = self.pending()
+            self.done.update(raw['id'] for raw in batch)
+            self.charge(len(batch))
+            return batch
+        elif script == reviews._SCROLL_SCRIPT:
+            self.loaded += self.page
+            self.charge(0.2)
+        return None
+
+
+class ReviewScraper:
+    """Runs the real panel harvest over a ListPanel, the way GoogleBusinessScraper.harvest_reviews drives it
+
+    Every run gets the same ``budget`` units; without one it reads to the end.
+    """
+
+    def __init__(self, listed, sorted_newest_first=True, budget=None, page=3):
+        self.listed = listed
+        self.sorted_newest_first = sorted_newest_first
+        self.budget = budget
+        self.page = page
+        self.read = 0
+
+    def _search_query(self, search_input):
+        return search_input
+
+    def harvest_reviews(self, search_input, since=None, time_budget=None, status=None, resume=None):
+        status.sorted_newest_first = self.sorted_newest_first
+        budget = CostBudget(self.budget) if self.budget else None
+        panel = ListPanel(self.listed, self.page, budget)
+        for item in harvest_reviews(panel, since=since if self.sorted_newest_first else None, budget=budget,
+                                    scroll_pause=0, max_idle_scrolls=1, status=status,
+                                    resume=resume if self.sorted_newest_first else None):
+            self.read += 1
+            yield item
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReviewSyncStore(str(tmp_path / 'reviews.sqlite3'))
+
+
+def test_sorted_sync_stops_at_known_reviews(store):
+    store.record('cafe', [review('c', 3), review('d', 4), review('e', 5)])
+    scraper = ReviewScraper([review('a', 1), review('b', 2), review('c', 3), review('d', 4), review('e', 5),
+                             review('f', 6)])
+    delta = sync_reviews(scraper, store, 'cafe')
+    assert [item['review_id'] for item in delta['new_reviews']] == ['a', 'b']
+    assert delta['complete'] and delta['sorted']
+    assert scraper.read == 5
+
+
+def test_unsorted_sync_reads_past_known_reviews(store):
+    store.record('cafe', [review('c', 3), review('d', 4), review('e', 5)])
+    scraper = ReviewScraper([review('c', 3), review('d', 4), review('e', 5), review('b', 2), review('a', 1)],
+                            sorted_newest_first=False)
+    delta = sync_reviews(scraper, store, 'cafe')
+    assert delta['sorted'] is False
+    assert [item['review_id'] for item in delta['new_reviews']] == ['a', 'b']
+    assert store.state('cafe')['newest_review_id'] == 'a'
+
+
+def test_partial_initial_sync_converges_on_a_fixed_budget(store):
+    history = [review(name, days) for days, name in enumerate('abcdefghijkl', start=1)]
+
+    first = sync_reviews(ReviewScraper(history, budget=5), store, 'cafe')
+    assert first['complete'] is False and first['stopped'] == STOP_BUDGET
+    assert [item['review_id'] for item in first['new_reviews']] == ['a', 'b', 'c', 'd', 'e', 'f']
+    assert store.state('cafe')['backfill_pending']
+    assert (store.state('cafe')['resume_review_id'], store.state('cafe')['resume_depth']) == ('f', 6)
+
+    # One new review on top; the next run skips what the first one read and carries on below it
+    listed = [review('new', 0)] + history
+    second = sync_reviews(ReviewScraper(listed, budget=5), store, 'cafe')
+    assert [item['review_id'] for item in second['new_reviews']] == ['new', 'g', 'h', 'i', 'j', 'k']
+    assert second['complete'] is False
+    assert store.state('cafe')['resume_review_id'] == 'k'
+
+    third = sync_reviews(ReviewScraper(listed, budget=5), store, 'cafe')
+    assert [item['review_id'] for item in third['new_reviews']] == ['l']
+    assert third['complete'] is True and third['stopped'] == STOP_END
+    assert not store.state('cafe')['backfill_pending']
+    assert store.state('cafe')['newest_review_id'] == 'new'
+    assert store.state('cafe')['resume_review_id'] is None
+
+    # Backfill done: back to stopping at the first run of known reviews
+    scraper = ReviewScraper([review('newer', 0)] + listed, budget=5)
+    fourth = sync_reviews(scraper, store, 'cafe')
+    assert [item['review_id'] for item in fourth['new_reviews']] == ['newer']
+    assert fourth['stopped'] == 'known_reviews'
+    assert scraper.read == 4
+
+
+def test_resume_skips_by_depth_when_the_last_review_was_deleted():
+    listed = [review(name, days) for days, name in enumerate('abcdef', start=1)]
+    status = HarvestStatus()
+    panel = ListPanel(listed, 2, None)
+    resume = reviews.ResumePoint('a', 'deleted', 3)
+    harvested = list(harvest_reviews(panel, scroll_pause=0, max_idle_scrolls=1, status=status, resume=resume))
+    assert [item['review_id'] for item in harvested] == ['d', 'e', 'f']
+    assert status.skipped == 3
+
+
+class NoReviewsScraper(ReviewScraper):
+    def harvest_reviews(self, search_input, since=None, time_budget=None, status=None, resume=None):
+        status.stop_reason = STOP_NO_REVIEWS
+        yield from ()
+
+
+def test_listing_without_reviews_is_a_finished_sync(store):
+    delta = sync_reviews(NoReviewsScraper([]), store, 'cafe')
+    assert delta['stopped'] == STOP_NO_REVIEWS
+    assert delta['complete'] is True
+    assert not store.state('cafe')['backfill_pending']
+
+
+def test_backfilled_reviews_rank_below_known_ones(tmp_path):
+    store = ReviewSyncStore(str(tmp_path / 'reviews.sqlite3'), max_known_ids=2)
+    store.record('cafe', [review('b', 2)], complete=False)
+    store.record('cafe', [review('a', 1)], [review('c', 3), review('d', 4)], complete=True)
+    assert store.known_ids('cafe') == {'a', 'b'}
+    assert store.state('cafe')['newest_review_id'] == 'a'
+
+
+def blocked_harvest(reviews_before_block):
+    def harvest(search_input, status=None, **options):
+        for index in range(reviews_before_block):
+            yield {"review_id": f"r{index}", "date": None}
+        raise BlockedError(CAPTCHA, 'maps')
+    return harvest
+
+
+def test_harvest_blocked_before_the_first_review_answers_503(client, monkeypatch):
+    import main
+    monkeypatch.setattr(main.scraper, 'harvest_reviews', blocked_harvest(0))
+    response = client.post('/reviews', json={'business_name': 'Blue Bottle Coffee'})
+    assert response.status_code == 503
+    assert response.json['blocked'] == 'captcha'
+
+
+def test_harvest_blocked_mid_stream_ends_with_a_typed_error_event(client, monkeypatch):
+    import main
+    monkeypatch.setattr(main.scraper, 'harvest_reviews', blocked_harvest(2))
+    response = client.post('/reviews', json={'business_name': 'Blue Bottle Coffee'})
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.status_code == 200
+    assert [event['type'] for event in events] == ['review', 'review', 'error', 'summary']
+    assert events[2]['blocked'] == 'captcha'
+    assert events[3]['count'] == 2
+
+
+@pytest.mark.parametrize('path', ['/reviews', '/reviews/sync'])
+def test_review_endpoints_reject_non_object_bodies(client, path):
+    response = client.post(path, json=['Blue Bottle Coffee'])
+    assert response.status_code == 400
+    assert 'error' in response.json
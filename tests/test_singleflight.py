@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {'value': len(calls)}
+
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(flight.do, 'key', slow)
+        started.wait()
+        followers = [executor.submit(flight.do, 'key', slow) for _ in range(3)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert calls == [1]
+    assert all(result == {'value': 1} for result in results)
+    # Followers get copies, so annotating one result leaves the others alone
+    results[1]['cache'] = {}
+    assert 'cache' not in results[2]
+
+
+def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, 'key', fail)
+        started.wait()
+        follower = executor.submit(flight.do, 'key', fail)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+@pytest.mark.parametrize('other, shared', [
+    ({'strategies': ['maps', 'search'], 'race': True}, True),
+    ({'strategies': ['search', 'maps'], 'race': True}, False),
+    ({'strategies': ['maps', 'search'], 'race': False}, False),
+    ({'strategies': ['maps'], 'race': True}, False),
+])
+def test_lookups_only_share_a_scrape_with_matching_options(fixture_scraper, other, shared):
+    started = threading.Event()
+    calls = []
+
+    def scrape(search_query, time_budget, strategies, race, tier, fields):
+        calls.append((strategies, race))
+        started.set()
+        time.sleep(0.1)
+        return {'business_name': search_query}, 'maps'
+
+    fixture_scraper._scrape_tiered = scrape
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(fixture_scraper._scrape_once, 'Blue Bottle', strategies=['maps', 'search'], race=True)
+        started.wait()
+        second = executor.submit(fixture_scraper._scrape_once, 'blue bottle', **other)
+        first.result(), second.result()
+
+    assert len(calls) == (1 if shared else 2)
@@ -0,0 +1,41 @@
+import pytest
+from utils import (
+    SERVICE_KEYWORDS, extract_business_attributes, extract_business_attributes_batch, extract_categories,
+    extract_categories_batch, extract_ratings_batch, extract_rating, extract_services, extract_services_batch,
+)
+
+TEXTS = [
+    '4.6 stars',
+    'Rated 4.5 out of 5 by 120 people',
+    '3/5',
+    'Open 24 hours, wheelchair accessible',
+    'Tax planning, consulting and web design for Real Estate and Healthcare clients',
+    'MARKETING Strategy; family-owned, veteran owned',
+    'web\ndesign split across lines',
+    '',
+    None,
+    'tax',
+    'Consulting',
+]
+
+
+@pytest.mark.parametrize('batch, single', [
+    (extract_ratings_batch, extract_rating),
+    (extract_categories_batch, extract_categories),
+    (extract_services_batch, extract_services),
+    (extract_business_attributes_batch, extract_business_attributes),
+])
+def test_batch_matches_single_text_results(batch, single):
+    assert batch(TEXTS) == [single(text) for text in TEXTS]
+
+
+def test_keywords_do_not_match_across_texts_in_a_batch():
+    assert extract_services_batch(['web', 'design']) == [[], []]
+    assert extract_categories_batch(['real', 'estate']) == [[], []]
+
+
+def test_services_come_back_in_table_order():
+    found = extract_services('Web design, tax and consulting')
+    assert found == ['Consulting', 'Tax', 'Web Design']
+    assert found == sorted(found, key=lambda service: SERVICE_KEYWORDS.index(service.lower()))
+    assert extract_services_batch(['Web design, tax and consulting']) == [found]
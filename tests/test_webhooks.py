@@ -0,0 +1,45 @@
+import time
+import pytest
+from webhook_sink import count_listings
+from webhooks import WebhookDispatcher
+
+
+class Response:
+    status_code = 200
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    dispatcher = WebhookDispatcher(str(tmp_path / 'outbox.sqlite3'), coalesce_window=0.1,
+                                   envelopes={'zapier': lambda data: {"source": "test", "business_data": data}})
+    dispatcher.posted = []
+    dispatcher.post = lambda url, body: dispatcher.posted.append(body) or Response()
+    yield dispatcher
+    dispatcher.close()
+
+
+def wait_delivered(dispatcher, delivery_id):
+    deadline = time.time() + 5
+    while dispatcher.get(delivery_id)['status'] != 'delivered' and time.time() < deadline:
+        time.sleep(0.02)
+
+
+def test_coalesced_posts_flatten_bulk_payloads(dispatcher):
+    bulk = {"batch": True, "count": 2, "businesses": [{"business_name": "a"}, {"business_name": "b"}]}
+    dispatcher.enqueue('http://sink/hook', bulk, coalesce=True)
+    wait_delivered(dispatcher, dispatcher.enqueue('http://sink/hook', {"business_name": "c"}, coalesce=True))
+
+    listings = [{"business_name": "a"}, {"business_name": "b"}, {"business_name": "c"}]
+    assert dispatcher.posted == [{"batch": True, "count": 3, "businesses": listings}]
+    assert count_listings(dispatcher.posted[0]) == 3
+
+
+def test_envelope_is_applied_once_per_post(dispatcher):
+    dispatcher.enqueue('http://sink/zap', {"business_name": "a"}, coalesce=True, envelope='zapier')
+    last = dispatcher.enqueue('http://sink/zap', {"business_name": "b"}, coalesce=True, envelope='zapier')
+    wait_delivered(dispatcher, last)
+
+    listings = [{"business_name": "a"}, {"business_name": "b"}]
+    assert dispatcher.posted == [{"source": "test", "business_data": {"batch": True, "count": 2,
+                                                                      "businesses": listings}}]
+    assert count_listings(dispatcher.posted[0]) == 2
@@ -0,0 +1,139 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# JSON-lines file that every traced request is appended to (optional)
+TRACE_FILE = os.getenv('TRACE_FILE', '')
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    """Timeline of the spans recorded while handling one request
+
+    Spans may be added from several threads (strategy racing), so writes
+    go through a lock. Times are milliseconds from the start of the trace.
+    """
+
+    def __init__(self, name, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._finished = None
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end, parent=None, **attrs):
+        span = dict(
+            attrs,
+            name=name,
+            start_ms=round((start - self._started) * 1000, 2),
+            duration_ms=round((end - start) * 1000, 2),
+            thread=threading.current_thread().name,
+        )
+        with self._lock:
+            span['id'] = len(self._spans) + 1
+            if parent is not None:
+                span['parent'] = parent
+            self._spans.append(span)
+        return span
+
+    def end_span(self, span, duration):
+        with self._lock:
+            span['duration_ms'] = round(duration * 1000, 2)
+
+    def finish(self):
+        self._finished = time.perf_counter()
+
+    def to_dict(self):
+        end = self._finished or time.perf_counter()
+        with self._lock:
+            spans = sorted((dict(span) for span in self._spans), key=lambda span: span['start_ms'])
+        return dict(
+            self.attrs,
+            trace_id=self.trace_id,
+            name=self.name,
+            started_at=self.started_at,
+            total_ms=round((end - self._started) * 1000, 2),
+            spans=spans,
+        )
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name, enabled=True, **attrs):
+    """Collect spans for the enclosed work; yields the Trace, or None when disabled
+
+    Finished traces are appended to TRACE_FILE when it is set.
+    """
+    if not enabled:
+        yield None
+        return
+
+    active = Trace(name, **attrs)
+    trace_token = _current_trace.set(active)
+    span_token = _current_span.set(None)
+    try:
+        yield active
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        active.finish()
+        if TRACE_FILE:
+            write_trace(active, TRACE_FILE)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Record the enclosed block as a span of the current trace, if there is one"""
+    active = _current_trace.get()
+    if active is None:
+        yield
+        return
+
+    # Add the span up front so children can point at it, and fill in its duration on exit
+    parent = _current_span.get()
+    start = time.perf_counter()
+    recorded = active.add_span(name, start, start, parent, **attrs)
+    token = _current_span.set(recorded['id'])
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        active.end_span(recorded, time.perf_counter() - start)
+
+
+def record_span(name, duration, **attrs):
+    """Record a span that just ended after ``duration`` seconds"""
+    active = _current_trace.get()
+    if active is None:
+        return
+    end = time.perf_counter()
+    active.add_span(name, end - duration, end, _current_span.get(), **attrs)
+
+
+def propagate(fn):
+    """Wrap ``fn`` to run in a copy of the caller's context, for use with thread pools"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def write_trace(active, path):
+    """Append one finished trace to a JSON-lines file"""
+    try:
+        line = json.dumps(active.to_dict(), default=str)
+        with _file_lock, open(path, 'a') as f:
+            f.write(line + '\n')
+    except Exception:
+        pass
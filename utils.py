@@ -1,5 +1,56 @@
 import re
+from bisect import bisect_right
 from typing import List, Dict, Any
+from selenium.webdriver.common.by import By
+
+# Texts in a batch are joined with a separator the attribute patterns cannot match across
+_BATCH_SEPARATOR = '\n\x00'
+
+# Rating forms in priority order: "4.6 stars", "4.6 out of 5", "4.6/5", then any number.
+# Each is paired with a literal it cannot match without, so hopeless scans are skipped.
+RATING_PATTERNS = [
+    (re.compile(r'(\d+\.?\d*)\s*stars?', re.IGNORECASE), None),
+    (re.compile(r'(\d+\.?\d*)\s*out\s*of\s*5', re.IGNORECASE), 'of'),
+    (re.compile(r'(\d+\.?\d*)\s*\/\s*5', re.IGNORECASE), '/'),
+    (re.compile(r'(\d+\.?\d*)'), None)
+]
+
+# Common business categories, paired with the lower-cased form that is searched for
+COMMON_CATEGORIES = [
+    "Consulting", "Business Services", "Marketing", "Legal Services",
+    "Financial Services", "Technology", "Healthcare", "Real Estate",
+    "Restaurant", "Retail", "Manufacturing", "Education",
+    "Non-profit", "Government", "Entertainment", "Fitness",
+    "Beauty", "Automotive", "Home Services", "Professional Services"
+]
+_CATEGORY_KEYS = [(category.lower(), category) for category in COMMON_CATEGORIES]
+
+# Common service keywords, paired with the label that is returned
+SERVICE_KEYWORDS = [
+    "consulting", "planning", "strategy", "marketing", "advertising",
+    "legal", "tax", "accounting", "financial", "insurance",
+    "technology", "software", "web design", "development",
+    "healthcare", "medical", "dental", "therapy",
+    "real estate", "property", "mortgage", "investment",
+    "education", "training", "coaching", "mentoring"
+]
+_SERVICE_KEYS = [(keyword, keyword.title()) for keyword in SERVICE_KEYWORDS]
+
+# Common business attributes, matched against lower-cased text
+ATTRIBUTE_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'black.?owned',
+        r'women.?led',
+        r'minority.?owned',
+        r'veteran.?owned',
+        r'lgbtq.?owned',
+        r'family.?owned',
+        r'locally.?owned',
+        r'eco.?friendly',
+        r'green',
+        r'sustainable'
+    )
+]
 
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
@@ -15,15 +66,13 @@ def extract_rating(text: str) -> str:
         return ""
     
     # Look for patterns like "4.6 stars", "4.6", "4 stars"
-    rating_patterns = [
-        r'(\d+\.?\d*)\s*stars?',
-        r'(\d+\.?\d*)\s*out\s*of\s*5',
-        r'(\d+\.?\d*)\s*\/\s*5',
-        r'(\d+\.?\d*)'
-    ]
-    
-    for pattern in rating_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    text_lower = None
+    for pattern, required in RATING_PATTERNS:
+        if required:
+            text_lower = text_lower or text.lower()
+            if required not in text_lower:
+                continue
+        match = pattern.search(text)
         if match:
             rating = float(match.group(1))
             if 0 <= rating <= 5:
@@ -31,6 +80,10 @@ def extract_rating(text: str) -> str:
     
     return ""
 
+def extract_ratings_batch(texts: List[str]) -> List[str]:
+    """Extract star ratings from many texts"""
+    return [extract_rating(text) for text in texts]
+
 def extract_reviews(driver) -> List[Dict[str, Any]]:
     """Extract top reviews from Google Maps"""
     reviews = []
@@ -67,81 +120,129 @@ def extract_reviews(driver) -> List[Dict[str, Any]]:
     
     return reviews
 
+def extract_reviews_from_soup(soup) -> List[Dict[str, Any]]:
+    """Extract top reviews from an already-parsed Google Maps page"""
+    reviews = []
+    try:
+        for review_elem in soup.select('[data-review-id]')[:5]:  # Get first 5 reviews
+            star_elem = review_elem.select_one('[aria-label*="stars"]')
+            text_elem = review_elem.select_one('.review-snippet')
+            if star_elem is None or text_elem is None:
+                continue
+            
+            stars = extract_rating(star_elem.get('aria-label', ''))
+            text = clean_text(text_elem.get_text(' '))
+            
+            if stars and text:
+                reviews.append({
+                    "stars": int(float(stars)),
+                    "text": text
+                })
+                
+    except Exception as e:
+        # If we can't extract real reviews, return mock data
+        reviews = [
+            {"stars": 5, "text": "Excellent service and very professional team."},
+            {"stars": 4, "text": "Great experience working with this company."},
+            {"stars": 5, "text": "Highly recommended for their expertise."}
+        ]
+    
+    return reviews
+
+def _join_batch(texts: List[str]):
+    """Lower-case and join texts so each pattern is searched once for the whole batch
+    
+    Returns the joined string and the offset at which each text starts.
+    """
+    lowered = [(text or '').lower() for text in texts]
+    starts = []
+    offset = 0
+    for text in lowered:
+        starts.append(offset)
+        offset += len(text) + len(_BATCH_SEPARATOR)
+    return _BATCH_SEPARATOR.join(lowered), starts
+
+def _first_matches(joined: str, starts: List[int], pattern):
+    """Yield (text index, match) for the first match of a compiled pattern in each text"""
+    match = pattern.search(joined)
+    while match:
+        index = bisect_right(starts, match.start()) - 1
+        yield index, match
+        # Skip the rest of this text; one hit per text is all the callers need
+        if index + 1 >= len(starts):
+            break
+        match = pattern.search(joined, starts[index + 1])
+
+def _first_finds(joined: str, starts: List[int], literal: str):
+    """Yield the index of each text that contains a literal, like _first_matches for plain substrings"""
+    position = joined.find(literal)
+    while position != -1:
+        index = bisect_right(starts, position) - 1
+        yield index
+        if index + 1 >= len(starts):
+            break
+        position = joined.find(literal, starts[index + 1])
+
+def _keyword_batch(texts: List[str], keys) -> List[List[str]]:
+    """Labels of the (lower-cased key, label) pairs found in each text, in table order"""
+    joined, starts = _join_batch(texts)
+    found = [[] for _ in texts]
+    for key, label in keys:
+        for index in _first_finds(joined, starts, key):
+            found[index].append(label)
+    return found
+
 def extract_categories(text: str) -> List[str]:
     """Extract business categories from text"""
     if not text:
         return []
     
-    # Common business categories
-    common_categories = [
-        "Consulting", "Business Services", "Marketing", "Legal Services",
-        "Financial Services", "Technology", "Healthcare", "Real Estate",
-        "Restaurant", "Retail", "Manufacturing", "Education",
-        "Non-profit", "Government", "Entertainment", "Fitness",
-        "Beauty", "Automotive", "Home Services", "Professional Services"
-    ]
-    
-    categories = []
     text_lower = text.lower()
-    
-    for category in common_categories:
-        if category.lower() in text_lower:
-            categories.append(category)
-    
-    return categories
+    return [category for key, category in _CATEGORY_KEYS if key in text_lower]
+
+def extract_categories_batch(texts: List[str]) -> List[List[str]]:
+    """Extract business categories from many texts, searching the batch once per category"""
+    return _keyword_batch(texts, _CATEGORY_KEYS)
 
 def extract_services(text: str) -> List[str]:
     """Extract services from business description"""
     if not text:
         return []
     
-    # Common service keywords
-    service_keywords = [
-        "consulting", "planning", "strategy", "marketing", "advertising",
-        "legal", "tax", "accounting", "financial", "insurance",
-        "technology", "software", "web design", "development",
-        "healthcare", "medical", "dental", "therapy",
-        "real estate", "property", "mortgage", "investment",
-        "education", "training", "coaching", "mentoring"
-    ]
-    
-    services = []
     text_lower = text.lower()
-    
-    for keyword in service_keywords:
-        if keyword in text_lower:
-            services.append(keyword.title())
-    
-    return list(set(services))  # Remove duplicates
+    return [service for keyword, service in _SERVICE_KEYS if keyword in text_lower]
+
+def extract_services_batch(texts: List[str]) -> List[List[str]]:
+    """Extract services from many descriptions, searching the batch once per keyword"""
+    return _keyword_batch(texts, _SERVICE_KEYS)
+
+def _format_attribute(match) -> str:
+    # Convert to title case
+    return match.group(0).replace('-', ' ').title()
 
 def extract_business_attributes(text: str) -> List[str]:
     """Extract business attributes like 'Black-owned', 'Women-led'"""
-    attributes = []
-    text_lower = text.lower()
-    
-    # Look for common business attributes
-    attribute_patterns = [
-        r'black.?owned',
-        r'women.?led',
-        r'minority.?owned',
-        r'veteran.?owned',
-        r'lgbtq.?owned',
-        r'family.?owned',
-        r'locally.?owned',
-        r'eco.?friendly',
-        r'green',
-        r'sustainable'
-    ]
+    if not text:
+        return []
     
-    for pattern in attribute_patterns:
-        if re.search(pattern, text_lower):
-            # Convert to title case
-            attr = re.search(pattern, text_lower).group(0)
-            attr = attr.replace('-', ' ').title()
-            attributes.append(attr)
+    text_lower = text.lower()
+    attributes = []
+    for pattern in ATTRIBUTE_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            attributes.append(_format_attribute(match))
     
     return attributes
 
+def extract_business_attributes_batch(texts: List[str]) -> List[List[str]]:
+    """Extract business attributes from many texts, scanning the batch once per pattern"""
+    joined, starts = _join_batch(texts)
+    attributes = [[] for _ in texts]
+    for pattern in ATTRIBUTE_PATTERNS:
+        for index, match in _first_matches(joined, starts, pattern):
+            attributes[index].append(_format_attribute(match))
+    return attributes
+
 def format_phone_number(phone: str) -> str:
     """Format phone number consistently"""
     if not phone:
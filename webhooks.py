@@ -0,0 +1,268 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import WEBHOOK_LATENCY, WEBHOOK_RESULTS
+
+SUCCESS_CODES = (200, 201, 202)
+
+
+class WebhookDispatcher:
+    """Webhook delivery through a durable SQLite outbox and a background worker
+
+    Every destination host gets its own keep-alive session. Failed POSTs are
+    retried with exponential backoff until ``max_attempts`` is reached.
+    Outbox rows are claimed before sending, so several processes can share
+    one outbox file. Entries queued with ``coalesce=True`` for the same URL
+    are sent together as one ``{"batch": true, "count": N, "businesses": [...]}``
+    POST, with the listings of bulk payloads flattened into the one list. An
+    entry queued with ``envelope`` set to a name in ``envelopes`` is wrapped
+    by that function when it is sent, once per POST.
+    """
+
+    def __init__(self, path, max_attempts=6, base_delay=2.0, max_delay=300.0, timeout=10,
+                 coalesce_window=0.5, max_batch=50, lease_seconds=60, retention=24 * 3600, envelopes=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self.envelopes = envelopes or {}
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stopping = False
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " coalesce INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " claimed_until REAL,"
+            " last_error TEXT,"
+            " response_status INTEGER,"
+            " created_at REAL NOT NULL,"
+            " delivered_at REAL,"
+            " envelope TEXT)"
+        )
+        try:
+            # Outboxes created before envelopes were applied at send time
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN envelope TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+        self._conn.commit()
+
+    def session_for(self, url):
+        """Shared keep-alive session for the URL's host"""
+        host = urllib.parse.urlparse(url).netloc
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update({'Content-Type': 'application/json'})
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def post(self, url, payload):
+        """POST a payload immediately over the pooled session for its host"""
+        return self.session_for(url).post(url, json=payload, timeout=self.timeout)
+
+    def enqueue(self, url, payload, coalesce=False, envelope=None):
+        """Persist a delivery in the outbox and wake the worker; returns the delivery ID"""
+        now = time.time()
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (url, payload, coalesce, next_attempt_at, created_at, envelope)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(payload), int(coalesce), now + (self.coalesce_window if coalesce else 0), now,
+                 envelope)
+            )
+            self._conn.commit()
+        self._ensure_worker()
+        self._wake.set()
+        return cursor.lastrowid
+
+    def get(self, delivery_id):
+        """Current state of a delivery, or None if unknown or expired"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT id, url, status, attempts, next_attempt_at, last_error, response_status, created_at, delivered_at"
+                " FROM outbox WHERE id = ?", (delivery_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ('delivery_id', 'webhook_url', 'status', 'attempts', 'next_attempt_at',
+                'last_error', 'response_status', 'created_at', 'delivered_at')
+        return dict(zip(keys, row))
+
+    def stats(self):
+        with self._db_lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return {"outbox": counts, "destinations": len(self._sessions)}
+
+    def start(self):
+        """Start the delivery worker, picking up anything left in the outbox by a previous run"""
+        self._ensure_worker()
+        self._wake.set()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='webhook-dispatcher', daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                delivered = self._deliver_due()
+            except Exception:
+                delivered = 0
+            if not delivered:
+                self._wake.wait(self._seconds_until_next())
+                self._wake.clear()
+
+    def _seconds_until_next(self):
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        if row[0] is None:
+            return 30.0
+        return min(30.0, max(0.05, row[0] - time.time()))
+
+    def _claim_due(self):
+        """Claim due rows for this process; rows whose lease expired mid-send are retried"""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND claimed_until < ?", (now,)
+            )
+            row = self._conn.execute(
+                "SELECT id, url, coalesce, envelope FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?"
+                " ORDER BY id LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                self._prune(now)
+                self._conn.commit()
+                return []
+
+            # Coalescable rows for the same URL and envelope travel together
+            if row[2]:
+                ids = [r[0] for r in self._conn.execute(
+                    "SELECT id FROM outbox WHERE status = 'pending' AND coalesce = 1 AND url = ?"
+                    " AND envelope IS ? AND (next_attempt_at <= ? OR attempts = 0) ORDER BY id LIMIT ?",
+                    (row[1], row[3], now, self.max_batch)
+                ).fetchall()]
+            else:
+                ids = [row[0]]
+
+            claimed = []
+            for delivery_id in ids:
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = 'sending', claimed_until = ? WHERE id = ? AND status = 'pending'",
+                    (now + self.lease_seconds, delivery_id)
+                )
+                if cursor.rowcount:
+                    claimed.append(delivery_id)
+            rows = self._conn.execute(
+                f"SELECT id, url, payload, attempts, envelope FROM outbox WHERE id IN ({','.join('?' * len(claimed))})",
+                claimed
+            ).fetchall() if claimed else []
+            self._conn.commit()
+        return rows
+
+    def _deliver_due(self):
+        rows = self._claim_due()
+        if not rows:
+            return 0
+
+        url = rows[0][1]
+        body = self._body([json.loads(row[2]) for row in rows], rows[0][4])
+
+        status_code = None
+        error = None
+        try:
+            with WEBHOOK_LATENCY.time(mode='outbox'):
+                response = self.post(url, body)
+            status_code = response.status_code
+            if status_code not in SUCCESS_CODES:
+                error = f"Webhook request failed with status {status_code}"
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+        WEBHOOK_RESULTS.inc(mode='outbox', result='success' if error is None else 'error')
+
+        now = time.time()
+        with self._db_lock:
+            for delivery_id, _, _, attempts, _ in rows:
+                attempts += 1
+                if error is None:
+                    self._conn.execute(
+                        "UPDATE outbox SET status = 'delivered', attempts = ?, response_status = ?,"
+                        " delivered_at = ?, last_error = NULL WHERE id = ?",
+                        (attempts, status_code, now, delivery_id)
+                    )
+                else:
+                    # Exponential backoff with jitter; give up after max_attempts
+                    delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                    status = 'failed' if attempts >= self.max_attempts else 'pending'
+                    self._conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = ?, response_status = ?, last_error = ?,"
+                        " next_attempt_at = ? WHERE id = ?",
+                        (status, attempts, status_code, error, now + delay, delivery_id)
+                    )
+            self._conn.commit()
+        return len(rows)
+
+    def _body(self, payloads, envelope):
+        """One POST body for the claimed payloads, in the same shape as a bulk delivery when there are several"""
+        if len(payloads) == 1:
+            body = payloads[0]
+        else:
+            businesses = []
+            for payload in payloads:
+                businesses.extend(payload['businesses'] if payload.get('batch') else [payload])
+            body = {"batch": True, "count": len(businesses), "businesses": businesses}
+        wrap = self.envelopes.get(envelope) if envelope else None
+        return wrap(body) if wrap else body
+
+    def _prune(self, now):
+        """Drop finished deliveries older than the retention period; caller holds the lock"""
+        self._conn.execute(
+            "DELETE FROM outbox WHERE status IN ('delivered', 'failed') AND created_at < ?",
+            (now - self.retention,)
+        )
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+
+
+def default_dispatcher(envelopes=None):
+    """Dispatcher configured from the environment"""
+    return WebhookDispatcher(
+        os.getenv('WEBHOOK_OUTBOX_PATH', 'webhook_outbox.sqlite3'),
+        max_attempts=int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '6')),
+        timeout=float(os.getenv('WEBHOOK_TIMEOUT', '10')),
+        envelopes=envelopes,
+    )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Scraping worker fleet fed from the SQLite job broker
+
+Starts N worker processes, each with its own GoogleBusinessScraper and
+Chrome pool, that run the jobs the web tier (JOB_BACKEND=broker) queues.
+The supervisor restarts workers that crash, kills and replaces workers
+stuck on a job past JOB_TIMEOUT (Chrome included), and on SIGTERM lets
+every worker finish its current jobs before exiting.
+
+Usage:
+    python worker.py [--processes 2] [--concurrency 2] [--job-timeout 120] [--drain-timeout 60]
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from dotenv import load_dotenv
+from broker import default_broker, worker_name
+
+# Workers that die this soon after starting are restarted with a growing delay
+CRASH_WINDOW = 30
+MAX_RESTART_DELAY = 60
+
+
+def run_job(main, payload):
+    """Run one broker job inside a worker process"""
+    payload = dict(payload)
+    if payload.pop('kind', 'extract') == 'scrape':
+        return main.scraper.get_business_data(payload.pop('search_input'), **payload)
+    return main.run_extraction(**payload)
+
+
+def worker_process(concurrency, job_timeout):
+    """Entry point of one worker process: claim and run jobs until told to drain"""
+    # Own process group, so the supervisor can kill a hung worker together with its Chrome processes
+    os.setpgrp()
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # This process is the fleet: scrape locally, with one browser per job slot
+    os.environ['JOB_BACKEND'] = 'thread'
+    os.environ['DRIVER_POOL_SIZE'] = str(concurrency)
+    import main
+
+    broker = default_broker()
+    name = worker_name()
+    broker.register_worker(name, os.getpid(), concurrency)
+    running = {}
+    running_lock = threading.Lock()
+
+    def slot():
+        while not stopping.is_set():
+            claimed = broker.claim(name)
+            if claimed is None:
+                stopping.wait(broker.poll_interval * 5)
+                continue
+            job_id, payload = claimed
+            with running_lock:
+                running[job_id] = time.monotonic()
+            try:
+                broker.finish(job_id, name, result=run_job(main, payload))
+            except Exception as e:
+                broker.finish(job_id, name, error=str(e))
+            finally:
+                with running_lock:
+                    running.pop(job_id, None)
+
+    slots = [threading.Thread(target=slot, name=f'job-slot-{index}') for index in range(concurrency)]
+    for thread in slots:
+        thread.start()
+
+    # Renew leases for jobs still within JOB_TIMEOUT. A job past it is left to expire so
+    # another worker can retry it, and this worker reports itself stuck to the supervisor.
+    while any(thread.is_alive() for thread in slots):
+        with running_lock:
+            now = time.monotonic()
+            healthy = [job_id for job_id, started in running.items() if now - started < job_timeout]
+            stuck = len(healthy) < len(running)
+        broker.renew(healthy, name)
+        broker.worker_seen(name, 'stuck' if stuck else 'draining' if stopping.is_set() else 'running')
+        for thread in slots:
+            thread.join(timeout=broker.lease_seconds / 3 / len(slots))
+
+    main.scraper.driver_pool.close()
+    broker.worker_seen(name, 'stopped')
+
+
+class Supervisor:
+    """Keeps ``processes`` worker processes running and drains them on shutdown"""
+
+    def __init__(self, processes, concurrency, job_timeout, drain_timeout):
+        self.processes = processes
+        self.concurrency = concurrency
+        self.job_timeout = job_timeout
+        self.drain_timeout = drain_timeout
+        self.broker = default_broker()
+        self._context = multiprocessing.get_context('spawn')
+        self._workers = {}
+        self._restarts = {}
+        self._restart_at = {}
+        self._stopping = threading.Event()
+
+    def _start(self, slot):
+        process = self._context.Process(
+            target=worker_process, args=(self.concurrency, self.job_timeout), name=f'scrape-worker-{slot}'
+        )
+        process.start()
+        self._workers[slot] = (process, time.monotonic())
+        print(f"Worker {slot} started (pid {process.pid})", flush=True)
+
+    def _kill(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.join(timeout=5)
+
+    def _check(self):
+        """Replace dead workers and kill the ones stuck past JOB_TIMEOUT"""
+        stuck = set(self.broker.stuck_workers())
+        now = time.monotonic()
+        for slot, (process, started) in list(self._workers.items()):
+            if process.is_alive() and worker_name(process.pid) in stuck:
+                print(f"Worker {slot} (pid {process.pid}) is stuck on a job; killing it", flush=True)
+                self._kill(process)
+                reason = f"Worker was killed after exceeding the {self.job_timeout:g}s job timeout"
+            elif not process.is_alive():
+                reason = f"Worker exited with code {process.exitcode}"
+                print(f"Worker {slot} (pid {process.pid}) died: {reason}", flush=True)
+            else:
+                continue
+
+            self.broker.release_worker(worker_name(process.pid), reason)
+            del self._workers[slot]
+            # Back off on workers that crash straight after starting
+            self._restarts[slot] = self._restarts.get(slot, 0) + 1 if now - started < CRASH_WINDOW else 0
+            self._restart_at[slot] = now + min(2 ** self._restarts[slot] - 1, MAX_RESTART_DELAY)
+
+        for slot, restart_at in list(self._restart_at.items()):
+            if now >= restart_at:
+                del self._restart_at[slot]
+                self._start(slot)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stopping.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self._stopping.set())
+
+        for slot in range(self.processes):
+            self._start(slot)
+        while not self._stopping.wait(1.0):
+            self._check()
+        self.drain()
+
+    def drain(self):
+        """Ask every worker to finish its current jobs, killing whatever outlives the drain timeout"""
+        print(f"Draining {len(self._workers)} workers (up to {self.drain_timeout:g}s)", flush=True)
+        for process, _ in self._workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.drain_timeout
+        for process, _ in self._workers.values():
+            process.join(timeout=max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                self._kill(process)
+            if process.exitcode != 0:
+                self.broker.release_worker(worker_name(process.pid), "Worker was stopped before finishing the job")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=int(os.getenv('WORKER_PROCESSES', '2')),
+                        help='worker processes to keep running')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('WORKER_CONCURRENCY', '2')),
+                        help='jobs (and Chrome instances) per worker process')
+    parser.add_argument('--job-timeout', type=float, default=float(os.getenv('JOB_TIMEOUT', '120')),
+                        help='seconds a job may run before its worker is considered stuck')
+    parser.add_argument('--drain-timeout', type=float, default=float(os.getenv('WORKER_DRAIN_TIMEOUT', '60')),
+                        help='seconds workers get to finish their jobs on shutdown')
+    args = parser.parse_args()
+
+    Supervisor(args.processes, args.concurrency, args.job_timeout, args.drain_timeout).run()
+
+
+if __name__ == '__main__':
+    main()